@@ -0,0 +1,117 @@
+# ============================
+# Annotation Counter Reconciliation Module
+# ============================
+
+"""
+This module repairs drift in the denormalized annotation counters.
+
+`Document.annotation_count`, `Document.last_annotated_at`, the per-page
+`annotation_page_counts` and the per-value `annotation_value_counts` are
+updated by every annotation write in the same transaction, but writes made
+around the API, such as manual SQL, can still leave them wrong. A periodic
+"annotation_counts" job walks every document in batches, in a worker process,
+and compares its counters with the annotations and the change feed. The
+documents found to differ are then recomputed in the main process, along with
+their completeness, in the transaction that completes the job, and the next
+run is scheduled.
+
+Set ANNOTATION_COUNTS_INTERVAL_HOURS to change how often the job runs.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Third-Party Imports
+from sqlalchemy.orm import Session
+
+# Local Imports
+from . import crud
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Configuration Constants
+# ============================
+
+# Time between the end of one reconciliation and the start of the next
+ANNOTATION_COUNTS_INTERVAL_HOURS = float(os.getenv("ANNOTATION_COUNTS_INTERVAL_HOURS", "24"))
+
+# Documents compared per read transaction
+RECONCILE_BATCH_SIZE = 1000
+
+# ============================
+# Reconciliation
+# ============================
+
+def run_annotation_counts_job(payload: dict) -> dict:
+    """
+    Job handler for "annotation_counts", run in a worker process.
+
+    Only reads; the repairs are made by `save_annotation_counts_result`.
+
+    Args:
+        payload (dict): Unused.
+
+    Returns:
+        dict: The number of documents checked, and the IDs of those whose counters differ.
+    """
+    checked = 0
+    drifted = []
+    after_id = None
+    with SessionLocal() as db:
+        while True:
+            batch, count, after_id = crud.get_annotation_count_drift(db, after_id=after_id, limit=RECONCILE_BATCH_SIZE)
+            db.rollback()  # End the read transaction so writers are not held up between batches
+            checked += count
+            drifted.extend(batch)
+            if after_id is None:
+                break
+    logger.info(f"Checked the annotation counters of {checked} documents; {len(drifted)} differ.")
+    return {"checked": checked, "drifted": drifted}
+
+
+def save_annotation_counts_result(db: Session, payload: dict, result: dict) -> dict:
+    """
+    Recomputes the counters of the documents an "annotation_counts" job found wrong, and schedules the next run.
+
+    The counters are recomputed from the source tables here rather than taken
+    from the job, so annotation writes made while it ran are not undone. Nothing
+    is committed here: the repair and the next run are committed together with
+    the job's completion, or not at all if that fails and the job is retried.
+
+    Args:
+        db (Session): The database session.
+        payload (dict): The job's payload.
+        result (dict): What `run_annotation_counts_job` returned.
+
+    Returns:
+        dict: The number of documents checked and repaired, to record as the job's result.
+    """
+    crud.reconcile_annotation_counts(db, result["drifted"])
+    if result["drifted"]:
+        logger.warning(f"Repaired the annotation counters of {len(result['drifted'])} documents.")
+    schedule_annotation_counts_job(db, datetime.utcnow() + timedelta(hours=ANNOTATION_COUNTS_INTERVAL_HOURS))
+    return {"checked": result["checked"], "repaired": len(result["drifted"])}
+
+
+def schedule_annotation_counts_job(db: Session, run_after: Optional[datetime] = None) -> None:
+    """
+    Queues the next "annotation_counts" job unless one is already queued. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        run_after (datetime, optional): Do not start it before this time. Defaults to now.
+    """
+    # Imported here because the job registry imports this module
+    from .jobs import enqueue_job
+
+    if not crud.has_queued_job(db, "annotation_counts"):
+        enqueue_job(db, "annotation_counts", {}, run_after=run_after)
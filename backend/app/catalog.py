@@ -0,0 +1,159 @@
+# ============================
+# Document Type Catalog Module
+# ============================
+
+"""
+This module serves the document type catalog from an in-process snapshot.
+
+The catalog of document types and their data elements only changes when the
+seeder or an admin writes to it, and every such write bumps the catalog
+revision counter. The snapshot is built from the database once per revision
+and shared, read-only, by every request until the revision moves on, so a
+catalog read costs the revision lookup the ETag needs anyway.
+
+The revision is read from the database rather than tracked in memory, so writes
+made by other processes, such as the seeder or other workers, are picked up too.
+
+The snapshot is also what a document's annotations are checked against to
+report its completeness.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+import bisect
+import logging
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import crud, schemas
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Catalog Snapshot
+# ============================
+
+class CatalogSnapshot(NamedTuple):
+    """
+    The document type catalog as of one catalog revision. Never modified once built.
+    """
+    revision: int  # The catalog revision the snapshot was built at
+    document_types: Tuple[schemas.DocumentType, ...]  # Every document type, ordered by ID
+    document_type_ids: Tuple[int, ...]  # IDs of `document_types`, for seeking to a cursor
+    data_elements: Mapping[int, Tuple[schemas.DocumentTypeDataElement, ...]]  # Data elements by document type ID
+
+
+# The most recently built snapshot; replaced whole, never mutated
+_snapshot: Optional[CatalogSnapshot] = None
+
+
+def build_snapshot(db: Session, revision: int) -> CatalogSnapshot:
+    """
+    Loads the whole catalog from the database.
+
+    Args:
+        db (Session): The database session.
+        revision (int): The catalog revision the caller read.
+
+    Returns:
+        CatalogSnapshot: The catalog, labelled with the given revision.
+    """
+    rows, _ = crud.get_document_types(db, limit=None)
+    document_types = tuple(schemas.DocumentType.model_validate(row, from_attributes=True) for row in rows)
+    return CatalogSnapshot(
+        revision=revision,
+        document_types=document_types,
+        document_type_ids=tuple(document_type.id for document_type in document_types),
+        data_elements=MappingProxyType({
+            document_type.id: tuple(document_type.data_elements) for document_type in document_types
+        }),
+    )
+
+
+def get_catalog(db: Session, revision: int) -> CatalogSnapshot:
+    """
+    Returns the catalog snapshot for a revision, building it if the current one is older.
+
+    Concurrent requests that see a new revision may each build a snapshot; they are
+    equivalent and the last one stored wins, so no lock is taken. A lock would also
+    stall the event loop with the asyncio engine.
+
+    Args:
+        db (Session): The database session.
+        revision (int): The current catalog revision, from `crud.get_revision`.
+
+    Returns:
+        CatalogSnapshot: The catalog as of that revision.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None or snapshot.revision != revision:
+        snapshot = build_snapshot(db, revision)
+        _snapshot = snapshot
+        logger.info(f"Loaded {len(snapshot.document_types)} document types into the catalog snapshot at revision {revision}.")
+    return snapshot
+
+
+def page_document_types(
+    snapshot: CatalogSnapshot,
+    after_id: Optional[int] = None,
+    limit: int = 100
+) -> Tuple[List[schemas.DocumentType], Optional[int]]:
+    """
+    Returns one page of a snapshot's document types, like `crud.get_document_types`.
+
+    Args:
+        snapshot (CatalogSnapshot): The catalog snapshot.
+        after_id (int, optional): Return only document types with an ID greater than this.
+        limit (int, optional): Maximum number of document types to return. Defaults to 100.
+
+    Returns:
+        Tuple[List[schemas.DocumentType], Optional[int]]: The document types and the ID to continue after, if any.
+    """
+    start = 0 if after_id is None else bisect.bisect_right(snapshot.document_type_ids, after_id)
+    page = list(snapshot.document_types[start:start + limit])
+    if start + limit >= len(snapshot.document_types):
+        return page, None
+    return page, page[-1].id
+
+# ============================
+# Document Completeness
+# ============================
+
+def document_completeness(
+    snapshot: CatalogSnapshot,
+    document_id: int,
+    document_type_id: Optional[int],
+    value_counts: Dict[str, int]
+) -> schemas.DocumentCompleteness:
+    """
+    Checks a document's annotations against the data elements of its type.
+
+    Args:
+        snapshot (CatalogSnapshot): The catalog snapshot.
+        document_id (int): The ID of the document.
+        document_type_id (int, optional): The document's type.
+        value_counts (Dict[str, int]): The document's annotation counts by value, from `crud.get_annotation_value_counts`.
+
+    Returns:
+        schemas.DocumentCompleteness: Every element of the type with its annotation count,
+            and those that are missing or duplicated.
+    """
+    elements = [
+        schemas.DataElementCoverage(**element.dict(), annotation_count=value_counts.get(element.name, 0))
+        for element in snapshot.data_elements.get(document_type_id, ())
+    ]
+    missing_required = [element for element in elements if element.is_required and element.annotation_count == 0]
+    duplicated = [element for element in elements if not element.allow_multiple and element.annotation_count > 1]
+    return schemas.DocumentCompleteness(
+        document_id=document_id,
+        document_type_id=document_type_id,
+        is_complete=not missing_required and not duplicated,
+        elements=elements,
+        missing_required=missing_required,
+        duplicated=duplicated,
+    )
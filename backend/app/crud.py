@@ -2,14 +2,91 @@
 # CRUD Operations Module
 # ============================
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import delete, false, func, insert, literal_column, or_, select, update, Row
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import re
+from collections import Counter
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
 
 # Local Imports
 from . import models, schemas
-from .models import Document, Annotation, DocumentType, DataElement, document_data_elements
+from .pagination import keyset_page
+from .models import Document, Annotation, AnnotationChange, AnnotationPageCount, AnnotationValueCount, DocumentType, DataElement, document_data_elements, annotation_rtree, annotation_fts, page_text_fts
+
+
+# ============================
+# Revision Operations
+# ============================
+
+# Names of the collection-wide revision counters
+DOCUMENTS_REVISION = "documents"  # Bumped by any document or annotation write
+CATALOG_REVISION = "catalog"      # Bumped by any document type or data element write
+
+
+def get_revision(db: Session, name: str) -> int:
+    """
+    Retrieve the current value of a named revision counter.
+
+    Args:
+        db (Session): The database session.
+        name (str): The counter name, e.g. DOCUMENTS_REVISION or CATALOG_REVISION.
+
+    Returns:
+        int: The current revision, or 0 if the counter does not exist.
+    """
+    value = db.query(models.RevisionCounter.value)\
+        .filter(models.RevisionCounter.name == name)\
+        .scalar()
+    return value or 0
+
+
+def bump_revision(db: Session, name: str, amount: int = 1) -> None:
+    """
+    Increment a named revision counter. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        name (str): The counter name.
+        amount (int, optional): How much to increment the counter by.
+    """
+    db.query(models.RevisionCounter)\
+        .filter(models.RevisionCounter.name == name)\
+        .update({models.RevisionCounter.value: models.RevisionCounter.value + amount}, synchronize_session=False)
+
+
+def get_document_revision(db: Session, document_id: int) -> Optional[int]:
+    """
+    Retrieve the current revision of a document without loading the row.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+
+    Returns:
+        Optional[int]: The document's revision, or None if it does not exist.
+    """
+    return db.query(models.Document.revision)\
+        .filter(models.Document.id == document_id)\
+        .scalar()
+
+
+def bump_document_revision(db: Session, document_id: int, amount: int = 1) -> None:
+    """
+    Increment a document's revision and the documents counter. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document that changed.
+        amount (int, optional): How much to increment the revisions by.
+    """
+    db.query(models.Document)\
+        .filter(models.Document.id == document_id)\
+        .update({models.Document.revision: models.Document.revision + amount}, synchronize_session=False)
+    bump_revision(db, DOCUMENTS_REVISION, amount)
 
 
 # ============================
@@ -21,27 +98,68 @@ def get_document(db: Session, document_id: int) -> Optional[Document]:
     Retrieve a single document by its ID, including its document_type.
     """
     document = db.query(models.Document)\
-        .options(joinedload(models.Document.document_type))\
+        .options(joinedload(models.Document.document_type).selectinload(models.DocumentType.data_elements))\
         .filter(models.Document.id == document_id)\
         .first()
 
     return document
 
 
-def get_documents(db: Session, skip: int = 0, limit: int = 100) -> List[Document]:
+def load_document_type(db: Session, document: Optional[Document]) -> None:
+    """
+    Load a document's type and the type's data elements, so the document can be serialized without further queries.
+
+    Args:
+        db (Session): The database session.
+        document (Optional[Document]): The document, which may already have its type loaded.
+    """
+    if document is None or document.document_type_id is None:
+        return
+    document_type = db.query(models.DocumentType)\
+        .options(selectinload(models.DocumentType.data_elements))\
+        .filter(models.DocumentType.id == document.document_type_id)\
+        .populate_existing()\
+        .one()
+    set_committed_value(document, "document_type", document_type)
+
+
+def get_document_with_data_elements(db: Session, document_id: int) -> Optional[Document]:
+    """
+    Retrieve a single document by its ID with its document_type and the type's data elements.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+
+    Returns:
+        Optional[Document]: The document, or None if it does not exist.
+    """
+    document = db.query(models.Document)\
+        .options(joinedload(models.Document.document_type).selectinload(models.DocumentType.data_elements))\
+        .filter(models.Document.id == document_id)\
+        .first()
+    return document
+
+
+def get_documents(
+    db: Session,
+    after_id: Optional[int] = None,
+    limit: int = 100
+) -> Tuple[List[Document], Optional[int]]:
     """
-    Retrieve a list of documents with pagination.
+    Retrieve a page of documents using keyset pagination ordered by ID.
 
     Args:
         db (Session): The database session.
-        skip (int, optional): Number of records to skip. Defaults to 0.
+        after_id (int, optional): Return only documents with an ID greater than this.
         limit (int, optional): Maximum number of records to return. Defaults to 100.
 
     Returns:
-        List[Document]: A list of documents.
+        Tuple[List[Document], Optional[int]]: The documents and the ID to continue after, if any.
     """
-    documents = db.query(models.Document).offset(skip).limit(limit).all()
-    return documents
+    query = db.query(models.Document)\
+        .options(joinedload(models.Document.document_type).selectinload(models.DocumentType.data_elements))
+    return keyset_page(query, models.Document.id, after_id=after_id, limit=limit)
 
 
 def create_document(db: Session, file_path: str) -> Document:
@@ -57,42 +175,156 @@ def create_document(db: Session, file_path: str) -> Document:
     """
     db_document = models.Document(file_path=file_path)
     db.add(db_document)
+    bump_revision(db, DOCUMENTS_REVISION)
     db.commit()
     db.refresh(db_document)
     return db_document
 
 
-def create_or_update_document(db: Session, file_path: str, document_type_id: int) -> Document:
+def acquire_blob(db: Session, content_hash: str, size: int) -> bool:
     """
-    Create a new document or update the upload timestamp if it already exists.
+    Adds a reference to the blob with the given digest, recording it if it is new.
+
+    Uses a single INSERT ... ON CONFLICT statement so that concurrent uploads of
+    the same new contents cannot both try to insert the blob. The reference count,
+    not the file system, decides whether the file has to be written: only the
+    upload holding the first reference writes it.
 
     Args:
         db (Session): The database session.
-        file_path (str): The file path of the uploaded document.
+        content_hash (str): Hex SHA-256 digest of the stored file.
+        size (int): Size of the stored file in bytes.
+
+    Returns:
+        bool: True if this is the only reference, so the file may not have been written yet.
+    """
+    dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = dialect_insert(models.Blob).values(content_hash=content_hash, size=size, ref_count=1)
+    ref_count = db.scalar(statement.on_conflict_do_update(
+        index_elements=[models.Blob.content_hash],
+        set_={"ref_count": models.Blob.ref_count + 1},
+    ).returning(models.Blob.ref_count))
+    return ref_count == 1
+
+
+def release_blob(db: Session, content_hash: str) -> bool:
+    """
+    Drops a reference to the blob with the given digest.
+
+    The blob is kept at a reference count of zero until `forget_blob` deletes it
+    together with its file, so an upload of the same contents in between simply
+    takes it back.
+
+    Args:
+        db (Session): The database session.
+        content_hash (str): Hex SHA-256 digest of the stored file.
+
+    Returns:
+        bool: True if no document references the blob any more and it should be passed to `forget_blob` after commit.
+    """
+    ref_count = db.scalar(
+        update(models.Blob)
+        .where(models.Blob.content_hash == content_hash)
+        .values(ref_count=models.Blob.ref_count - 1)
+        .returning(models.Blob.ref_count)
+    )
+    return ref_count is not None and ref_count <= 0
+
+
+def forget_blob(db: Session, content_hash: str) -> bool:
+    """
+    Deletes the blob with the given digest if it is still unreferenced. The caller is responsible for committing.
+
+    The delete locks the blob until the transaction ends, so an upload of the same
+    contents waits for it instead of taking a reference to a file that is about to
+    be removed. Remove the files before committing.
+
+    Args:
+        db (Session): The database session.
+        content_hash (str): Hex SHA-256 digest of the stored file.
+
+    Returns:
+        bool: True if the blob was deleted and its files must be removed.
+    """
+    deleted = db.query(models.Blob)\
+        .filter(models.Blob.content_hash == content_hash, models.Blob.ref_count <= 0)\
+        .delete(synchronize_session=False)
+    return deleted > 0
+
+
+def set_blob_linearized(db: Session, content_hash: str, linearized: bool) -> None:
+    """
+    Records whether a blob has a linearized copy. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        content_hash (str): Hex SHA-256 digest of the stored file.
+        linearized (bool): True if a linearized copy is stored next to the blob.
+    """
+    db.query(models.Blob)\
+        .filter(models.Blob.content_hash == content_hash)\
+        .update({models.Blob.linearized: linearized}, synchronize_session=False)
+
+
+def create_or_update_document(
+    db: Session, file_path: str, document_type_id: int, content_hash: str
+) -> Tuple[Document, Optional[str]]:
+    """
+    Create a new document or point an existing one at newly uploaded contents. The caller is responsible for committing.
+
+    The document takes over a reference to the blob holding its contents that the
+    caller already acquired with `acquire_blob`. If a re-upload releases the only
+    reference to the previous blob, its digest is returned so the caller can pass
+    it to `forget_blob` once the transaction has committed.
+
+    Args:
+        db (Session): The database session.
+        file_path (str): The name the document was uploaded under.
         document_type_id (int): The ID of the associated document type.
+        content_hash (str): Hex SHA-256 digest of the uploaded contents.
 
     Returns:
-        Document: The created or updated document instance.
+        Tuple[Document, Optional[str]]: The created or updated document instance, and
+            the digest of a blob left unreferenced by the update, if any.
     """
     # Attempt to retrieve the document by its file path
     document = db.query(models.Document).filter(models.Document.file_path == file_path).first()
-    
+    orphaned_hash = None
+
     if document:
         # Document exists; update the 'uploaded_at' timestamp
         document.uploaded_at = datetime.utcnow()
         # Update the document type if provided
         if document_type_id:
             document.document_type_id = document_type_id
-        db.commit()
+        if document.content_hash == content_hash:
+            release_blob(db, content_hash)  # The document already holds a reference
+        else:
+            previous_hash = document.content_hash
+            document.content_hash = content_hash
+            db.flush()  # Stop referencing the previous blob before releasing it
+            if previous_hash and release_blob(db, previous_hash):
+                orphaned_hash = previous_hash
+            reset_document_pages(db, document)
+            reset_document_text(db, document)
+        db.flush()  # Write the document type the completeness is computed against
+        refresh_document_completeness(db, Document.id == document.id)
+        bump_document_revision(db, document.id)
+        db.flush()
         db.refresh(document)  # Refresh to get the latest state
-        return document
+        return document, orphaned_hash
     else:
         # Document does not exist; create a new entry
-        db_document = models.Document(file_path=file_path, document_type_id=document_type_id)
+        db_document = models.Document(file_path=file_path, document_type_id=document_type_id, content_hash=content_hash)
         db.add(db_document)
-        db.commit()
-        db.refresh(db_document)  # Refresh to get the generated ID and other fields
-        return db_document
+        db.flush()  # Assign the ID the copied pages refer to
+        reset_document_pages(db, db_document)
+        reset_document_text(db, db_document)
+        refresh_document_completeness(db, Document.id == db_document.id)
+        bump_revision(db, DOCUMENTS_REVISION)
+        db.flush()
+        db.refresh(db_document)  # Refresh to get the copied pages and other fields
+        return db_document, None
 
 
 def create_document_type(db: Session, name: str, description: str = None) -> models.DocumentType:
@@ -109,36 +341,36 @@ def create_document_type(db: Session, name: str, description: str = None) -> mod
     """
     db_document_type = models.DocumentType(name=name, description=description)
     db.add(db_document_type)
+    bump_revision(db, CATALOG_REVISION)
     db.commit()
     db.refresh(db_document_type)
     return db_document_type
 
-def get_document_types(db: Session, skip: int = 0, limit: int = 100) -> List[DocumentType]:
+def get_document_types(
+    db: Session,
+    after_id: Optional[int] = None,
+    limit: int = 100
+) -> Tuple[List[DocumentType], Optional[int]]:
     """
-    Retrieve a list of document types with pagination.
+    Retrieve a page of document types using keyset pagination ordered by ID.
+
+    The data elements of the whole page, with their per-type constraints, are
+    loaded by a single additional query.
 
     Args:
         db (Session): The database session.
-        skip (int, optional): Number of records to skip. Defaults to 0.
-        limit (int, optional): Maximum number of records to return. Defaults to 100.
+        after_id (int, optional): Return only document types with an ID greater than this.
+        limit (int, optional): Maximum number of records to return. None returns all of them. Defaults to 100.
 
     Returns:
-        List[DocumentType]: A list of document types.
+        Tuple[List[DocumentType], Optional[int]]: The document types and the ID to continue after, if any.
     """
-    document_types = db.query(models.DocumentType).offset(skip).limit(limit).all()
-    
-    # Fetch associated data elements for each document type
-    for document_type in document_types:
-        data_elements = db.query(models.DataElement).join(
-            document_data_elements
-        ).filter(
-            document_data_elements.c.document_type_id == document_type.id
-        ).all()
-        document_type.data_elements = data_elements
-
-    return document_types
+    return keyset_page(
+        db.query(models.DocumentType).options(selectinload(models.DocumentType.data_elements)),
+        models.DocumentType.id, after_id=after_id, limit=limit
+    )
 
-def get_data_elements_for_document_type(db: Session, document_type_id: int) -> List[DataElement]:
+def get_data_elements_for_document_type(db: Session, document_type_id: int) -> List[models.DocumentTypeDataElement]:
     """
     Retrieve all data elements associated with a specific document type.
 
@@ -147,15 +379,21 @@ def get_data_elements_for_document_type(db: Session, document_type_id: int) -> L
         document_type_id (int): The ID of the document type.
 
     Returns:
-        List[DataElement]: A list of data elements for the document type.
+        List[models.DocumentTypeDataElement]: The type's data elements with their constraints, ordered by ID.
     """
-    data_elements = db.query(models.DataElement).join(
-        document_data_elements
-    ).filter(
-        document_data_elements.c.document_type_id == document_type_id
-    ).all()
+    data_elements = db.query(models.DocumentTypeDataElement)\
+        .filter(models.DocumentTypeDataElement.document_type_id == document_type_id)\
+        .order_by(models.DocumentTypeDataElement.data_element_id)\
+        .all()
     return data_elements
 
+def get_data_element(db: Session, data_element_id: int) -> Optional[DataElement]:
+    """
+    Retrieve a single data element by its ID.
+    """
+    return db.get(models.DataElement, data_element_id)
+
+
 def create_data_element(db: Session, name: str, description: str = None) -> models.DataElement:
     """
     Create a new DataElement in the database.
@@ -170,6 +408,7 @@ def create_data_element(db: Session, name: str, description: str = None) -> mode
     """
     db_data_element = models.DataElement(name=name, description=description)
     db.add(db_data_element)
+    bump_revision(db, CATALOG_REVISION)
     db.commit()
     db.refresh(db_data_element)
     return db_data_element
@@ -200,6 +439,8 @@ def associate_data_element_with_document_type(
     )
     try:
         db.execute(association)
+        refresh_document_completeness(db, Document.document_type_id == document_type_id)
+        bump_revision(db, CATALOG_REVISION)
         db.commit()
         print(f"DataElement ID {data_element_id} associated with DocumentType ID {document_type_id}.")
     except Exception as e:
@@ -207,6 +448,308 @@ def associate_data_element_with_document_type(
         print(f"Failed to associate DataElement ID {data_element_id} with DocumentType ID {document_type_id}: {e}")
 
 
+# ============================
+# Document Page Operations
+# ============================
+
+# Slack, in points, allowed when checking annotation boxes against page bounds
+PAGE_BOUNDS_TOLERANCE = 1.0
+
+
+class AnnotationBox(NamedTuple):
+    """
+    Where an annotation is placed, for checking it against its page.
+    """
+    document_id: int
+    page: int
+    x: float
+    y: float
+    width: float
+    height: float
+
+
+def reset_document_pages(db: Session, document: Document) -> None:
+    """
+    Replace a document's pages after its contents changed. The caller is responsible for committing.
+
+    Pages are copied from another document with the same contents when one has
+    them already; otherwise the page count is cleared until extraction runs.
+
+    Args:
+        db (Session): The database session.
+        document (Document): The flushed document, pointing at its new contents.
+    """
+    db.query(models.DocumentPage)\
+        .filter(models.DocumentPage.document_id == document.id)\
+        .delete(synchronize_session=False)
+    source = db.query(models.Document.id, models.Document.page_count)\
+        .filter(
+            models.Document.content_hash == document.content_hash,
+            models.Document.id != document.id,
+            models.Document.page_count.isnot(None),
+        )\
+        .first()
+    if source is None:
+        document.page_count = None
+        return
+
+    columns = [models.DocumentPage.page_number, models.DocumentPage.width, models.DocumentPage.height, models.DocumentPage.rotation]
+    copied = select(document.id, *columns).where(models.DocumentPage.document_id == source.id)
+    db.execute(insert(models.DocumentPage).from_select(["document_id", "page_number", "width", "height", "rotation"], copied))
+    document.page_count = source.page_count
+
+
+def replace_document_pages(db: Session, document_id: int, content_hash: str, pages: List[List[float]]) -> bool:
+    """
+    Store the extracted pages of a document's contents and bump its revision. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+        content_hash (str): Digest of the contents the pages were extracted from.
+        pages (List[List[float]]): Width, height and rotation of each page, in page order.
+
+    Returns:
+        bool: False if the document no longer exists or now has other contents, in which case nothing is stored.
+    """
+    updated = db.query(models.Document)\
+        .filter(models.Document.id == document_id, models.Document.content_hash == content_hash)\
+        .update({models.Document.page_count: len(pages)}, synchronize_session=False)
+    if not updated:
+        return False
+    db.query(models.DocumentPage)\
+        .filter(models.DocumentPage.document_id == document_id)\
+        .delete(synchronize_session=False)
+    if pages:
+        db.execute(insert(models.DocumentPage), [
+            {"document_id": document_id, "page_number": number, "width": width, "height": height, "rotation": rotation}
+            for number, (width, height, rotation) in enumerate(pages, start=1)
+        ])
+    # The page count is part of the document's representation, so cached copies are now stale
+    bump_document_revision(db, document_id)
+    return True
+
+
+def get_annotation_geometry_errors(db: Session, boxes: Sequence[Any]) -> List[Optional[str]]:
+    """
+    Check annotation boxes against the extracted pages of their documents, with two queries for the whole batch.
+
+    Boxes on documents whose pages are not known yet, or that do not exist, are not checked.
+
+    Args:
+        db (Session): The database session.
+        boxes (Sequence[Any]): Objects with the fields of `AnnotationBox`, such as `schemas.AnnotationCreate`.
+
+    Returns:
+        List[Optional[str]]: For each box, why it does not fit its page, or None if it does.
+    """
+    document_ids = {box.document_id for box in boxes}
+    if not document_ids:
+        return []
+    page_counts: Dict[int, int] = dict(
+        db.query(models.Document.id, models.Document.page_count)\
+            .filter(models.Document.id.in_(document_ids), models.Document.page_count.isnot(None))\
+            .all()
+    )
+    sizes: Dict[Tuple[int, int], Tuple[float, float]] = {}
+    if page_counts:
+        rows = db.query(models.DocumentPage)\
+            .filter(
+                models.DocumentPage.document_id.in_(page_counts.keys()),
+                models.DocumentPage.page_number.in_({box.page for box in boxes}),
+            )\
+            .all()
+        sizes = {(row.document_id, row.page_number): row.display_size for row in rows}
+
+    errors = []
+    for box in boxes:
+        page_count = page_counts.get(box.document_id)
+        if page_count is None:
+            errors.append(None)
+        elif not 1 <= box.page <= page_count:
+            errors.append(f"Page {box.page} is out of range; document {box.document_id} has {page_count} pages.")
+        else:
+            width, height = sizes[(box.document_id, box.page)]
+            fits = box.x >= -PAGE_BOUNDS_TOLERANCE and box.y >= -PAGE_BOUNDS_TOLERANCE\
+                and box.x + box.width <= width + PAGE_BOUNDS_TOLERANCE\
+                and box.y + box.height <= height + PAGE_BOUNDS_TOLERANCE
+            errors.append(None if fits else f"Annotation box lies outside page {box.page}, which is {width:g} x {height:g} points.")
+    return errors
+
+
+# ============================
+# Page Text Search Operations
+# ============================
+
+# Characters of context shown around the first match when the database has no full-text index
+SNIPPET_CONTEXT_CHARS = 80
+
+# Markers around matched terms in search snippets
+SNIPPET_OPEN = "<mark>"
+SNIPPET_CLOSE = "</mark>"
+
+# A double-quoted phrase, or a run of non-space characters
+_SEARCH_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+
+class SearchHit(NamedTuple):
+    """
+    A document page matching a search.
+    """
+    document_id: int
+    file_path: str
+    page_number: int
+    snippet: str
+    score: float
+
+
+def reset_document_text(db: Session, document: Document) -> None:
+    """
+    Replace a document's page text after its contents changed. The caller is responsible for committing.
+
+    The text is copied from another document with the same contents when one is
+    indexed already; otherwise it is marked pending until extraction runs.
+
+    Args:
+        db (Session): The database session.
+        document (Document): The flushed document, pointing at its new contents.
+    """
+    db.query(models.DocumentPageText)\
+        .filter(models.DocumentPageText.document_id == document.id)\
+        .delete(synchronize_session=False)
+    source_id = db.query(models.Document.id)\
+        .filter(
+            models.Document.content_hash == document.content_hash,
+            models.Document.id != document.id,
+            models.Document.text_indexed.is_(True),
+        )\
+        .scalar()
+    if source_id is None:
+        document.text_indexed = None
+        return
+
+    copied = select(document.id, models.DocumentPageText.page_number, models.DocumentPageText.text)\
+        .where(models.DocumentPageText.document_id == source_id)
+    db.execute(insert(models.DocumentPageText).from_select(["document_id", "page_number", "text"], copied))
+    document.text_indexed = True
+
+
+def replace_document_text(db: Session, document_id: int, content_hash: str, texts: Optional[List[str]]) -> bool:
+    """
+    Store the extracted page text of a document's contents and bump its revision. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+        content_hash (str): Digest of the contents the text was extracted from.
+        texts (Optional[List[str]]): The text of each page in page order, or None if the contents could not be read.
+
+    Returns:
+        bool: False if the document no longer exists or now has other contents, in which case nothing is stored.
+    """
+    updated = db.query(models.Document)\
+        .filter(models.Document.id == document_id, models.Document.content_hash == content_hash)\
+        .update({models.Document.text_indexed: texts is not None}, synchronize_session=False)
+    if not updated:
+        return False
+    db.query(models.DocumentPageText)\
+        .filter(models.DocumentPageText.document_id == document_id)\
+        .delete(synchronize_session=False)
+    if texts:
+        db.execute(insert(models.DocumentPageText), [
+            {"document_id": document_id, "page_number": number, "text": text}
+            for number, text in enumerate(texts, start=1)
+        ])
+    # Whether the text is indexed is part of the document's representation, so cached copies are now stale
+    bump_document_revision(db, document_id)
+    return True
+
+
+def parse_search_terms(query: str) -> List[str]:
+    """
+    Split a search query into its terms: double-quoted phrases and single words.
+
+    Args:
+        query (str): The query as typed, e.g. '"Applicable Margin" LIBOR'.
+
+    Returns:
+        List[str]: The non-empty phrases and words, in order.
+    """
+    terms = []
+    for phrase, word in _SEARCH_TERM.findall(query):
+        term = " ".join((phrase or word).split())
+        if term:
+            terms.append(term)
+    return terms
+
+
+def _fallback_snippet(text: str, terms: List[str]) -> str:
+    lowered = text.lower()
+    start = min((i for i in (lowered.find(term.lower()) for term in terms) if i >= 0), default=0)
+    begin = max(0, start - SNIPPET_CONTEXT_CHARS)
+    end = min(len(text), start + SNIPPET_CONTEXT_CHARS)
+    return ("…" if begin else "") + text[begin:end] + ("…" if end < len(text) else "")
+
+
+def search_page_text(db: Session, terms: List[str], limit: int, offset: int = 0) -> List[SearchHit]:
+    """
+    Find the document pages containing every term, best matches first.
+
+    On SQLite the `page_text_fts` index answers the query: each term must appear
+    as a word or, for phrases, as consecutive words, and the snippet marks the
+    matches. Every match is ranked by BM25 inside FTS5, which sorts on its own
+    `rank` column and stops after the requested page of hits, so only those are
+    joined to their pages and documents and given a snippet. Elsewhere the pages
+    are scanned for each term as a case-insensitive substring and returned in
+    document order.
+
+    Args:
+        db (Session): The database session.
+        terms (List[str]): Phrases and words from `parse_search_terms`; must not be empty.
+        limit (int): The maximum number of hits.
+        offset (int, optional): The number of hits to skip. Defaults to 0.
+
+    Returns:
+        List[SearchHit]: The hits; a higher score is a better match.
+    """
+    text = models.DocumentPageText
+    if db.get_bind().dialect.name == "sqlite":
+        # Quote every term so user input is never parsed as FTS5 query syntax
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        matches = literal_column("page_text_fts").op("MATCH")
+        snippet = func.snippet(literal_column("page_text_fts"), 0, SNIPPET_OPEN, SNIPPET_CLOSE, "…", 16)
+        rank = literal_column("page_text_fts.rank")
+        # ORDER BY rank with a LIMIT is consumed by FTS5 itself, so no sorter sees the snippets
+        hits = select(
+                page_text_fts.c.rowid.label("id"),
+                snippet.label("snippet"),
+                (-rank).label("score"),
+            )\
+            .where(matches(match))\
+            .order_by(rank)\
+            .limit(limit)\
+            .offset(offset)\
+            .subquery()
+        rows = db.query(text.document_id, Document.file_path, text.page_number, hits.c.snippet, hits.c.score)\
+            .join(hits, hits.c.id == text.id)\
+            .join(Document, Document.id == text.document_id)\
+            .order_by(hits.c.score.desc(), text.id)\
+            .all()
+        return [SearchHit(*row) for row in rows]
+
+    rows = db.query(text.document_id, Document.file_path, text.page_number, text.text)\
+        .join(Document, Document.id == text.document_id)\
+        .filter(*(text.text.icontains(term, autoescape=True) for term in terms))\
+        .order_by(text.document_id, text.page_number)\
+        .limit(limit)\
+        .offset(offset)\
+        .all()
+    return [
+        SearchHit(row.document_id, row.file_path, row.page_number, _fallback_snippet(row.text, terms), 0.0)
+        for row in rows
+    ]
+
+
 # ============================
 # Annotation CRUD Operations
 # ============================
@@ -230,60 +773,1144 @@ def create_annotation(db: Session, annotation: schemas.AnnotationCreate) -> Anno
         width=annotation.width,        # Width of the annotation area
         height=annotation.height,      # Height of the annotation area
         value=annotation.value,        # Annotation title or name
-        annotation_value=annotation.annotation_value  # Additional annotation details
+        annotation_value=annotation.annotation_value,  # Additional annotation details
+        created_by=annotation.created_by  # User who created the annotation
     )
     db.add(db_annotation)
+    db.flush()  # Assign the ID so the change feed can reference it
+    adjust_annotation_counts(db, Counter({(annotation.document_id, annotation.page): 1}))
+    adjust_annotation_value_counts(db, Counter({(annotation.document_id, annotation.value): 1}))
+    record_annotation_change(db, annotation.document_id, db_annotation.id, ANNOTATION_CREATED)
     db.commit()
     db.refresh(db_annotation)
     return db_annotation
 
 
-def get_annotations_by_document(db: Session, document_id: int) -> List[Annotation]:
+# Number of rows sent per multi-row INSERT by the bulk create path
+BULK_INSERT_CHUNK_SIZE = 500
+
+
+def get_existing_document_ids(db: Session, document_ids: Iterable[int]) -> Set[int]:
     """
-    Retrieve all annotations associated with a specific document.
+    Return the subset of the given document IDs that exist.
 
     Args:
         db (Session): The database session.
-        document_id (int): The ID of the document.
+        document_ids (Iterable[int]): Candidate document IDs.
 
     Returns:
-        List[Annotation]: A list of annotations for the document.
+        Set[int]: The IDs that refer to existing documents.
     """
-    annotations = db.query(models.Annotation).filter(models.Annotation.document_id == document_id).all()
-    return annotations
+    document_ids = set(document_ids)
+    if not document_ids:
+        return set()
+    rows = db.query(models.Document.id).filter(models.Document.id.in_(document_ids)).all()
+    return {row.id for row in rows}
 
 
-# ============================
-# Combined Query Operations
-# ============================
-
-def get_documents_with_annotation_count(db: Session) -> List[schemas.DocumentWithAnnotationsCount]:
+def insert_annotations_chunk(db: Session, annotations: List[schemas.AnnotationCreate]) -> List[int]:
     """
-    Retrieve all documents along with the count of annotations associated with each.
+    Insert a chunk of annotations with a single multi-row INSERT. The caller is responsible for committing.
+
+    The annotation counters are updated here, but the change feed is not; call
+    `record_bulk_annotation_changes` once with every inserted annotation before committing.
 
     Args:
         db (Session): The database session.
+        annotations (List[schemas.AnnotationCreate]): The validated annotations to insert.
 
     Returns:
-        List[schemas.DocumentWithAnnotationsCount]: A list of documents with their annotation counts.
+        List[int]: The new annotation IDs, in the same order as the input.
     """
-    # Perform a left outer join between Document and Annotation, grouping by Document.id
-    results = db.query(
-        Document.id,
-        Document.file_path,
-        Document.uploaded_at,
-        func.count(Annotation.id).label('annotation_count')
-    ).outerjoin(Annotation).group_by(Document.id).all()
-
-    # Convert the results into the desired schema format
-    documents_with_counts = [
-        schemas.DocumentWithAnnotationsCount(
-            id=doc.id,
-            file_path=doc.file_path,
-            uploaded_at=doc.uploaded_at,
-            annotation_count=doc.annotation_count
-        )
-        for doc in results
+    if not annotations:
+        return []
+    rows = [
+        {
+            "document_id": annotation.document_id,
+            "page": annotation.page,
+            "x": annotation.x,
+            "y": annotation.y,
+            "width": annotation.width,
+            "height": annotation.height,
+            "value": annotation.value,
+            "annotation_value": annotation.annotation_value,
+            "created_by": annotation.created_by,
+        }
+        for annotation in annotations
     ]
+    statement = insert(models.Annotation).returning(models.Annotation.id, sort_by_parameter_order=True)
+    new_ids = list(db.scalars(statement, rows))
+    adjust_annotation_counts(db, Counter((annotation.document_id, annotation.page) for annotation in annotations))
+    adjust_annotation_value_counts(db, Counter((annotation.document_id, annotation.value) for annotation in annotations))
+    return new_ids
+
+
+def create_annotations(
+    db: Session,
+    annotations: List[schemas.AnnotationCreate]
+) -> List[Optional[Tuple[Annotation, int]]]:
+    """
+    Create a group of annotations from independent requests in a single transaction.
+
+    Unlike the bulk path, every annotation gets its own document revision, exactly
+    as if each had been created by `create_annotation`, so live clients can apply
+    them one by one. Annotations on unknown documents are skipped.
+
+    Args:
+        db (Session): The database session.
+        annotations (List[schemas.AnnotationCreate]): The validated annotations, at most BULK_INSERT_CHUNK_SIZE.
+
+    Returns:
+        List[Optional[Tuple[Annotation, int]]]: For each input, the created annotation with its
+            document loaded and the revision it produced, or None if its document does not exist.
+    """
+    existing_ids = get_existing_document_ids(db, {annotation.document_id for annotation in annotations})
+    valid = [annotation for annotation in annotations if annotation.document_id in existing_ids]
+    new_ids = insert_annotations_chunk(db, valid)
+    created = [(annotation.document_id, new_id) for annotation, new_id in zip(valid, new_ids)]
+    revisions = record_bulk_annotation_changes(db, created, revision_per_annotation=True)
+    db.commit()
+
+    # Load after committing so the returned objects outlive the session fully populated
+    loaded = {
+        annotation.id: annotation
+        for annotation in db.query(models.Annotation)
+            .options(
+                joinedload(models.Annotation.document)
+                .joinedload(models.Document.document_type)
+                .selectinload(models.DocumentType.data_elements)
+            )
+            .filter(models.Annotation.id.in_(new_ids))
+    }
+    created_results = iter(zip(new_ids, revisions))
+    results = []
+    for annotation in annotations:
+        if annotation.document_id in existing_ids:
+            new_id, revision = next(created_results)
+            results.append((loaded[new_id], revision))
+        else:
+            results.append(None)
+    return results
+
+
+def get_annotation(db: Session, document_id: int, annotation_id: int) -> Optional[Annotation]:
+    """
+    Retrieve a single annotation of a document.
+    """
+    return db.query(models.Annotation)\
+        .filter(models.Annotation.id == annotation_id, models.Annotation.document_id == document_id)\
+        .first()
+
+
+def update_annotation(
+    db: Session,
+    document_id: int,
+    annotation_id: int,
+    changes: schemas.AnnotationUpdate
+) -> Optional[Annotation]:
+    """
+    Update the fields of an existing annotation that were provided in the request.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document the annotation belongs to.
+        annotation_id (int): The ID of the annotation.
+        changes (schemas.AnnotationUpdate): The fields to change.
+
+    Returns:
+        Optional[Annotation]: The updated annotation, or None if it does not exist.
+    """
+    db_annotation = db.query(models.Annotation)\
+        .filter(models.Annotation.id == annotation_id, models.Annotation.document_id == document_id)\
+        .first()
+    if db_annotation is None:
+        return None
+
+    old_page, old_value = db_annotation.page, db_annotation.value
+    for field, value in changes.dict(exclude_unset=True).items():
+        setattr(db_annotation, field, value)
+    db.flush()
+    if db_annotation.page != old_page:
+        adjust_annotation_counts(db, Counter({(document_id, old_page): -1, (document_id, db_annotation.page): 1}))
+    if db_annotation.value != old_value:
+        adjust_annotation_value_counts(db, Counter({(document_id, old_value): -1, (document_id, db_annotation.value): 1}))
+    record_annotation_change(db, document_id, annotation_id, ANNOTATION_UPDATED)
+    db.commit()
+    db.refresh(db_annotation)
+    return db_annotation
+
+
+def delete_annotation(db: Session, document_id: int, annotation_id: int) -> bool:
+    """
+    Delete an annotation, leaving a tombstone in the change feed.
 
-    return documents_with_counts
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document the annotation belongs to.
+        annotation_id (int): The ID of the annotation.
+
+    Returns:
+        bool: True if the annotation existed and was deleted.
+    """
+    deleted = db.execute(
+        delete(models.Annotation)
+            .where(models.Annotation.id == annotation_id, models.Annotation.document_id == document_id)
+            .returning(models.Annotation.page, models.Annotation.value)
+            .execution_options(synchronize_session=False)
+    ).first()
+    if deleted is None:
+        return False
+
+    adjust_annotation_counts(db, Counter({(document_id, deleted.page): -1}))
+    adjust_annotation_value_counts(db, Counter({(document_id, deleted.value): -1}))
+    record_annotation_change(db, document_id, annotation_id, ANNOTATION_DELETED)
+    db.commit()
+    return True
+
+
+def get_annotations_by_document(
+    db: Session,
+    document_id: int,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[Annotation], Optional[int]]:
+    """
+    Retrieve the annotations associated with a specific document, ordered by ID.
+
+    The parent document, its document type and the type's data elements are
+    loaded once and attached to every annotation, so serializing the nested
+    response costs a fixed number of queries regardless of annotation count.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+        after_id (int, optional): Return only annotations with an ID greater than this.
+        limit (int, optional): Maximum number of records to return. None returns all.
+
+    Returns:
+        Tuple[List[Annotation], Optional[int]]: The annotations and the ID to continue after, if any.
+    """
+    # Load the document and its catalog entry once; shared by every annotation below
+    document = get_document_with_data_elements(db, document_id=document_id)
+    if document is None:
+        return [], None
+
+    query = db.query(models.Annotation)\
+        .options(raiseload(models.Annotation.document))\
+        .filter(models.Annotation.document_id == document_id)
+    annotations, next_after_id = keyset_page(query, models.Annotation.id, after_id=after_id, limit=limit)
+
+    # Point every annotation at the already-loaded document without extra SELECTs
+    for annotation in annotations:
+        set_committed_value(annotation, "document", document)
+
+    return annotations, next_after_id
+
+
+# Columns selected for the compact annotation projection
+SLIM_ANNOTATION_COLUMNS = (
+    Annotation.id,
+    Annotation.page,
+    Annotation.x,
+    Annotation.y,
+    Annotation.width,
+    Annotation.height,
+    Annotation.value,
+    Annotation.annotation_value,
+    Annotation.created_by,
+    Annotation.created_at,
+)
+
+
+def get_slim_annotations_by_document(
+    db: Session,
+    document_id: int,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[Row], Optional[int]]:
+    """
+    Retrieve the compact projection of a document's annotations, ordered by ID.
+
+    Only the annotation's own display columns are selected; the parent document
+    is not loaded or repeated per row.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+        after_id (int, optional): Return only annotations with an ID greater than this.
+        limit (int, optional): Maximum number of records to return. None returns all.
+
+    Returns:
+        Tuple[List[Row], Optional[int]]: Compact annotation rows and the ID to continue after, if any.
+    """
+    query = db.query(*SLIM_ANNOTATION_COLUMNS)\
+        .filter(Annotation.document_id == document_id)
+    return keyset_page(query, Annotation.id, after_id=after_id, limit=limit)
+
+
+def get_annotations_by_page_range(db: Session, document_id: int, first_page: int, last_page: int) -> List[Row]:
+    """
+    Retrieve the compact projection of a document's annotations on a range of pages.
+
+    The filter matches the (document_id, page) composite index, so the lookup
+    is an index range scan rather than a scan of the whole table.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+        first_page (int): First page of the range (inclusive).
+        last_page (int): Last page of the range (inclusive).
+
+    Returns:
+        List[Row]: Compact annotation rows ordered by page.
+    """
+    rows = db.query(*SLIM_ANNOTATION_COLUMNS)\
+        .filter(
+            Annotation.document_id == document_id,
+            Annotation.page >= first_page,
+            Annotation.page <= last_page
+        )\
+        .order_by(Annotation.page, Annotation.id)\
+        .all()
+    return rows
+
+
+def get_annotations_in_bbox(
+    db: Session,
+    document_id: int,
+    page: int,
+    min_x: float,
+    min_y: float,
+    max_x: float,
+    max_y: float
+) -> List[Row]:
+    """
+    Retrieve the compact annotations on a page whose boxes intersect a rectangle.
+
+    On SQLite the candidates come from the `annotation_rtree` spatial index, so the
+    lookup is logarithmic rather than a scan of every box on the page. The exact
+    intersection test is always applied to the annotation rows themselves.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+        page (int): The page number.
+        min_x (float): Left edge of the query rectangle.
+        min_y (float): Top edge of the query rectangle.
+        max_x (float): Right edge of the query rectangle.
+        max_y (float): Bottom edge of the query rectangle.
+
+    Returns:
+        List[Row]: Compact annotation rows intersecting the rectangle.
+    """
+    query = db.query(*SLIM_ANNOTATION_COLUMNS)
+
+    if db.get_bind().dialect.name == "sqlite":
+        # R*Tree boxes are rounded outwards, so this yields a superset of the matches
+        candidate_ids = select(annotation_rtree.c.id).where(
+            annotation_rtree.c.min_document_id <= document_id,
+            annotation_rtree.c.max_document_id >= document_id,
+            annotation_rtree.c.min_page <= page,
+            annotation_rtree.c.max_page >= page,
+            annotation_rtree.c.min_x <= max_x,
+            annotation_rtree.c.max_x >= min_x,
+            annotation_rtree.c.min_y <= max_y,
+            annotation_rtree.c.max_y >= min_y
+        )
+        query = query.filter(Annotation.id.in_(candidate_ids))
+
+    rows = query.filter(
+        Annotation.document_id == document_id,
+        Annotation.page == page,
+        Annotation.x <= max_x,
+        Annotation.x + Annotation.width >= min_x,
+        Annotation.y <= max_y,
+        Annotation.y + Annotation.height >= min_y
+    ).order_by(Annotation.id).all()
+    return rows
+
+
+# ============================
+# Annotation Search Operations
+# ============================
+
+# Shortest term the trigram index can answer; shorter terms are matched by scanning the candidates
+TRIGRAM_MIN_TERM_LENGTH = 3
+
+
+def search_annotations(
+    db: Session,
+    terms: List[str],
+    limit: int,
+    offset: int = 0,
+    document_type_id: Optional[int] = None,
+    data_element_name: Optional[str] = None,
+    created_by: Optional[str] = None
+) -> List[Row]:
+    """
+    Find the annotations whose value or annotation_value contains every term, best matches first.
+
+    Terms match case-insensitively anywhere in either field. On SQLite, terms of
+    at least TRIGRAM_MIN_TERM_LENGTH characters are looked up in the
+    `annotation_fts` trigram index and hits ranked by BM25; shorter terms, and
+    every term on other databases, are matched by scanning the remaining rows,
+    which are then returned newest first.
+
+    Args:
+        db (Session): The database session.
+        terms (List[str]): Phrases and words from `parse_search_terms`; must not be empty.
+        limit (int): The maximum number of hits.
+        offset (int, optional): The number of hits to skip. Defaults to 0.
+        document_type_id (int, optional): Only annotations on documents of this type.
+        data_element_name (str, optional): Only annotations of this data element, which is stored as their value.
+        created_by (str, optional): Only annotations created by this user.
+
+    Returns:
+        List[Row]: Compact annotation rows with their document_id and a score; higher is better.
+    """
+    indexed = []
+    scanned = terms
+    if db.get_bind().dialect.name == "sqlite":
+        indexed = [term for term in terms if len(term) >= TRIGRAM_MIN_TERM_LENGTH]
+        scanned = [term for term in terms if len(term) < TRIGRAM_MIN_TERM_LENGTH]
+
+    if indexed:
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in indexed)
+        rank = literal_column("annotation_fts.rank")
+        query = db.query(*SLIM_ANNOTATION_COLUMNS, Annotation.document_id, (-rank).label("score"))\
+            .select_from(annotation_fts)\
+            .join(Annotation, Annotation.id == annotation_fts.c.rowid)\
+            .filter(literal_column("annotation_fts").op("MATCH")(match))\
+            .order_by(rank, Annotation.id)
+    else:
+        query = db.query(*SLIM_ANNOTATION_COLUMNS, Annotation.document_id, literal_column("0.0").label("score"))\
+            .order_by(Annotation.id.desc())
+
+    for term in scanned:
+        query = query.filter(or_(
+            Annotation.value.icontains(term, autoescape=True),
+            Annotation.annotation_value.icontains(term, autoescape=True),
+        ))
+    if document_type_id is not None:
+        query = query.join(Document, Document.id == Annotation.document_id)\
+            .filter(Document.document_type_id == document_type_id)
+    if data_element_name is not None:
+        query = query.filter(Annotation.value == data_element_name)
+    if created_by is not None:
+        query = query.filter(Annotation.created_by == created_by)
+    return query.limit(limit).offset(offset).all()
+
+
+# ============================
+# Annotation Change Feed Operations
+# ============================
+
+# Operations recorded in the annotation change feed
+ANNOTATION_CREATED = "create"
+ANNOTATION_UPDATED = "update"
+ANNOTATION_DELETED = "delete"
+
+
+def record_annotation_change(db: Session, document_id: int, annotation_id: int, operation: str) -> None:
+    """
+    Bump the document's revision and append the change to the feed. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document whose annotation changed.
+        annotation_id (int): The ID of the annotation that changed.
+        operation (str): ANNOTATION_CREATED, ANNOTATION_UPDATED or ANNOTATION_DELETED.
+    """
+    changed_at = datetime.utcnow()
+    bump_document_revision(db, document_id)
+    mark_documents_annotated(db, [document_id], changed_at)
+    db.add(models.AnnotationChange(
+        document_id=document_id,
+        annotation_id=annotation_id,
+        operation=operation,
+        # Stamp the change with the revision the bump above just produced
+        revision=select(Document.revision).where(Document.id == document_id).scalar_subquery(),
+        changed_at=changed_at
+    ))
+
+
+def record_bulk_annotation_changes(
+    db: Session,
+    created: List[Tuple[int, int]],
+    revision_per_annotation: bool = False
+) -> List[int]:
+    """
+    Bump each affected document's revision and append a create entry per annotation.
+    The caller is responsible for committing.
+
+    By default a document's revision is bumped once for the whole batch. With
+    `revision_per_annotation`, it is bumped once per annotation and each change is
+    stamped with its own consecutive revision.
+
+    Args:
+        db (Session): The database session.
+        created (List[Tuple[int, int]]): (document_id, annotation_id) pairs of the inserted annotations.
+        revision_per_annotation (bool, optional): Give every annotation its own revision.
+
+    Returns:
+        List[int]: The revision recorded for each created annotation, in input order.
+    """
+    if not created:
+        return []
+    changed_at = datetime.utcnow()
+    counts = Counter(document_id for document_id, _ in created)
+    for document_id, count in counts.items():
+        bump_document_revision(db, document_id, count if revision_per_annotation else 1)
+    mark_documents_annotated(db, list(counts), changed_at)
+    revisions = dict(
+        db.query(Document.id, Document.revision).filter(Document.id.in_(counts)).all()
+    )
+
+    change_revisions = []
+    if revision_per_annotation:
+        # Count each document's changes up to the revision the bump above produced
+        next_revisions = {document_id: revisions[document_id] - counts[document_id] for document_id in counts}
+        for document_id, _ in created:
+            next_revisions[document_id] += 1
+            change_revisions.append(next_revisions[document_id])
+    else:
+        change_revisions = [revisions[document_id] for document_id, _ in created]
+
+    db.execute(insert(AnnotationChange), [
+        {
+            "document_id": document_id,
+            "annotation_id": annotation_id,
+            "operation": ANNOTATION_CREATED,
+            "revision": revision,
+            "changed_at": changed_at,
+        }
+        for (document_id, annotation_id), revision in zip(created, change_revisions)
+    ])
+    return change_revisions
+
+
+def get_annotation_change_revision(db: Session, document_id: int, annotation_id: int) -> Optional[int]:
+    """
+    Retrieve the document revision produced by the latest change to an annotation.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document the annotation belongs to.
+        annotation_id (int): The ID of the annotation.
+
+    Returns:
+        Optional[int]: The revision, or None if the annotation has no recorded changes.
+    """
+    return db.query(func.max(AnnotationChange.revision))\
+        .filter(AnnotationChange.document_id == document_id, AnnotationChange.annotation_id == annotation_id)\
+        .scalar()
+
+
+def get_annotation_changes(
+    db: Session,
+    document_id: int,
+    since_revision: Optional[int] = None,
+    since: Optional[datetime] = None
+) -> Tuple[List[Row], List[int]]:
+    """
+    Retrieve the net annotation changes for a document since a revision or timestamp.
+
+    Changes are collapsed per annotation: anything created or updated is returned in
+    its current state, and anything no longer present is reported as deleted.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+        since_revision (int, optional): Only include changes after this document revision.
+        since (datetime, optional): Only include changes made after this timestamp.
+
+    Returns:
+        Tuple[List[Row], List[int]]: Compact rows of created or updated annotations, and IDs of deleted annotations.
+    """
+    changes = db.query(AnnotationChange.annotation_id)\
+        .filter(AnnotationChange.document_id == document_id)
+    if since_revision is not None:
+        changes = changes.filter(AnnotationChange.revision > since_revision)
+    if since is not None:
+        changes = changes.filter(AnnotationChange.changed_at > since)
+
+    upserted = db.query(*SLIM_ANNOTATION_COLUMNS)\
+        .filter(
+            Annotation.document_id == document_id,
+            Annotation.id.in_(changes.subquery().select())
+        )\
+        .order_by(Annotation.id)\
+        .all()
+
+    existing_ids = select(Annotation.id).where(Annotation.document_id == document_id)
+    deleted = changes\
+        .filter(
+            AnnotationChange.operation == ANNOTATION_DELETED,
+            AnnotationChange.annotation_id.not_in(existing_ids)
+        )\
+        .distinct()\
+        .order_by(AnnotationChange.annotation_id)\
+        .all()
+
+    return upserted, [row.annotation_id for row in deleted]
+
+
+# ============================
+# Annotation Counter Operations
+# ============================
+
+def _apply_count_deltas(db: Session, model: Any, key_column: Any, deltas: Dict[Tuple[int, Any], int]) -> None:
+    """
+    Add deltas to per-document counter rows keyed by (document_id, key), creating and dropping rows as needed.
+    """
+    dialect_insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    statement = dialect_insert(model)
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[model.document_id, key_column],
+            set_={"annotation_count": model.annotation_count + statement.excluded.annotation_count},
+        ),
+        [
+            {"document_id": document_id, key_column.key: key, "annotation_count": delta}
+            for (document_id, key), delta in deltas.items()
+        ]
+    )
+    emptied = [key for key, delta in deltas.items() if delta < 0]
+    for document_id, key in emptied:
+        db.query(model)\
+            .filter(model.document_id == document_id, key_column == key, model.annotation_count <= 0)\
+            .delete(synchronize_session=False)
+
+
+def adjust_annotation_counts(db: Session, deltas: Counter) -> None:
+    """
+    Apply changes in annotation numbers to the documents' and pages' counters. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        deltas (Counter): Change in the number of annotations, keyed by (document_id, page).
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    _apply_count_deltas(db, AnnotationPageCount, AnnotationPageCount.page, deltas)
+
+    totals = Counter()
+    for (document_id, _), delta in deltas.items():
+        totals[document_id] += delta
+    for document_id, delta in totals.items():
+        if delta:
+            db.query(Document)\
+                .filter(Document.id == document_id)\
+                .update({Document.annotation_count: Document.annotation_count + delta}, synchronize_session=False)
+
+
+def adjust_annotation_value_counts(db: Session, deltas: Counter) -> None:
+    """
+    Apply changes in annotation numbers to the per-value counters and update the
+    affected documents' completeness. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        deltas (Counter): Change in the number of annotations, keyed by (document_id, value).
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    _apply_count_deltas(db, AnnotationValueCount, AnnotationValueCount.value, deltas)
+    refresh_document_completeness(db, Document.id.in_({document_id for document_id, _ in deltas}))
+
+
+def mark_documents_annotated(db: Session, document_ids: List[int], changed_at: datetime) -> None:
+    """
+    Record an annotation write on documents' `last_annotated_at`. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        document_ids (List[int]): The documents whose annotations changed.
+        changed_at (datetime): When they changed, as stamped on the change feed.
+    """
+    db.query(Document)\
+        .filter(Document.id.in_(document_ids))\
+        .update({Document.last_annotated_at: changed_at}, synchronize_session=False)
+
+
+def get_annotation_count_drift(
+    db: Session,
+    after_id: Optional[int] = None,
+    limit: int = 1000
+) -> Tuple[List[int], int, Optional[int]]:
+    """
+    Compare a batch of documents' annotation counters, per page and per value, with the annotations and change feed.
+
+    Args:
+        db (Session): The database session.
+        after_id (int, optional): Check only documents with an ID greater than this.
+        limit (int, optional): Number of documents to check. Defaults to 1000.
+
+    Returns:
+        Tuple[List[int], int, Optional[int]]: IDs of the documents whose counters are wrong,
+            the number of documents checked, and the ID to continue after, if any.
+    """
+    documents, next_after_id = keyset_page(
+        db.query(Document.id, Document.annotation_count, Document.last_annotated_at),
+        Document.id, after_id=after_id, limit=limit
+    )
+    if not documents:
+        return [], 0, None
+    first_id, last_id = documents[0].id, documents[-1].id
+
+    page_counts = db.query(Annotation.document_id, Annotation.page, func.count())\
+        .filter(Annotation.document_id.between(first_id, last_id))\
+        .group_by(Annotation.document_id, Annotation.page)\
+        .all()
+    actual_pages: Dict[int, Dict[int, int]] = {}
+    for document_id, page, count in page_counts:
+        actual_pages.setdefault(document_id, {})[page] = count
+
+    stored_counts = db.query(AnnotationPageCount)\
+        .filter(AnnotationPageCount.document_id.between(first_id, last_id))\
+        .all()
+    stored_pages: Dict[int, Dict[int, int]] = {}
+    for row in stored_counts:
+        stored_pages.setdefault(row.document_id, {})[row.page] = row.annotation_count
+
+    value_counts = db.query(Annotation.document_id, Annotation.value, func.count())\
+        .filter(Annotation.document_id.between(first_id, last_id))\
+        .group_by(Annotation.document_id, Annotation.value)\
+        .all()
+    actual_values: Dict[int, Dict[str, int]] = {}
+    for document_id, value, count in value_counts:
+        actual_values.setdefault(document_id, {})[value] = count
+
+    stored_value_counts = db.query(AnnotationValueCount)\
+        .filter(AnnotationValueCount.document_id.between(first_id, last_id))\
+        .all()
+    stored_values: Dict[int, Dict[str, int]] = {}
+    for row in stored_value_counts:
+        stored_values.setdefault(row.document_id, {})[row.value] = row.annotation_count
+
+    last_changes = dict(
+        db.query(AnnotationChange.document_id, func.max(AnnotationChange.changed_at))
+            .filter(AnnotationChange.document_id.between(first_id, last_id))
+            .group_by(AnnotationChange.document_id)
+            .all()
+    )
+
+    drifted = []
+    for document in documents:
+        pages = actual_pages.get(document.id, {})
+        if (
+            document.annotation_count != sum(pages.values())
+            or stored_pages.get(document.id, {}) != pages
+            or stored_values.get(document.id, {}) != actual_values.get(document.id, {})
+            or document.last_annotated_at != last_changes.get(document.id)
+        ):
+            drifted.append(document.id)
+    return drifted, len(documents), next_after_id
+
+
+def reconcile_annotation_counts(db: Session, document_ids: List[int]) -> None:
+    """
+    Recompute documents' annotation counters from the annotations and change feed, and
+    their completeness from the result, bumping their revisions. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        document_ids (List[int]): The documents to repair.
+    """
+    if not document_ids:
+        return
+    db.query(AnnotationPageCount)\
+        .filter(AnnotationPageCount.document_id.in_(document_ids))\
+        .delete(synchronize_session=False)
+    db.execute(insert(AnnotationPageCount).from_select(
+        ["document_id", "page", "annotation_count"],
+        select(Annotation.document_id, Annotation.page, func.count())
+            .where(Annotation.document_id.in_(document_ids))
+            .group_by(Annotation.document_id, Annotation.page)
+    ))
+    db.query(AnnotationValueCount)\
+        .filter(AnnotationValueCount.document_id.in_(document_ids))\
+        .delete(synchronize_session=False)
+    db.execute(insert(AnnotationValueCount).from_select(
+        ["document_id", "value", "annotation_count"],
+        select(Annotation.document_id, Annotation.value, func.count())
+            .where(Annotation.document_id.in_(document_ids))
+            .group_by(Annotation.document_id, Annotation.value)
+    ))
+    db.query(Document)\
+        .filter(Document.id.in_(document_ids))\
+        .update({
+            Document.annotation_count: select(func.count(Annotation.id))
+                .where(Annotation.document_id == Document.id)
+                .scalar_subquery(),
+            Document.last_annotated_at: select(func.max(AnnotationChange.changed_at))
+                .where(AnnotationChange.document_id == Document.id)
+                .scalar_subquery(),
+            # What the documents report has changed, as bump_document_revision would record
+            Document.revision: Document.revision + 1,
+        }, synchronize_session=False)
+    bump_revision(db, DOCUMENTS_REVISION)
+    refresh_document_completeness(db, Document.id.in_(document_ids))
+
+
+# ============================
+# Document Completeness Operations
+# ============================
+
+def refresh_document_completeness(db: Session, condition: Any) -> None:
+    """
+    Recompute the completeness of the documents matching a condition. The caller is responsible for committing.
+
+    Runs as two set-based UPDATEs over the documents' annotation value counters
+    and their type's data elements, so it suits a single document as well as
+    every document of a type.
+
+    Args:
+        db (Session): The database session.
+        condition: SQL expression on `Document` selecting the documents, e.g. `Document.id == 1`.
+    """
+    type_elements = select(func.count())\
+        .select_from(document_data_elements.join(DataElement, DataElement.id == document_data_elements.c.data_element_id))\
+        .where(document_data_elements.c.document_type_id == Document.document_type_id)
+    # Nested two levels deep, so the document has to be correlated explicitly
+    annotated = select(AnnotationValueCount.annotation_count)\
+        .where(AnnotationValueCount.document_id == Document.id, AnnotationValueCount.value == DataElement.name)\
+        .correlate_except(AnnotationValueCount)
+    db.query(Document)\
+        .filter(condition)\
+        .update({
+            Document.missing_required_count: type_elements
+                .where(document_data_elements.c.is_required, ~annotated.exists())
+                .scalar_subquery(),
+            Document.duplicated_element_count: type_elements
+                .where(~document_data_elements.c.allow_multiple, annotated.where(AnnotationValueCount.annotation_count > 1).exists())
+                .scalar_subquery(),
+        }, synchronize_session=False)
+    # SET sees the old counts, so the flag needs a second pass
+    db.query(Document)\
+        .filter(condition)\
+        .update({
+            Document.is_complete: (Document.missing_required_count == 0) & (Document.duplicated_element_count == 0)
+        }, synchronize_session=False)
+
+
+def get_annotation_value_counts(db: Session, document_id: int) -> Dict[str, int]:
+    """
+    Retrieve how many annotations a document has with each value.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+
+    Returns:
+        Dict[str, int]: Annotation counts keyed by value; values without annotations are absent.
+    """
+    return dict(
+        db.query(AnnotationValueCount.value, AnnotationValueCount.annotation_count)
+            .filter(AnnotationValueCount.document_id == document_id)
+            .all()
+    )
+
+
+def get_incomplete_documents(
+    db: Session,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+    document_type_id: Optional[int] = None
+) -> Tuple[List[Row], Optional[int]]:
+    """
+    Retrieve documents that lack a required data element or duplicate a single-valued one, ordered by ID.
+
+    Reads the maintained completeness columns through `ix_documents_is_complete_id`,
+    so the cost of a page does not depend on the number of documents or annotations.
+
+    Args:
+        db (Session): The database session.
+        after_id (int, optional): Return only documents with an ID greater than this.
+        limit (int, optional): Maximum number of records to return. Defaults to 100.
+        document_type_id (int, optional): Only documents of this type.
+
+    Returns:
+        Tuple[List[Row], Optional[int]]: The documents' completeness summaries and the ID to continue after, if any.
+    """
+    query = db.query(
+        Document.id,
+        Document.file_path,
+        Document.document_type_id,
+        Document.missing_required_count,
+        Document.duplicated_element_count,
+        Document.last_annotated_at
+    ).filter(Document.is_complete == false())
+    if document_type_id is not None:
+        query = query.filter(Document.document_type_id == document_type_id)
+    return keyset_page(query, Document.id, after_id=after_id, limit=limit)
+
+
+# ============================
+# Combined Query Operations
+# ============================
+
+def get_documents_with_annotation_count(
+    db: Session,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[Document], Optional[int]]:
+    """
+    Retrieve documents, ordered by ID, along with the count of annotations associated with each.
+
+    The counts are read from the documents' maintained counters, so this is a
+    keyset scan of `documents` plus one indexed query for the page's per-page counts.
+
+    Args:
+        db (Session): The database session.
+        after_id (int, optional): Return only documents with an ID greater than this.
+        limit (int, optional): Maximum number of records to return. None returns all.
+
+    Returns:
+        Tuple[List[Document], Optional[int]]: Documents with their annotation counters loaded
+        and the ID to continue after, if any.
+    """
+    query = db.query(Document).options(selectinload(Document.annotation_page_counts))
+    return keyset_page(query, Document.id, after_id=after_id, limit=limit)
+
+
+# ============================
+# Export Operations
+# ============================
+
+# Columns of an exported annotation, joined with its document and document type
+EXPORT_ANNOTATION_COLUMNS = (
+    Annotation.id,
+    Annotation.document_id,
+    Document.file_path,
+    Document.document_type_id,
+    DocumentType.name.label("document_type_name"),
+    Annotation.page,
+    Annotation.x,
+    Annotation.y,
+    Annotation.width,
+    Annotation.height,
+    Annotation.value,
+    Annotation.annotation_value,
+    Annotation.created_by,
+    Annotation.created_at,
+)
+
+
+def iter_annotation_export_batches(
+    db: Session,
+    document_type_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    batch_size: int = 1000
+) -> Iterator[List[Row]]:
+    """
+    Stream every annotation joined with its document and document type, ordered by ID.
+
+    Rows are fetched through a server-side cursor on the session's connection and
+    handed out in batches of `batch_size`, so memory use stays bounded no matter
+    how large the corpus is. The query bypasses ORM row loading, which dominates
+    the cost of large exports.
+
+    Args:
+        db (Session): The database session.
+        document_type_id (int, optional): Only export annotations on documents of this type.
+        created_from (datetime, optional): Only export annotations created at or after this time.
+        created_to (datetime, optional): Only export annotations created before this time.
+        batch_size (int, optional): Number of rows fetched per round trip. Defaults to 1000.
+
+    Yields:
+        List[Row]: Batches of rows with the columns of EXPORT_ANNOTATION_COLUMNS.
+    """
+    statement = select(*EXPORT_ANNOTATION_COLUMNS)\
+        .join(Document, Annotation.document_id == Document.id)\
+        .outerjoin(DocumentType, Document.document_type_id == DocumentType.id)
+    if document_type_id is not None:
+        statement = statement.where(Document.document_type_id == document_type_id)
+    if created_from is not None:
+        statement = statement.where(Annotation.created_at >= created_from)
+    if created_to is not None:
+        statement = statement.where(Annotation.created_at < created_to)
+    statement = statement.order_by(Annotation.id)
+
+    result = db.connection().execution_options(yield_per=batch_size).execute(statement)
+    yield from result.partitions()
+
+
+
+# ============================
+# Background Job Operations
+# ============================
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: dict,
+    document_id: Optional[int] = None,
+    priority: int = 0,
+    max_attempts: int = 3,
+    run_after: Optional[datetime] = None
+) -> models.Job:
+    """
+    Queue a background job. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        kind (str): The registered job kind.
+        payload (dict): JSON-serializable arguments for the job's handler.
+        document_id (int, optional): The document the job belongs to.
+        priority (int, optional): Jobs with a higher priority run first. Defaults to 0.
+        max_attempts (int, optional): Attempts before the job is given up. Defaults to 3.
+        run_after (datetime, optional): Do not start the job before this time. Defaults to now.
+
+    Returns:
+        models.Job: The queued job.
+    """
+    job = models.Job(
+        kind=kind,
+        payload=payload,
+        document_id=document_id,
+        priority=priority,
+        max_attempts=max_attempts,
+        status=JOB_QUEUED,
+        run_after=run_after or datetime.utcnow(),
+    )
+    db.add(job)
+    db.flush()  # Assign the job's ID
+    return job
+
+
+def has_queued_job(db: Session, kind: str) -> bool:
+    """
+    Check whether a job of the given kind is waiting to run.
+    """
+    return db.query(models.Job.id)\
+        .filter(models.Job.kind == kind, models.Job.status == JOB_QUEUED)\
+        .first() is not None
+
+
+def get_job(db: Session, job_id: int) -> Optional[models.Job]:
+    """
+    Retrieve a single job by its ID.
+    """
+    return db.get(models.Job, job_id)
+
+
+def get_document_jobs(db: Session, document_id: int) -> List[models.Job]:
+    """
+    Retrieve every job of a document, oldest first.
+
+    Args:
+        db (Session): The database session.
+        document_id (int): The ID of the document.
+
+    Returns:
+        List[models.Job]: The document's jobs.
+    """
+    return db.query(models.Job)\
+        .filter(models.Job.document_id == document_id)\
+        .order_by(models.Job.id)\
+        .all()
+
+
+def claim_jobs(db: Session, limit: int) -> List[models.Job]:
+    """
+    Mark up to `limit` due jobs as running, highest priority first, and return them.
+
+    Each job is claimed with a conditional UPDATE, so several runners sharing the
+    database never start the same job twice.
+
+    Args:
+        db (Session): The database session.
+        limit (int): Maximum number of jobs to claim.
+
+    Returns:
+        List[models.Job]: The claimed jobs, with their attempt counts already incremented.
+    """
+    now = datetime.utcnow()
+    candidate_ids = db.query(models.Job.id)\
+        .filter(models.Job.status == JOB_QUEUED, models.Job.run_after <= now)\
+        .order_by(models.Job.priority.desc(), models.Job.id)\
+        .limit(limit)\
+        .all()
+    claimed = []
+    for (job_id,) in candidate_ids:
+        updated = db.query(models.Job)\
+            .filter(models.Job.id == job_id, models.Job.status == JOB_QUEUED)\
+            .update({
+                models.Job.status: JOB_RUNNING,
+                models.Job.attempts: models.Job.attempts + 1,
+                models.Job.started_at: now,
+            }, synchronize_session=False)
+        if updated:
+            claimed.append(job_id)
+    db.commit()
+    if not claimed:
+        return []
+    return db.query(models.Job).filter(models.Job.id.in_(claimed)).order_by(models.Job.priority.desc(), models.Job.id).all()
+
+
+def complete_job(db: Session, job_id: int, result) -> None:
+    """
+    Mark a job as succeeded and store its result. The caller is responsible for committing.
+
+    Args:
+        db (Session): The database session.
+        job_id (int): The ID of the job.
+        result: The JSON-serializable value the handler returned.
+    """
+    db.query(models.Job)\
+        .filter(models.Job.id == job_id)\
+        .update({
+            models.Job.status: JOB_SUCCEEDED,
+            models.Job.result: result,
+            models.Job.last_error: None,
+            models.Job.finished_at: datetime.utcnow(),
+        }, synchronize_session=False)
+
+
+def fail_job(db: Session, job_id: int, error: str, retry_at: Optional[datetime]) -> None:
+    """
+    Record a failed attempt, queueing the job again at `retry_at` or giving it up if None.
+
+    Args:
+        db (Session): The database session.
+        job_id (int): The ID of the job.
+        error (str): What went wrong.
+        retry_at (datetime, optional): When to run the next attempt; None marks the job failed.
+    """
+    values = {models.Job.last_error: error}
+    if retry_at is None:
+        values.update({models.Job.status: JOB_FAILED, models.Job.finished_at: datetime.utcnow()})
+    else:
+        values.update({models.Job.status: JOB_QUEUED, models.Job.run_after: retry_at})
+    db.query(models.Job)\
+        .filter(models.Job.id == job_id)\
+        .update(values, synchronize_session=False)
+    db.commit()
+
+
+def requeue_running_jobs(db: Session) -> int:
+    """
+    Queue again every job left running, e.g. by a crash or shutdown mid-job.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        int: The number of jobs requeued.
+    """
+    requeued = db.query(models.Job)\
+        .filter(models.Job.status == JOB_RUNNING)\
+        .update({models.Job.status: JOB_QUEUED}, synchronize_session=False)
+    db.commit()
+    return requeued
@@ -5,6 +5,10 @@
 """
 This module sets up the database connection using SQLAlchemy.
 It configures the engine, session maker, and declarative base for ORM models.
+
+Setting DATABASE_ASYNC=1 additionally creates an asyncio engine (aiosqlite or
+asyncpg) that request handlers use instead of the threadpool. The synchronous
+engine is always created; it is used for schema setup, seeding and exports.
 """
 
 # ============================
@@ -12,9 +16,15 @@ It configures the engine, session maker, and declarative base for ORM models.
 # ============================
 
 import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Union
+
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 # ============================
 # Environment Configuration
@@ -24,6 +34,15 @@ from sqlalchemy.orm import sessionmaker
 # Defaults to a local SQLite database if not provided.
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
 
+# Whether request handlers use the asyncio engine instead of the threadpool
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "0").lower() in ("1", "true", "yes")
+
+# Async drivers substituted into DATABASE_URL when ASYNC_DATABASE_URL is not given
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
 # ============================
 # Engine Configuration
 # ============================
@@ -36,6 +55,19 @@ engine = create_engine(
     pool_pre_ping=True  # Ensures connections are valid before using them
 )
 
+# Create the asyncio engine when enabled. It points at the same database as `engine`.
+if DATABASE_ASYNC:
+    default_async_url = make_url(SQLALCHEMY_DATABASE_URL)
+    default_async_url = default_async_url.set(drivername=ASYNC_DRIVERS[default_async_url.get_backend_name()])
+    async_engine = create_async_engine(
+        os.getenv("ASYNC_DATABASE_URL", default_async_url.render_as_string(hide_password=False)),
+        # Transactions interleaved on one event loop hold SQLite's write lock longer, so wait longer for it
+        connect_args={"timeout": 30} if default_async_url.get_backend_name() == "sqlite" else {},
+        pool_pre_ping=True
+    )
+else:
+    async_engine = None
+
 # ============================
 # Session Local Configuration
 # ============================
@@ -47,6 +79,12 @@ SessionLocal = sessionmaker(
     bind=engine         # Bind the sessionmaker to the engine
 )
 
+# Create a configured "AsyncSession" class, with the same settings, when the asyncio engine is enabled
+AsyncSessionLocal = async_sessionmaker(
+    autoflush=False,
+    bind=async_engine
+) if async_engine is not None else None
+
 # ============================
 # Declarative Base
 # ============================
@@ -72,6 +110,51 @@ def get_db():
         db.close()
 
 
+# ============================
+# Configured Session Helpers
+# ============================
+
+@asynccontextmanager
+async def open_session() -> AsyncIterator[Union[Session, AsyncSession]]:
+    """
+    Opens a session of the configured kind: an AsyncSession when DATABASE_ASYNC is
+    set, otherwise a Session that is closed from the threadpool.
+
+    Yields:
+        Union[Session, AsyncSession]: The session, to be used through `run_db`.
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+
+async def run_db(db: Union[Session, AsyncSession], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Runs synchronous ORM code against either kind of session without blocking the event loop.
+
+    With an AsyncSession the code runs on the event loop through `run_sync`, awaiting
+    the async driver for I/O; with a Session it runs in the threadpool. Either way
+    `fn` receives a plain Session as its first argument, so the `crud` functions
+    serve both.
+
+    Args:
+        db (Union[Session, AsyncSession]): The session from `open_session`.
+        fn (Callable): The function to call as fn(session, *args, **kwargs).
+
+    Returns:
+        Any: Whatever `fn` returns.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
 # ============================
 # Delete all data and tables
 # ============================
@@ -0,0 +1,195 @@
+# ============================
+# Annotation Event Hub Module
+# ============================
+
+"""
+This module provides an in-process broadcast hub for live annotation events.
+
+Clients viewing a document subscribe to its channel and receive compact diffs as
+soon as annotation writes commit. Each subscriber has a bounded queue; a consumer
+that falls behind is sent a single "resync" event and dropped, so a slow client
+never blocks writers or grows memory without limit.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Configuration Constants
+# ============================
+
+# Maximum number of undelivered events held per subscriber before it is dropped
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Event sent to a subscriber that must re-fetch state instead of applying diffs
+RESYNC_EVENT = {"type": "resync"}
+
+# Reconnection delay suggested to EventSource clients, in milliseconds
+SSE_RETRY_MS = 3000
+
+# Seconds of silence after which a comment line is sent to keep proxies from closing the stream
+SSE_HEARTBEAT_SECONDS = 15
+
+# ============================
+# Subscription
+# ============================
+
+class Subscription:
+    """
+    A single subscriber's bounded queue of pending events for one document.
+
+    Attributes:
+        document_id (int): The document whose events are delivered.
+        closed (bool): Set once the subscriber has been dropped; no further events are queued.
+    """
+
+    def __init__(self, document_id: int, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.document_id = document_id
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def get(self) -> Dict[str, Any]:
+        """
+        Waits for and returns the next event.
+
+        Returns:
+            Dict[str, Any]: The next event for this subscriber.
+        """
+        return await self._queue.get()
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """
+        Queues an event without blocking. Must be called on the event loop.
+
+        Args:
+            event (Dict[str, Any]): The event to deliver.
+
+        Returns:
+            bool: False if the queue was full and the subscriber has been dropped.
+        """
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # Discard the backlog and tell the consumer to re-fetch instead
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(RESYNC_EVENT)
+            self.closed = True
+            return False
+
+# ============================
+# Broadcast Hub
+# ============================
+
+class AnnotationEventHub:
+    """
+    Fans annotation events out to the subscribers of each document.
+
+    Subscriptions are created on the event loop; events may be published from
+    the event loop or, via `publish_threadsafe`, from threadpool route handlers.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self._queue_size = queue_size
+        self._subscribers: Dict[int, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, document_id: int) -> Subscription:
+        """
+        Registers a new subscriber for a document. Must be called on the event loop.
+
+        Args:
+            document_id (int): The document to receive events for.
+
+        Returns:
+            Subscription: The new subscription.
+        """
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(document_id, self._queue_size)
+        self._subscribers.setdefault(document_id, set()).add(subscription)
+        logger.info(f"Subscriber added for document ID {document_id}.")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Removes a subscriber. Safe to call more than once.
+
+        Args:
+            subscription (Subscription): The subscription to remove.
+        """
+        subscription.closed = True
+        subscribers = self._subscribers.get(subscription.document_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.document_id]
+        logger.info(f"Subscriber removed for document ID {subscription.document_id}.")
+
+    def has_subscribers(self, document_id: int) -> bool:
+        """
+        Tells whether anyone is subscribed to a document, so publishers can skip building events.
+
+        Args:
+            document_id (int): The document to check.
+
+        Returns:
+            bool: True if the document has at least one subscriber.
+        """
+        return document_id in self._subscribers
+
+    def publish(self, document_id: int, event: Dict[str, Any]) -> None:
+        """
+        Delivers an event to every subscriber of a document. Must be called on the event loop.
+
+        Args:
+            document_id (int): The document the event belongs to.
+            event (Dict[str, Any]): The event to deliver.
+        """
+        for subscription in list(self._subscribers.get(document_id, ())):
+            if not subscription.offer(event):
+                logger.warning(f"Dropped slow subscriber for document ID {document_id}; sent resync.")
+                self.unsubscribe(subscription)
+
+    def publish_threadsafe(self, document_id: int, event: Dict[str, Any]) -> None:
+        """
+        Schedules an event for delivery from any thread. A no-op when nobody is subscribed.
+
+        Args:
+            document_id (int): The document the event belongs to.
+            event (Dict[str, Any]): The event to deliver.
+        """
+        if self._loop is None or document_id not in self._subscribers:
+            return
+        self._loop.call_soon_threadsafe(self.publish, document_id, event)
+
+# ============================
+# Server-Sent Events Formatting
+# ============================
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """
+    Formats an event as a Server-Sent Events frame named after its type.
+
+    Args:
+        event (Dict[str, Any]): The event to send.
+
+    Returns:
+        str: The frame, terminated by a blank line.
+    """
+    return f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+# Process-wide hub shared by the API routes
+annotation_events = AnnotationEventHub()
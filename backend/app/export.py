@@ -0,0 +1,271 @@
+"""
+Annotation corpus export.
+
+Streams every annotation, joined with its document's file path and document type,
+as newline-delimited JSON, Parquet or Arrow IPC. Used by the /export/annotations
+endpoint and runnable as a command line tool for nightly dumps:
+
+python -m app.export --output annotations.ndjson --document-type-id 1 --created-from 2024-01-01
+python -m app.export --format parquet --output annotations.parquet
+
+"""
+
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import argparse
+import io
+import json
+import sys
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+# Third-Party Imports
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Local Imports
+from . import crud
+from .database import SessionLocal
+
+# ============================
+# Configuration Constants
+# ============================
+
+# Number of NDJSON lines joined into each chunk written to the client or file
+EXPORT_LINES_PER_CHUNK = 1000
+
+# Number of rows per Arrow record batch (and Parquet row group)
+EXPORT_ROWS_PER_BATCH = 65536
+
+# Supported export formats and their media types
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Columnar layout of the export: float32 geometry and dictionary-encoded names
+ANNOTATION_ARROW_SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("document_id", pa.int64()),
+    ("file_path", pa.dictionary(pa.int32(), pa.string())),
+    ("document_type_id", pa.int64()),
+    ("document_type_name", pa.dictionary(pa.int32(), pa.string())),
+    ("page", pa.int32()),
+    ("x", pa.float32()),
+    ("y", pa.float32()),
+    ("width", pa.float32()),
+    ("height", pa.float32()),
+    ("value", pa.dictionary(pa.int32(), pa.string())),
+    ("annotation_value", pa.string()),
+    ("created_by", pa.dictionary(pa.int32(), pa.string())),
+    ("created_at", pa.timestamp("us")),
+])
+
+# ============================
+# NDJSON Serialization
+# ============================
+
+def iter_annotation_ndjson(
+    document_type_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> Iterator[bytes]:
+    """
+    Yields the annotation export as NDJSON, in chunks of EXPORT_LINES_PER_CHUNK lines.
+
+    The generator owns its database session so it can outlive the request that
+    started it while a StreamingResponse is still being sent.
+
+    Args:
+        document_type_id (int, optional): Only export annotations on documents of this type.
+        created_from (datetime, optional): Only export annotations created at or after this time.
+        created_to (datetime, optional): Only export annotations created before this time.
+
+    Yields:
+        bytes: Newline-terminated JSON lines, one per annotation.
+    """
+    db = SessionLocal()
+    try:
+        for rows in crud.iter_annotation_export_batches(
+            db,
+            document_type_id=document_type_id,
+            created_from=created_from,
+            created_to=created_to,
+            batch_size=EXPORT_LINES_PER_CHUNK
+        ):
+            lines = []
+            for row in rows:
+                record = row._asdict()
+                record["created_at"] = record["created_at"].isoformat()
+                lines.append(json.dumps(record))
+            yield ("\n".join(lines) + "\n").encode()
+    finally:
+        db.close()
+
+# ============================
+# Columnar Serialization
+# ============================
+
+class _ChunkSink(io.RawIOBase):
+    """
+    A write-only file object that hands written bytes back to the caller in chunks.
+
+    It reports the total number of bytes written from tell(), which the Parquet
+    writer relies on for its footer offsets, while never holding more than the
+    bytes written since the last drain.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        """
+        Returns and forgets everything written since the previous drain.
+        """
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_annotation_record_batches(
+    document_type_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    batch_size: int = EXPORT_ROWS_PER_BATCH
+) -> Iterator[pa.RecordBatch]:
+    """
+    Yields the annotation export as Arrow record batches of up to `batch_size` rows.
+
+    Args:
+        document_type_id (int, optional): Only export annotations on documents of this type.
+        created_from (datetime, optional): Only export annotations created at or after this time.
+        created_to (datetime, optional): Only export annotations created before this time.
+        batch_size (int, optional): Rows per record batch.
+
+    Yields:
+        pa.RecordBatch: Batches following ANNOTATION_ARROW_SCHEMA.
+    """
+    db = SessionLocal()
+    try:
+        for rows in crud.iter_annotation_export_batches(
+            db,
+            document_type_id=document_type_id,
+            created_from=created_from,
+            created_to=created_to,
+            batch_size=batch_size
+        ):
+            columns = zip(*rows)
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, ANNOTATION_ARROW_SCHEMA)],
+                schema=ANNOTATION_ARROW_SCHEMA
+            )
+    finally:
+        db.close()
+
+
+def iter_annotation_parquet(
+    document_type_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> Iterator[bytes]:
+    """
+    Yields the annotation export as a Parquet file, one row group at a time.
+
+    Args:
+        document_type_id (int, optional): Only export annotations on documents of this type.
+        created_from (datetime, optional): Only export annotations created at or after this time.
+        created_to (datetime, optional): Only export annotations created before this time.
+
+    Yields:
+        bytes: Consecutive pieces of the Parquet file.
+    """
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, ANNOTATION_ARROW_SCHEMA) as writer:
+        for batch in iter_annotation_record_batches(document_type_id, created_from, created_to):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()  # The footer is written on close
+
+
+def iter_annotation_arrow(
+    document_type_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> Iterator[bytes]:
+    """
+    Yields the annotation export in the Arrow IPC streaming format, one record batch at a time.
+
+    Args:
+        document_type_id (int, optional): Only export annotations on documents of this type.
+        created_from (datetime, optional): Only export annotations created at or after this time.
+        created_to (datetime, optional): Only export annotations created before this time.
+
+    Yields:
+        bytes: Consecutive pieces of the Arrow IPC stream.
+    """
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, ANNOTATION_ARROW_SCHEMA) as writer:
+        for batch in iter_annotation_record_batches(document_type_id, created_from, created_to):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()  # End-of-stream marker
+
+
+# Serializer for each supported export format
+EXPORT_SERIALIZERS = {
+    "ndjson": iter_annotation_ndjson,
+    "parquet": iter_annotation_parquet,
+    "arrow": iter_annotation_arrow,
+}
+
+# ============================
+# Command Line Interface
+# ============================
+
+def main(argv: Optional[list] = None) -> None:
+    """
+    Writes the annotation export to a file or standard output.
+
+    Args:
+        argv (list, optional): Command line arguments; defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Export all annotations as NDJSON, Parquet or Arrow IPC.")
+    parser.add_argument("--output", "-o", help="File to write to. Defaults to standard output.")
+    parser.add_argument("--format", "-f", choices=sorted(EXPORT_SERIALIZERS), default="ndjson", help="Export format. Defaults to ndjson.")
+    parser.add_argument("--document-type-id", type=int, help="Only export annotations on documents of this type.")
+    parser.add_argument("--created-from", type=datetime.fromisoformat, help="Only export annotations created at or after this ISO timestamp.")
+    parser.add_argument("--created-to", type=datetime.fromisoformat, help="Only export annotations created before this ISO timestamp.")
+    args = parser.parse_args(argv)
+
+    output = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in EXPORT_SERIALIZERS[args.format](
+            document_type_id=args.document_type_id,
+            created_from=args.created_from,
+            created_to=args.created_to
+        ):
+            output.write(chunk)
+    finally:
+        if args.output:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
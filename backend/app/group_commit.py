@@ -0,0 +1,158 @@
+# ============================
+# Group Commit Writer Module
+# ============================
+
+"""
+This module provides a group-commit write path for single annotation creates.
+
+Instead of every request taking a session and committing on its own, which on
+SQLite serializes on the write lock and pays one fsync per request, requests hand
+their annotation to a single writer task. The writer gathers whatever is pending
+for up to GROUP_COMMIT_MAX_DELAY_MS milliseconds or GROUP_COMMIT_MAX_ROWS rows,
+writes the group in one transaction and then resolves each caller's future.
+
+Enable it by setting ANNOTATION_GROUP_COMMIT=1.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+
+from . import crud, models, schemas
+from .database import open_session, run_db
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Configuration Constants
+# ============================
+
+# Whether POST /annotations/ goes through the group-commit writer
+GROUP_COMMIT_ENABLED = os.getenv("ANNOTATION_GROUP_COMMIT", "0").lower() in ("1", "true", "yes")
+
+# Longest time the writer waits for more annotations after the first one arrives
+GROUP_COMMIT_MAX_DELAY_MS = float(os.getenv("GROUP_COMMIT_MAX_DELAY_MS", "2"))
+
+# Most annotations written in one transaction
+GROUP_COMMIT_MAX_ROWS = int(os.getenv("GROUP_COMMIT_MAX_ROWS", str(crud.BULK_INSERT_CHUNK_SIZE)))
+
+# ============================
+# Group Commit Writer
+# ============================
+
+class GroupCommitWriter:
+    """
+    Collects annotation creates from concurrent requests and commits them in groups.
+
+    While one group is being written, new requests queue up and form the next
+    group, so the batch size grows with the load and a lone request only waits
+    for its own commit plus at most `max_delay_ms`.
+    """
+
+    def __init__(self, max_delay_ms: float = GROUP_COMMIT_MAX_DELAY_MS, max_rows: int = GROUP_COMMIT_MAX_ROWS):
+        self.max_delay = max_delay_ms / 1000
+        self.max_rows = max_rows
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Starts the writer task. Must be called on the event loop.
+        """
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            f"Group commit writer started (max delay {self.max_delay * 1000:g} ms, max rows {self.max_rows})."
+        )
+
+    async def stop(self) -> None:
+        """
+        Stops the writer task and fails any annotations still waiting to be written.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail(pending, RuntimeError("Group commit writer stopped."))
+        logger.info("Group commit writer stopped.")
+
+    async def submit(self, annotation: schemas.AnnotationCreate) -> Optional[Tuple[models.Annotation, int]]:
+        """
+        Queues an annotation and waits until the group containing it has committed.
+
+        Args:
+            annotation (schemas.AnnotationCreate): The annotation data.
+
+        Returns:
+            Optional[Tuple[models.Annotation, int]]: The created annotation and the document
+                revision it produced, or None if its document does not exist.
+
+        Raises:
+            RuntimeError: If the writer is not running.
+            Exception: Whatever error made the group's transaction fail.
+        """
+        if self._task is None:
+            raise RuntimeError("Group commit writer is not running.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((annotation, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            group = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(group) < self.max_rows:
+                if not self._queue.empty():
+                    group.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    group.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._write_group(group)
+
+    async def _write_group(self, group: List[Tuple[schemas.AnnotationCreate, asyncio.Future]]) -> None:
+        try:
+            results = await self._write([annotation for annotation, _ in group])
+        except asyncio.CancelledError:
+            # Stopped mid-write; the transaction may or may not have committed
+            self._fail(group, RuntimeError("Group commit writer stopped."))
+            raise
+        except Exception as e:
+            logger.error(f"Group commit of {len(group)} annotations failed: {e}")
+            self._fail(group, e)
+            return
+        for (_, future), result in zip(group, results):
+            if not future.done():  # The caller may have gone away
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(group: List[Tuple[schemas.AnnotationCreate, asyncio.Future]], error: Exception) -> None:
+        for _, future in group:
+            if not future.done():
+                future.set_exception(error)
+
+    @staticmethod
+    async def _write(annotations: List[schemas.AnnotationCreate]) -> List[Optional[Tuple[models.Annotation, int]]]:
+        async with open_session() as db:
+            return await run_db(db, crud.create_annotations, annotations)
+
+
+# Process-wide writer, created only when group commit is enabled
+group_commit_writer = GroupCommitWriter() if GROUP_COMMIT_ENABLED else None
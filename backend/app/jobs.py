@@ -0,0 +1,290 @@
+# ============================
+# Background Job Runner Module
+# ============================
+
+"""
+This module runs post-upload processing and periodic housekeeping in the background.
+
+Work is queued as rows in the persistent `jobs` table, so it survives restarts,
+and picked up by a single dispatcher task on the event loop. The dispatcher
+claims due jobs in priority order and hands each job's handler to a pool of
+worker processes, so CPU-bound PDF processing runs on every core without
+blocking the event loop or contending for the GIL. When a handler returns, its
+result is written back in the main process, through the kind's optional
+`on_success` callback, in the same transaction that marks the job succeeded.
+Failed attempts are retried with exponential backoff and jitter until the job's
+`max_attempts` is reached.
+
+Job kinds are registered in JOB_KINDS. Handlers must be module-level functions
+taking the job's payload dict and returning a JSON-serializable result, since
+they run in another process.
+
+Disable the runner by setting BACKGROUND_JOBS=0; jobs then stay queued.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from . import annotation_counts, crud, linearize, models, page_metadata, page_text
+from .database import open_session, run_db
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Configuration Constants
+# ============================
+
+# Whether the job runner is started with the application
+JOBS_ENABLED = os.getenv("BACKGROUND_JOBS", "1").lower() in ("1", "true", "yes")
+
+# Number of worker processes, and so of jobs running at once
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# How often the dispatcher looks for due jobs when nothing wakes it earlier
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+
+# Delay before the first retry; doubled for every further attempt, up to the maximum
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "2"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "300"))
+
+# ============================
+# Job Kinds
+# ============================
+
+class JobKind(NamedTuple):
+    """
+    How to run one kind of job.
+
+    Attributes:
+        run (Callable[[dict], Any]): Module-level handler run in a worker process with the job's payload.
+        on_success (Optional[Callable[[Session, dict, Any], Any]]): Stores the handler's result; runs in the
+            main process inside the transaction that completes the job. A value it returns other than None is
+            recorded as the job's result in place of the handler's.
+        priority (int): Priority given to new jobs of this kind; higher runs first.
+        max_attempts (int): Attempts before a failing job of this kind is given up.
+    """
+    run: Callable[[dict], Any]
+    on_success: Optional[Callable[[Session, dict, Any], Any]] = None
+    priority: int = 0
+    max_attempts: int = 3
+
+
+JOB_KINDS: Dict[str, JobKind] = {
+    # Cheap, and clients need the page layout before anything else
+    "page_metadata": JobKind(
+        run=page_metadata.run_page_metadata_job,
+        on_success=page_metadata.save_page_metadata_result,
+        priority=200,
+    ),
+    # Serving the linearized copy speeds up every later open, so it goes first
+    "linearize": JobKind(
+        run=linearize.run_linearize_job,
+        on_success=linearize.save_linearize_result,
+        priority=100,
+    ),
+    # The slowest stage; search can wait until the document is viewable
+    "page_text": JobKind(
+        run=page_text.run_page_text_job,
+        on_success=page_text.save_page_text_result,
+        priority=50,
+    ),
+    # Housekeeping; yields to everything a user is waiting for
+    "annotation_counts": JobKind(
+        run=annotation_counts.run_annotation_counts_job,
+        on_success=annotation_counts.save_annotation_counts_result,
+        priority=0,
+    ),
+}
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: dict,
+    document_id: Optional[int] = None,
+    run_after: Optional[datetime] = None
+) -> models.Job:
+    """
+    Queues a job of a registered kind with that kind's priority and attempt limit. The caller is responsible for committing.
+
+    Call `job_runner.notify()` after the commit, on the event loop, to start it without waiting for the next poll.
+
+    Args:
+        db (Session): The database session.
+        kind (str): The registered job kind.
+        payload (dict): JSON-serializable arguments for the handler.
+        document_id (int, optional): The document the job belongs to.
+        run_after (datetime, optional): Do not start the job before this time. Defaults to now.
+
+    Returns:
+        models.Job: The queued job.
+    """
+    spec = JOB_KINDS[kind]
+    return crud.enqueue_job(
+        db, kind, payload, document_id=document_id, priority=spec.priority, max_attempts=spec.max_attempts,
+        run_after=run_after
+    )
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Returns how long to wait before the next attempt, with exponential backoff and jitter.
+
+    Args:
+        attempts (int): Attempts made so far.
+
+    Returns:
+        timedelta: The delay.
+    """
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+# ============================
+# Job Runner
+# ============================
+
+class ClaimedJob(NamedTuple):
+    """
+    The fields of a claimed job the runner needs once its session has closed.
+    """
+    id: int
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+class JobRunner:
+    """
+    Claims due jobs and runs them in a pool of worker processes.
+
+    At most `workers` jobs run at once. The dispatcher claims more whenever a job
+    finishes, `notify` is called or the poll interval elapses, so retries whose
+    backoff has expired are picked up without a separate timer.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, poll_interval: float = JOB_POLL_INTERVAL_SECONDS):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """
+        Requeues jobs interrupted by the last shutdown and starts the dispatcher. Must be called on the event loop.
+        """
+        async with open_session() as db:
+            requeued = await run_db(db, crud.requeue_running_jobs)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted jobs.")
+        self._pool = self._create_pool()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Job runner started with {self.workers} worker processes.")
+
+    async def stop(self) -> None:
+        """
+        Stops the dispatcher and worker processes. Jobs still running are requeued on the next start.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        for task in list(self._running):
+            task.cancel()
+        await asyncio.gather(self._task, *self._running, return_exceptions=True)
+        self._task = None
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        logger.info("Job runner stopped.")
+
+    def notify(self) -> None:
+        """
+        Wakes the dispatcher to claim newly queued jobs. Must be called on the event loop.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        # Spawned rather than forked, so workers do not inherit the event loop, threads or database connections
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            free = self.workers - len(self._running)
+            if free > 0:
+                try:
+                    async with open_session() as db:
+                        jobs = await run_db(db, lambda session: [
+                            ClaimedJob(job.id, job.kind, job.payload, job.attempts, job.max_attempts)
+                            for job in crud.claim_jobs(session, free)
+                        ])
+                except Exception as e:
+                    logger.error(f"Failed to claim jobs: {e}")
+                    jobs = []
+                for job in jobs:
+                    task = loop.create_task(self._execute(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._finished)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self._wakeup.set()
+
+    async def _execute(self, job: ClaimedJob) -> None:
+        spec = JOB_KINDS.get(job.kind)
+        try:
+            if spec is None:
+                raise ValueError(f"Unknown job kind '{job.kind}'.")
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, spec.run, job.payload)
+
+            def save(session: Session) -> None:
+                recorded = result
+                if spec.on_success is not None:
+                    summary = spec.on_success(session, job.payload, result)
+                    if summary is not None:
+                        recorded = summary
+                crud.complete_job(session, job.id, recorded)
+                session.commit()
+
+            async with open_session() as db:
+                await run_db(db, save)
+            logger.info(f"Job {job.id} ({job.kind}) succeeded on attempt {job.attempts}.")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                # A worker died, e.g. crashed in native code; every later submit would fail too
+                logger.error("Job worker pool broke; starting a new one.")
+                self._pool = self._create_pool()
+            retry_at = datetime.utcnow() + retry_delay(job.attempts) if job.attempts < job.max_attempts else None
+            error = f"{type(e).__name__}: {e}"
+            if retry_at is None:
+                logger.error(f"Job {job.id} ({job.kind}) failed for good after {job.attempts} attempts: {error}")
+            else:
+                logger.warning(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying at {retry_at}: {error}")
+            async with open_session() as db:
+                await run_db(db, crud.fail_job, job.id, error, retry_at)
+
+
+# Process-wide runner, created only when background jobs are enabled
+job_runner = JobRunner() if JOBS_ENABLED else None
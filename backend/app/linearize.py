@@ -0,0 +1,116 @@
+# ============================
+# PDF Linearization Module
+# ============================
+
+"""
+This module writes linearized ("fast web view") copies of uploaded PDFs.
+
+A linearized PDF starts with the cross-reference data and every object needed
+for the first page, so a range-loading viewer such as pdf.js can render page 1
+from the front of the file instead of first fetching the cross-reference table
+at the end. Each new blob gets a linearized copy stored next to it by a background
+"linearize" job; the original is kept unchanged for provenance. Blobs that are already
+linearized, or that qpdf cannot parse, get no copy and are served as uploaded.
+
+Copies are written with a deterministic file ID, so linearizing the same blob
+twice yields identical bytes. Until the job has recorded its outcome on the
+blob, the original is served and must be revalidated.
+
+Disable the stage by setting PDF_LINEARIZE=0; the job then records that no copy exists.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import logging
+import os
+import uuid
+
+# Third-Party Imports
+import pikepdf
+from sqlalchemy.orm import Session
+
+# Local Imports
+from . import crud
+from .storage import PARTIAL_UPLOAD_SUFFIX, blob_relative_path, linearized_relative_path
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Configuration Constants
+# ============================
+
+# Whether uploads get a linearized copy at ingest
+LINEARIZE_ENABLED = os.getenv("PDF_LINEARIZE", "1").lower() in ("1", "true", "yes")
+
+# ============================
+# Linearization
+# ============================
+
+def linearize_blob(directory: str, content_hash: str) -> bool:
+    """
+    Writes a linearized copy of a stored blob unless one exists or the blob needs none.
+
+    Args:
+        directory (str): The upload folder blobs are stored under.
+        content_hash (str): Hex SHA-256 digest of the blob.
+
+    Returns:
+        bool: True if a linearized copy exists afterwards.
+    """
+    source_path = os.path.join(directory, blob_relative_path(content_hash))
+    target_path = os.path.join(directory, linearized_relative_path(content_hash))
+    if os.path.exists(target_path):
+        return True
+
+    temp_path = os.path.join(os.path.dirname(target_path), f".{uuid.uuid4().hex}{PARTIAL_UPLOAD_SUFFIX}")
+    try:
+        with pikepdf.open(source_path) as pdf:
+            if pdf.is_linearized:
+                logger.info(f"Blob {content_hash} is already linearized; serving it as uploaded.")
+                return False
+            pdf.save(temp_path, linearize=True, deterministic_id=True)
+        with open(temp_path, "rb") as buffer:
+            # Make the contents durable before the rename makes them visible
+            os.fsync(buffer.fileno())
+        os.replace(temp_path, target_path)
+    except pikepdf.PdfError as e:
+        logger.warning(f"Could not linearize blob {content_hash}; serving it as uploaded: {e}")
+        return False
+    finally:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+
+    logger.info(f"Wrote linearized copy of blob {content_hash} ({os.path.getsize(target_path)} bytes).")
+    return True
+
+
+def run_linearize_job(payload: dict) -> bool:
+    """
+    Job handler for "linearize", run in a worker process.
+
+    Args:
+        payload (dict): The upload folder as "directory" and the blob's "content_hash".
+
+    Returns:
+        bool: True if a linearized copy exists afterwards.
+    """
+    if not LINEARIZE_ENABLED:
+        return False
+    return linearize_blob(payload["directory"], payload["content_hash"])
+
+
+def save_linearize_result(db: Session, payload: dict, linearized: bool) -> None:
+    """
+    Records the outcome of a "linearize" job on its blob, which switches downloads over to the copy.
+
+    Args:
+        db (Session): The database session.
+        payload (dict): The job's payload.
+        linearized (bool): What `run_linearize_job` returned.
+    """
+    crud.set_blob_linearized(db, payload["content_hash"], linearized)
@@ -11,19 +11,32 @@ uvicorn main:app --reload --port 8000
 # ============================
 
 # Standard Library Imports
+import asyncio
+import functools
 import os
-import shutil
+import hashlib
+import json
 import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Optional, Tuple
 
 # Third-Party Imports
-from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, status, Form
+from fastapi import FastAPI, File, UploadFile, Depends, HTTPException, status, Form, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 # Local Imports
-from . import models, schemas, crud
-from .database import SessionLocal, engine, delete_all_data
+from . import models, schemas, crud, storage, catalog, annotation_counts
+from .pagination import encode_cursor, decode_cursor
+from .export import EXPORT_MEDIA_TYPES, EXPORT_SERIALIZERS
+from .group_commit import group_commit_writer
+from .jobs import enqueue_job, job_runner
+from .events import annotation_events, format_sse, RESYNC_EVENT, SSE_HEARTBEAT_SECONDS, SSE_RETRY_MS
+from .database import engine, delete_all_data, open_session, run_db
 from .seeder import seed_database
 import uvicorn
 
@@ -73,6 +86,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browsers read the pagination cursor and validators, and let pdf.js detect range support
+    expose_headers=["X-Next-Cursor", "ETag", "Accept-Ranges", "Content-Range", "Content-Length"],
 )
 logger.info("CORS middleware added to FastAPI application.")
 
@@ -80,19 +95,324 @@ logger.info("CORS middleware added to FastAPI application.")
 # Dependency: Database Session
 # ============================
 
-def get_db():
+async def get_db():
     """
     Provides a database session to path operations.
 
+    With DATABASE_ASYNC set this is an AsyncSession; use it through `run_db` or
+    `with_db_session` so the same synchronous `crud` functions serve both modes.
+
     Yields:
-        Session: SQLAlchemy session instance.
+        Union[Session, AsyncSession]: SQLAlchemy session instance.
     """
-    db = SessionLocal()
-    try:
+    async with open_session() as db:
         yield db
-    finally:
-        db.close()
-        logger.debug("Database session closed.")
+    logger.debug("Database session closed.")
+
+def with_db_session(handler):
+    """
+    Turns a synchronous path operation into an async one that runs its body through `run_db`.
+
+    The handler keeps its plain `db: Session` parameter. With the asyncio engine it
+    runs on the event loop and awaits the driver for I/O instead of occupying a
+    threadpool worker; otherwise it runs in the threadpool as before. Handlers must
+    return fully loaded objects, since the response is serialized after the body
+    has finished.
+
+    Args:
+        handler: The path operation function, taking `db` as a keyword argument.
+
+    Returns:
+        The async path operation function.
+    """
+    @functools.wraps(handler)
+    async def wrapper(**kwargs):
+        db = kwargs.pop("db")
+        return await run_db(db, lambda session: handler(db=session, **kwargs))
+    return wrapper
+
+# ============================
+# Dependency: Pagination Cursor
+# ============================
+
+def get_after_id(
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header.")
+) -> Optional[int]:
+    """
+    Decodes the opaque pagination cursor into the key to continue after.
+
+    Args:
+        cursor (str, optional): The cursor returned with the previous page.
+
+    Returns:
+        Optional[int]: The key of the last row on the previous page, or None for the first page.
+
+    Raises:
+        HTTPException: If the cursor is malformed.
+    """
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        logger.warning(f"Rejected invalid pagination cursor: {cursor}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor."
+        )
+
+def set_next_cursor(response: Response, next_after_id: Optional[int]) -> Optional[str]:
+    """
+    Publishes the cursor for the next page in the X-Next-Cursor response header.
+
+    Args:
+        response (Response): The outgoing response.
+        next_after_id (int, optional): The key to continue after, or None on the last page.
+
+    Returns:
+        Optional[str]: The encoded cursor, or None on the last page.
+    """
+    if next_after_id is None:
+        return None
+    next_cursor = encode_cursor(next_after_id)
+    response.headers["X-Next-Cursor"] = next_cursor
+    return next_cursor
+
+# ============================
+# Conditional Request Helpers
+# ============================
+
+def make_etag(request: Request, *revisions: int) -> str:
+    """
+    Builds a strong ETag from the request URL and the revisions its response depends on.
+
+    Args:
+        request (Request): The incoming request; its path and query select the representation.
+        *revisions (int): The revision counters the response is derived from.
+
+    Returns:
+        str: A quoted strong entity tag.
+    """
+    key = f"{request.url.path}?{request.url.query}|{'.'.join(str(r) for r in revisions)}"
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks an If-None-Match header value against the current ETag.
+
+    Args:
+        if_none_match (str, optional): The raw If-None-Match header value.
+        etag (str): The current entity tag.
+
+    Returns:
+        bool: True if the client's cached representation is still current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+def check_not_modified(request: Request, response: Response, *revisions: int) -> Optional[Response]:
+    """
+    Answers a conditional GET from revision counters alone.
+
+    If the client's If-None-Match matches, a 304 response is returned and the route
+    must return it without loading any rows. Otherwise the validator headers are
+    set on the outgoing response and None is returned.
+
+    Args:
+        request (Request): The incoming request.
+        response (Response): The outgoing response.
+        *revisions (int): The revision counters the response is derived from.
+
+    Returns:
+        Optional[Response]: A 304 response, or None if the full response must be built.
+    """
+    etag = make_etag(request, *revisions)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # Cache, but always revalidate
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
+
+# ============================
+# Bulk Request Helpers
+# ============================
+
+# Content types treated as newline-delimited JSON by the bulk endpoints
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+
+async def iter_bulk_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yields the items of a bulk request body along with their zero-based index.
+
+    NDJSON bodies are consumed incrementally from the request stream, one line per
+    item, and yield the raw line. JSON array bodies are parsed whole and yield
+    decoded items.
+
+    Args:
+        request (Request): The incoming request.
+
+    Yields:
+        Tuple[int, Any]: The item's index and its raw line or decoded value.
+
+    Raises:
+        HTTPException: If a JSON body is not an array.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        index = 0
+        buffer = b""
+        async for data in request.stream():
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, line
+                    index += 1
+        if buffer.strip():
+            yield index, buffer
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        items = None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Request body must be a JSON array or NDJSON."
+        )
+    for index, item in enumerate(items):
+        yield index, item
+
+def parse_bulk_item(item: Any) -> schemas.AnnotationCreate:
+    """
+    Validates one bulk item as an annotation.
+
+    Args:
+        item (Any): A raw NDJSON line or an already decoded JSON value.
+
+    Returns:
+        schemas.AnnotationCreate: The validated annotation.
+
+    Raises:
+        ValueError: If the item is not valid JSON or not a valid annotation.
+    """
+    if isinstance(item, bytes):
+        item = json.loads(item)  # json.JSONDecodeError is a ValueError
+    if not isinstance(item, dict):
+        raise ValueError("Item must be a JSON object.")
+    try:
+        return schemas.AnnotationCreate(**item)
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+        ))
+
+# ============================
+# Live Event Helpers
+# ============================
+
+def build_annotation_event(
+    event_type: str,
+    revision: int,
+    annotation_id: int,
+    annotation: Optional[models.Annotation] = None
+) -> dict:
+    """
+    Builds the compact live event for a committed annotation change.
+
+    Creates and updates carry the compact annotation; deletes carry only its ID.
+
+    Args:
+        event_type (str): "create", "update" or "delete".
+        revision (int): The document revision the change produced.
+        annotation_id (int): The ID of the annotation.
+        annotation (models.Annotation, optional): The annotation, for creates and updates.
+
+    Returns:
+        dict: The JSON-ready event.
+    """
+    event = {"type": event_type, "revision": revision}
+    if annotation is not None:
+        event["annotation"] = jsonable_encoder({
+            column.key: getattr(annotation, column.key) for column in crud.SLIM_ANNOTATION_COLUMNS
+        })
+    else:
+        event["id"] = annotation_id
+    return event
+
+def publish_annotation_event(
+    db: Session,
+    event_type: str,
+    document_id: int,
+    annotation_id: int,
+    annotation: Optional[models.Annotation] = None
+) -> None:
+    """
+    Publishes a committed annotation change to the document's live subscribers.
+    Safe to call from threadpool route handlers.
+
+    Each event is stamped with the document revision the change produced, so
+    clients can tell whether they missed anything.
+
+    Args:
+        db (Session): Database session dependency.
+        event_type (str): "create", "update" or "delete".
+        document_id (int): The ID of the document the annotation belongs to.
+        annotation_id (int): The ID of the annotation.
+        annotation (models.Annotation, optional): The annotation, for creates and updates.
+    """
+    if not annotation_events.has_subscribers(document_id):
+        return
+    revision = crud.get_annotation_change_revision(db, document_id=document_id, annotation_id=annotation_id)
+    annotation_events.publish_threadsafe(
+        document_id, build_annotation_event(event_type, revision, annotation_id, annotation)
+    )
+
+def check_annotation_geometry(db: Session, box: Any) -> None:
+    """
+    Rejects an annotation box that does not fit its page, once the document's pages are known.
+
+    Args:
+        db (Session): Database session dependency.
+        box (Any): The annotation, or a crud.AnnotationBox.
+
+    Raises:
+        HTTPException: If the page does not exist or the box extends past it.
+    """
+    error = crud.get_annotation_geometry_errors(db, [box])[0]
+    if error is not None:
+        logger.warning(f"Rejected annotation on document ID {box.document_id}: {error}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=error
+        )
+
+def create_annotation_in_session(db: Session, annotation: schemas.AnnotationCreate) -> models.Annotation:
+    """
+    Creates and commits a single annotation, then publishes it to live subscribers.
+
+    Args:
+        db (Session): Database session dependency.
+        annotation (schemas.AnnotationCreate): The annotation data.
+
+    Returns:
+        models.Annotation: The created annotation, with its document loaded.
+
+    Raises:
+        HTTPException: If the annotation does not fit its page.
+    """
+    check_annotation_geometry(db, annotation)
+    created_annotation = crud.create_annotation(db=db, annotation=annotation)
+    publish_annotation_event(
+        db, "create", created_annotation.document_id, created_annotation.id, created_annotation
+    )
+    # Load the nested document here so serializing the response does no I/O on the event loop
+    crud.load_document_type(db, created_annotation.document)
+    return created_annotation
 
 # ============================
 # Configuration Constants
@@ -103,207 +423,1511 @@ UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "/app/uploaded_files")
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 logger.info(f"Upload folder set to: {UPLOAD_FOLDER}")
 
-# ============================
-# Static Files Configuration
-# ============================
+# Directory staging the chunks of resumable uploads; kept outside the served upload folder
+UPLOAD_STAGING_FOLDER = os.getenv(
+    "UPLOAD_STAGING_FOLDER",
+    os.path.join(os.path.dirname(os.path.abspath(UPLOAD_FOLDER)), "upload_staging")
+)
+os.makedirs(UPLOAD_STAGING_FOLDER, exist_ok=True)
+logger.info(f"Upload staging folder set to: {UPLOAD_STAGING_FOLDER}")
+
+# ============================
+# Static Files Configuration
+# ============================
+
+# Mount the 'uploaded_files' directory to serve uploaded PDFs
+app.mount(
+    "/uploaded_files",
+    StaticFiles(directory=UPLOAD_FOLDER),
+    name="uploaded_files"
+)
+logger.info(f"Static files mounted at '/uploaded_files' serving directory: {UPLOAD_FOLDER}")
+
+# ============================
+# Upload Helpers
+# ============================
+
+async def acquire_uploaded_blob(
+    db: Session, content_hash: str, size: int, write: Callable[[], Awaitable[str]]
+) -> storage.StoredBlob:
+    """
+    Takes a reference to the blob holding an upload's contents, writing its file unless another upload already does.
+
+    The reference is committed before anything is written, and blobs are only deleted
+    while unreferenced and locked, so the file cannot be removed by a concurrent
+    re-upload or deletion once written. The upload holding the first reference writes
+    the file; a later one writes it too while it is still missing, in case the first
+    upload is still writing or failed, since identical bytes are renamed into place
+    atomically. If writing fails the reference is released again.
+
+    Args:
+        db (Session): Database session.
+        content_hash (str): Hex SHA-256 digest of the contents.
+        size (int): Size of the contents in bytes.
+        write (Callable[[], Awaitable[str]]): Writes the blob and returns its path.
+
+    Returns:
+        storage.StoredBlob: The referenced blob, to pass to `save_uploaded_document`.
+    """
+    def acquire(session: Session) -> bool:
+        created = crud.acquire_blob(session, content_hash, size)
+        session.commit()
+        return created
+
+    created = await run_db(db, acquire)
+    try:
+        written = created or not await storage.blob_exists(UPLOAD_FOLDER, content_hash)
+        if written:
+            await write()
+    except Exception:
+        await release_uploaded_blob(db, content_hash)
+        raise
+    path = os.path.join(UPLOAD_FOLDER, storage.blob_relative_path(content_hash))
+    return storage.StoredBlob(path=path, content_hash=content_hash, size=size, written=written)
+
+
+async def release_uploaded_blob(db: Session, content_hash: str) -> None:
+    """
+    Releases the blob reference an upload took when the upload cannot be saved.
+
+    Args:
+        db (Session): Database session.
+        content_hash (str): Hex SHA-256 digest of the blob.
+    """
+    def release(session: Session) -> bool:
+        session.rollback()  # Discard whatever the failed save left behind
+        unreferenced = crud.release_blob(session, content_hash)
+        session.commit()
+        return unreferenced
+
+    if await run_db(db, release):
+        await delete_unreferenced_blob(content_hash)
+
+
+async def delete_unreferenced_blob(content_hash: str) -> None:
+    """
+    Deletes a blob and its files if no document references it any more.
+
+    The reference count is checked again, and the files removed, inside the
+    transaction that deletes the blob, so an upload of the same contents that
+    took a new reference in the meantime keeps its file. Runs in its own session
+    so that the commit does not expire the caller's loaded objects.
+
+    Args:
+        content_hash (str): Hex SHA-256 digest of the blob.
+    """
+    def forget(session: Session) -> None:
+        if crud.forget_blob(session, content_hash):
+            storage.delete_blob(UPLOAD_FOLDER, content_hash)
+        session.commit()
+
+    async with open_session() as db:
+        await run_db(db, forget)
+
+
+async def save_uploaded_document(
+    db: Session, filename: str, document_type_id: Optional[int], blob: storage.StoredBlob
+) -> models.Document:
+    """
+    Points the document uploaded under `filename` at a stored blob, deleting the blob it replaces if now unreferenced.
+
+    New contents get background jobs extracting their page metadata and text and
+    writing their linearized copy, so the request returns as soon as the document is saved.
+
+    Args:
+        db (Session): Database session.
+        filename (str): The name the document was uploaded under.
+        document_type_id (Optional[int]): The ID of the document type, if applicable.
+        blob (storage.StoredBlob): The stored contents, from `acquire_uploaded_blob`; the document takes over its reference.
+
+    Returns:
+        models.Document: The created or updated document, with its document type and pages loaded.
+    """
+    def save_document(session: Session) -> Tuple[models.Document, Optional[str]]:
+        document, orphaned_hash = crud.create_or_update_document(
+            db=session,
+            file_path=filename,
+            document_type_id=document_type_id,
+            content_hash=blob.content_hash,
+        )
+        payload = {"directory": UPLOAD_FOLDER, "content_hash": blob.content_hash}
+        kinds = []
+        if document.page_count is None:
+            kinds.append("page_metadata")
+        if document.blob.linearized is None:
+            kinds.append("linearize")
+        if document.text_indexed is None:
+            kinds.append("page_text")
+        for kind in kinds:
+            enqueue_job(session, kind, dict(payload, document_id=document.id), document_id=document.id)
+        # The document and its jobs are committed together, as the last step, so a failure
+        # above leaves the blob reference with the upload, which releases it
+        session.commit()
+        return document, orphaned_hash
+
+    def load_document(session: Session, document: models.Document) -> models.Document:
+        session.refresh(document)  # The commit expired the document
+        crud.load_document_type(session, document)  # Load the type and pages while the session can still query
+        document.pages
+        return document
+
+    try:
+        document, orphaned_hash = await run_db(db, save_document)
+    except Exception:
+        await release_uploaded_blob(db, blob.content_hash)
+        raise
+    document = await run_db(db, load_document, document)
+    logger.debug(f"Document created/updated: {document}")
+    if job_runner is not None:
+        job_runner.notify()
+
+    # The previous contents are no longer referenced now that the update has committed
+    if orphaned_hash:
+        await delete_unreferenced_blob(orphaned_hash)
+
+    return document
+
+
+async def get_upload_session(upload_id: str) -> storage.UploadSession:
+    """
+    Resolves the upload session named in the path.
+
+    Args:
+        upload_id (str): Identifier of the session.
+
+    Returns:
+        storage.UploadSession: The session.
+
+    Raises:
+        HTTPException: If the session does not exist.
+    """
+    session = await storage.load_upload_session(UPLOAD_STAGING_FOLDER, upload_id)
+    if session is None:
+        logger.warning(f"Upload session {upload_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+    return session
+
+
+async def describe_upload_session(session: storage.UploadSession) -> schemas.UploadSession:
+    """
+    Builds the response describing an upload session and the chunks received so far.
+
+    Args:
+        session (storage.UploadSession): The session.
+
+    Returns:
+        schemas.UploadSession: The session's state.
+    """
+    chunks = await storage.received_chunks(session)
+    return schemas.UploadSession(
+        upload_id=session.upload_id,
+        filename=session.filename,
+        size=session.size,
+        chunk_size=session.chunk_size,
+        chunk_count=session.chunk_count,
+        document_type_id=session.document_type_id,
+        received_chunks=chunks,
+        received_ranges=session.byte_ranges(chunks),
+    )
+
+# ============================
+# Document Content Helpers
+# ============================
+
+# Cache policy for content-addressed URLs, whose bytes can never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Which stored bytes of a document to serve
+DocumentVariant = Literal["linearized", "original"]
+
+def document_file_response(
+    request: Request, document: models.Document, variant: DocumentVariant, immutable: bool
+) -> Response:
+    """
+    Serves a document's PDF with range support and a strong ETag derived from its content hash.
+
+    The linearized variant falls back to the original when the blob has no
+    linearized copy, because it was uploaded linearized or could not be parsed.
+    While the linearize job is still pending the original is served with
+    revalidation even on the content-addressed URL, so clients switch to the
+    copy once it exists.
+    Single and multiple byte ranges, If-Range and HEAD are handled by FileResponse,
+    which also hands the file to the server for zero-copy sending when the server
+    supports the ASGI path send extension. If-None-Match is answered here with 304
+    without touching the file.
+
+    Args:
+        request (Request): The incoming request.
+        document (models.Document): The document whose contents to serve.
+        variant (DocumentVariant): "linearized" for fast first-page display, or "original" for the uploaded bytes.
+        immutable (bool): Whether the URL names the content hash, so the response may be cached forever.
+
+    Returns:
+        Response: The file response, or a 304 response.
+
+    Raises:
+        HTTPException: If the document has no stored contents.
+    """
+    if document.storage_path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document has no stored contents."
+        )
+
+    path = os.path.join(UPLOAD_FOLDER, document.storage_path)
+    etag = f'"{document.content_hash}"'
+    if variant == "linearized":
+        if document.blob.linearized:
+            path = os.path.join(UPLOAD_FOLDER, storage.linearized_relative_path(document.content_hash))
+            etag = f'"{document.content_hash}.linearized"'
+        elif document.blob.linearized is None:
+            immutable = False
+
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        logger.error(f"Blob {document.content_hash} of document ID {document.id} is missing from '{UPLOAD_FOLDER}'.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document contents not found."
+        )
+    return FileResponse(
+        path,
+        headers=headers,
+        media_type="application/pdf",
+        filename=document.file_path,
+        stat_result=stat_result,
+        content_disposition_type="inline",
+    )
+
+# ============================
+# API Routes
+# ============================
+
+@app.post(
+    "/documents/",
+    response_model=schemas.DocumentDetail,
+    status_code=status.HTTP_201_CREATED,
+    summary="Upload a new PDF document",
+    description="Uploads a PDF file and creates a corresponding document entry in the database."
+)
+async def upload_document(
+    file: UploadFile = File(..., description="The PDF file to upload."),
+    document_type_id: int = Form(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Uploads a PDF document and stores it in the server's upload directory.
+
+    The contents are stored once under their SHA-256 digest and shared with every
+    other document with identical bytes. The upload is read once, written to a
+    temporary file while it is hashed, and that file is discarded if the contents
+    are already stored. A new file only appears on disk once completely written,
+    and a re-upload that leaves the previous contents unreferenced deletes them.
+
+    Args:
+        file (UploadFile): The PDF file to be uploaded.
+        document_type_id (int, optional): The ID of the document type, if applicable.
+        db (Session): Database session dependency.
+
+    Returns:
+        schemas.DocumentDetail: The created document schema, with its pages if already known.
+
+    Raises:
+        HTTPException: If the file is not a PDF or could not be stored.
+    """
+
+    logger.info(f"Received file upload request: {file.filename} with document type ID: {document_type_id}")
+
+    # Validate file type
+    if not file.filename.lower().endswith(".pdf"):
+        logger.warning(f"Attempted to upload non-PDF file: {file.filename}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type. Only PDF files are allowed."
+        )
+    
+    # Secure the filename to prevent directory traversal attacks
+    filename = os.path.basename(file.filename)
+    logger.info(f"Uploading file '{filename}' to '{UPLOAD_FOLDER}'.")
+
+    staged = None
+    try:
+        staged = await storage.stage_upload(file, UPLOAD_FOLDER)
+        blob = await acquire_uploaded_blob(
+            db, staged.content_hash, staged.size, lambda: storage.store_blob(staged, UPLOAD_FOLDER)
+        )
+        logger.info(f"File '{filename}' uploaded successfully as blob {blob.content_hash}.")
+    except ValueError as e:
+        logger.warning(f"Rejected upload '{filename}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file. {e}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to upload file '{filename}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="File upload failed."
+        )
+    finally:
+        await file.close()
+        if staged is not None:
+            # Left behind when identical contents were already stored
+            await storage.discard_staged_upload(staged)
+
+    # Create or update the document record in the database
+    return await save_uploaded_document(db, filename, document_type_id, blob)
+
+@app.post(
+    "/uploads/",
+    response_model=schemas.UploadSession,
+    status_code=status.HTTP_201_CREATED,
+    summary="Start a resumable upload",
+    description="Creates a resumable upload session for a large PDF. Send its chunks with PUT /uploads/{upload_id}/chunks/{index}, in any order and possibly in parallel, then finalize it with POST /uploads/{upload_id}/complete."
+)
+async def create_upload_session(upload: schemas.UploadSessionCreate):
+    """
+    Starts a resumable chunked upload.
+
+    Args:
+        upload (schemas.UploadSessionCreate): The file name, total size and optional chunk size and document type.
+
+    Returns:
+        schemas.UploadSession: The new session, with no chunks received.
+
+    Raises:
+        HTTPException: If the file name is not a PDF or the chunk size is out of range.
+    """
+    filename = os.path.basename(upload.filename)
+    if not filename.lower().endswith(".pdf"):
+        logger.warning(f"Attempted to start an upload of non-PDF file: {upload.filename}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type. Only PDF files are allowed."
+        )
+    chunk_size = upload.chunk_size or storage.DEFAULT_SESSION_CHUNK_SIZE
+    if not storage.MIN_SESSION_CHUNK_SIZE <= chunk_size <= storage.MAX_SESSION_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"chunk_size must be between {storage.MIN_SESSION_CHUNK_SIZE} and {storage.MAX_SESSION_CHUNK_SIZE} bytes."
+        )
+
+    session = await storage.create_upload_session(
+        UPLOAD_STAGING_FOLDER, filename, upload.size, chunk_size, upload.document_type_id
+    )
+    logger.info(f"Started upload session {session.upload_id} for '{filename}'.")
+    return await describe_upload_session(session)
+
+@app.get(
+    "/uploads/{upload_id}",
+    response_model=schemas.UploadSession,
+    summary="Retrieve the state of a resumable upload",
+    description="Lists the chunks and byte ranges received so far, so an interrupted client can send only what is missing."
+)
+async def read_upload_session(upload_id: str):
+    """
+    Retrieves the state of a resumable upload.
+
+    Args:
+        upload_id (str): Identifier of the session.
+
+    Returns:
+        schemas.UploadSession: The session and the chunks received so far.
+
+    Raises:
+        HTTPException: If the session does not exist.
+    """
+    session = await get_upload_session(upload_id)
+    return await describe_upload_session(session)
+
+@app.put(
+    "/uploads/{upload_id}/chunks/{index}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Upload one chunk of a resumable upload",
+    description="Stores chunk `index` from the raw request body. Every chunk must be exactly chunk_size bytes except the last. Re-sending a chunk replaces it."
+)
+async def upload_chunk(upload_id: str, index: int, request: Request):
+    """
+    Stages one chunk of a resumable upload, streaming the request body to disk.
+
+    Args:
+        upload_id (str): Identifier of the session.
+        index (int): Zero-based index of the chunk.
+        request (Request): The request whose body is the chunk's bytes.
+
+    Returns:
+        Response: An empty 204 response.
+
+    Raises:
+        HTTPException: If the session does not exist, the index is out of range or the chunk has the wrong length.
+    """
+    session = await get_upload_session(upload_id)
+    if not 0 <= index < session.chunk_count:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Chunk index must be between 0 and {session.chunk_count - 1}."
+        )
+
+    try:
+        await storage.store_chunk(session, index, request.stream())
+    except ValueError as e:
+        logger.warning(f"Rejected chunk {index} of upload session {upload_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid chunk. {e}"
+        )
+    except FileNotFoundError:
+        # The session was finalized or discarded while the chunk was arriving
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+
+    logger.debug(f"Stored chunk {index} of upload session {upload_id}.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@app.post(
+    "/uploads/{upload_id}/complete",
+    response_model=schemas.DocumentDetail,
+    status_code=status.HTTP_201_CREATED,
+    summary="Finalize a resumable upload",
+    description="Assembles the received chunks into the stored PDF and creates or updates the corresponding document, exactly as POST /documents/ does."
+)
+async def complete_upload_session(upload_id: str, db: Session = Depends(get_db)):
+    """
+    Finalizes a resumable upload once every chunk has been received.
+
+    Args:
+        upload_id (str): Identifier of the session.
+        db (Session): Database session dependency.
+
+    Returns:
+        schemas.DocumentDetail: The created or updated document.
+
+    Raises:
+        HTTPException: If the session does not exist, chunks are missing, or the contents are not a PDF.
+    """
+    session = await get_upload_session(upload_id)
+    chunks = await storage.received_chunks(session)
+    if len(chunks) < session.chunk_count:
+        missing = sorted(set(range(session.chunk_count)) - set(chunks))
+        logger.warning(f"Upload session {upload_id} finalized with {len(missing)} chunks missing.")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Upload is incomplete; missing chunks: {missing}"
+        )
+
+    try:
+        content_hash = await storage.hash_upload_session(session)
+        blob = await acquire_uploaded_blob(
+            db, content_hash, session.size, lambda: storage.assemble_upload(session, UPLOAD_FOLDER, content_hash)
+        )
+    except ValueError as e:
+        logger.warning(f"Rejected upload session {upload_id}: {e}")
+        await storage.discard_upload_session(session)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file. {e}"
+        )
+    except Exception as e:
+        logger.error(f"Failed to assemble upload session {upload_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="File upload failed."
+        )
+
+    document = await save_uploaded_document(db, session.filename, session.document_type_id, blob)
+    await storage.discard_upload_session(session)
+    logger.info(f"Upload session {upload_id} finalized as document {document.id}.")
+    return document
+
+@app.delete(
+    "/uploads/{upload_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Abort a resumable upload",
+    description="Discards an upload session and all of its received chunks."
+)
+async def abort_upload_session(upload_id: str):
+    """
+    Aborts a resumable upload.
+
+    Args:
+        upload_id (str): Identifier of the session.
+
+    Returns:
+        Response: An empty 204 response.
+
+    Raises:
+        HTTPException: If the session does not exist.
+    """
+    session = await get_upload_session(upload_id)
+    await storage.discard_upload_session(session)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@app.get(
+    "/documents/",
+    response_model=list[schemas.Document],
+    summary="Retrieve a list of documents",
+    description="Fetches a page of uploaded PDF documents ordered by ID. The next page's cursor is returned in the X-Next-Cursor header."
+)
+@with_db_session
+def read_documents(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = Depends(get_after_id),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves a page of documents from the database.
+
+    Args:
+        response (Response): The outgoing response, used to publish the next cursor.
+        limit (int): Maximum number of records to return.
+        after_id (int, optional): Decoded pagination cursor.
+        db (Session): Database session dependency.
+
+    Returns:
+        List[schemas.Document]: A list of document schemas.
+    """
+    documents, next_after_id = crud.get_documents(db, after_id=after_id, limit=limit)
+    set_next_cursor(response, next_after_id)
+    logger.info(f"Retrieved {len(documents)} documents from the database.")
+    return documents
+
+@app.get(
+    "/documents/{document_id}",
+    response_model=schemas.DocumentDetail,
+    summary="Retrieve a specific document",
+    description="Fetches a single document by its ID, with the size and rotation of each page once extracted."
+)
+@with_db_session
+def get_document(
+    document_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves a specific document by its ID.
+
+    Args:
+        document_id (int): The ID of the document to retrieve.
+        db (Session): Database session dependency.
+
+    Returns:
+        schemas.DocumentDetail: The requested document schema, including its pages.
+
+    Raises:
+        HTTPException: If the document is not found.
+    """
+    document = crud.get_document(db, document_id=document_id)
+    if document is None:
+        logger.warning(f"Document with ID {document_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+    document.pages  # Load the pages while the session can still query
+    logger.info(f"Document retrieved: {document}")
+    return document
+
+@app.api_route(
+    "/documents/{document_id}/content",
+    methods=["GET", "HEAD"],
+    response_class=FileResponse,
+    summary="Download a document's current PDF",
+    description="Serves the PDF the document currently points at, with byte range support; linearized for fast first-page display unless variant=original. The ETag is derived from the content hash and clients must revalidate; prefer the content-addressed URL, which can be cached forever."
+)
+@with_db_session
+def get_document_content(
+    document_id: int,
+    request: Request,
+    variant: DocumentVariant = Query("linearized"),
+    db: Session = Depends(get_db)
+):
+    """
+    Serves a document's current PDF.
+
+    Args:
+        document_id (int): The ID of the document.
+        request (Request): The incoming request.
+        variant (DocumentVariant): "linearized" (the default) or "original" for the bytes as uploaded.
+        db (Session): Database session dependency.
+
+    Returns:
+        Response: The PDF, a byte range of it, or a 304 response.
+
+    Raises:
+        HTTPException: If the document or its contents are not found.
+    """
+    document = crud.get_document(db, document_id=document_id)
+    if document is None:
+        logger.warning(f"Document with ID {document_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+    return document_file_response(request, document, variant, immutable=False)
+
+@app.api_route(
+    "/documents/{document_id}/content/{content_hash}.pdf",
+    methods=["GET", "HEAD"],
+    response_class=FileResponse,
+    summary="Download a specific version of a document's PDF",
+    description="Serves the PDF with the given content hash while the document points at it, linearized unless variant=original. The bytes behind this URL never change, so it is cached as immutable; ranges are supported for incremental loading."
+)
+@with_db_session
+def get_document_content_version(
+    document_id: int,
+    content_hash: str,
+    request: Request,
+    variant: DocumentVariant = Query("linearized"),
+    db: Session = Depends(get_db)
+):
+    """
+    Serves a content-addressed version of a document's PDF.
+
+    Args:
+        document_id (int): The ID of the document.
+        content_hash (str): The SHA-256 of the requested contents.
+        request (Request): The incoming request.
+        variant (DocumentVariant): "linearized" (the default) or "original" for the bytes as uploaded.
+        db (Session): Database session dependency.
+
+    Returns:
+        Response: The PDF, a byte range of it, or a 304 response.
+
+    Raises:
+        HTTPException: If the document is not found or no longer has these contents.
+    """
+    document = crud.get_document(db, document_id=document_id)
+    if document is None or document.content_hash != content_hash:
+        logger.warning(f"Document with ID {document_id} and content hash {content_hash} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document version not found."
+        )
+    return document_file_response(request, document, variant, immutable=True)
+
+@app.get(
+    "/documents/{document_id}/jobs",
+    response_model=list[schemas.Job],
+    summary="Retrieve a document's background jobs",
+    description="Lists the post-upload processing jobs of a document, oldest first, with their status."
+)
+@with_db_session
+def get_document_jobs(
+    document_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the background jobs of a document.
+
+    Args:
+        document_id (int): The ID of the document.
+        db (Session): Database session dependency.
+
+    Returns:
+        List[schemas.Job]: The document's jobs.
+
+    Raises:
+        HTTPException: If the document is not found.
+    """
+    if crud.get_document_revision(db, document_id) is None:
+        logger.warning(f"Document with ID {document_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+    jobs = crud.get_document_jobs(db, document_id=document_id)
+    logger.info(f"Retrieved {len(jobs)} jobs for document ID {document_id}.")
+    return jobs
+
+@app.get(
+    "/documents/{document_id}/completeness",
+    response_model=schemas.DocumentCompleteness,
+    summary="Check a document's data elements",
+    description="Reports which data elements of the document's type are annotated, which required ones are missing "
+                "and which that allow only one value are annotated more than once."
+)
+@with_db_session
+def get_document_completeness(
+    document_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """
+    Checks a document's annotations against the data elements of its type.
+
+    Answers If-None-Match with 304 when neither the document's revision nor the
+    catalog revision has changed.
+
+    Args:
+        document_id (int): The ID of the document.
+        request (Request): The incoming request.
+        response (Response): The outgoing response, used to publish the ETag.
+        db (Session): Database session dependency.
+
+    Returns:
+        schemas.DocumentCompleteness: The document's completeness.
+
+    Raises:
+        HTTPException: If the document is not found.
+    """
+    document = crud.get_document(db, document_id=document_id)
+    if document is None:
+        logger.warning(f"Document with ID {document_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+    catalog_revision = crud.get_revision(db, crud.CATALOG_REVISION)
+    not_modified = check_not_modified(request, response, document.revision, catalog_revision)
+    if not_modified is not None:
+        return not_modified
+
+    completeness = catalog.document_completeness(
+        catalog.get_catalog(db, catalog_revision),
+        document_id,
+        document.document_type_id,
+        crud.get_annotation_value_counts(db, document_id=document_id)
+    )
+    logger.info(
+        f"Document ID {document_id} is missing {len(completeness.missing_required)} required and "
+        f"duplicates {len(completeness.duplicated)} single-valued data elements."
+    )
+    return completeness
+
+@app.get(
+    "/jobs/{job_id}",
+    response_model=schemas.Job,
+    summary="Retrieve a background job",
+    description="Fetches the status, attempts, last error and result of a background job."
+)
+@with_db_session
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves a background job.
+
+    Args:
+        job_id (int): The ID of the job.
+        db (Session): Database session dependency.
+
+    Returns:
+        schemas.Job: The job.
+
+    Raises:
+        HTTPException: If the job is not found.
+    """
+    job = crud.get_job(db, job_id=job_id)
+    if job is None:
+        logger.warning(f"Job with ID {job_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found."
+        )
+    return job
+
+@app.get(
+    "/search",
+    response_model=schemas.SearchResults,
+    summary="Search the text of documents",
+    description="Finds the document pages containing every word of the query, best matches first, with a snippet "
+                "around the match. Double-quoted phrases must appear as consecutive words."
+)
+@with_db_session
+def search_documents(
+    q: str = Query(..., min_length=1, description='Words and "quoted phrases" that must all appear on the page.'),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Searches the extracted page text of all documents.
+
+    Args:
+        q (str): The query.
+        limit (int): Maximum number of hits to return.
+        offset (int): Number of hits to skip.
+        db (Session): Database session dependency.
+
+    Returns:
+        schemas.SearchResults: The matching pages.
+
+    Raises:
+        HTTPException: If the query has no terms.
+    """
+    terms = crud.parse_search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query has no terms."
+        )
+    hits = crud.search_page_text(db, terms=terms, limit=limit, offset=offset)
+    logger.info(f"Search for {q!r} returned {len(hits)} hits.")
+    return {"query": q, "hits": [hit._asdict() for hit in hits]}
+
+@app.get(
+    "/search/annotations",
+    response_model=schemas.AnnotationSearchResults,
+    summary="Search annotation values",
+    description="Finds the annotations whose value or annotation_value contains every word and \"quoted phrase\" "
+                "of the query, anywhere and ignoring case, best matches first. Optionally restricted to a document "
+                "type, a data element or the user who created them."
+)
+@with_db_session
+def search_annotations(
+    q: str = Query(..., min_length=1, description='Words and "quoted phrases" that must all appear in the annotation.'),
+    document_type_id: Optional[int] = Query(None, description="Only annotations on documents of this type."),
+    data_element_id: Optional[int] = Query(None, description="Only annotations of this data element."),
+    created_by: Optional[str] = Query(None, description="Only annotations created by this user."),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Searches the values of all annotations.
+
+    Args:
+        q (str): The query.
+        document_type_id (int, optional): Document type to restrict the search to.
+        data_element_id (int, optional): Data element to restrict the search to.
+        created_by (str, optional): Creator to restrict the search to.
+        limit (int): Maximum number of hits to return.
+        offset (int): Number of hits to skip.
+        db (Session): Database session dependency.
+
+    Returns:
+        schemas.AnnotationSearchResults: The matching annotations.
+
+    Raises:
+        HTTPException: If the query has no terms or the data element is not found.
+    """
+    terms = crud.parse_search_terms(q)
+    if not terms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query has no terms."
+        )
+    data_element_name = None
+    if data_element_id is not None:
+        data_element = crud.get_data_element(db, data_element_id=data_element_id)
+        if data_element is None:
+            logger.warning(f"Data element with ID {data_element_id} not found.")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Data element not found."
+            )
+        data_element_name = data_element.name
+    hits = crud.search_annotations(
+        db,
+        terms=terms,
+        limit=limit,
+        offset=offset,
+        document_type_id=document_type_id,
+        data_element_name=data_element_name,
+        created_by=created_by,
+    )
+    logger.info(f"Annotation search for {q!r} returned {len(hits)} hits.")
+    return {"query": q, "hits": hits}
+
+@app.post(
+    "/annotations/",
+    response_model=schemas.Annotation,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new annotation",
+    description="Creates a new annotation for a specified document."
+)
+async def create_annotation(
+    annotation: schemas.AnnotationCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Creates a new annotation associated with a document.
+
+    With ANNOTATION_GROUP_COMMIT enabled, the annotation is handed to the
+    group-commit writer and committed together with concurrent creates.
+    Otherwise it is committed on its own.
+
+    Args:
+        annotation (schemas.AnnotationCreate): The annotation data.
+        db (Session): Database session dependency.
 
-# Mount the 'uploaded_files' directory to serve uploaded PDFs
-app.mount(
-    "/uploaded_files",
-    StaticFiles(directory=UPLOAD_FOLDER),
-    name="uploaded_files"
-)
-logger.info(f"Static files mounted at '/uploaded_files' serving directory: {UPLOAD_FOLDER}")
+    Returns:
+        schemas.Annotation: The created annotation schema.
 
-# ============================
-# API Routes
-# ============================
+    Raises:
+        HTTPException: If the annotation does not fit its page, or group commit is enabled and the document is not found.
+    """
+    if group_commit_writer is None:
+        created_annotation = await run_db(db, create_annotation_in_session, annotation)
+        logger.info(f"Annotation created: {created_annotation}")
+        return created_annotation
+
+    await run_db(db, check_annotation_geometry, annotation)
+    result = await group_commit_writer.submit(annotation)
+    if result is None:
+        logger.warning(f"Document with ID {annotation.document_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+    created_annotation, revision = result
+    if annotation_events.has_subscribers(created_annotation.document_id):
+        annotation_events.publish(
+            created_annotation.document_id,
+            build_annotation_event("create", revision, created_annotation.id, created_annotation)
+        )
+    logger.info(f"Annotation created: {created_annotation}")
+    return created_annotation
 
 @app.post(
-    "/documents/",
-    response_model=schemas.Document,
+    "/annotations/bulk",
+    response_model=schemas.BulkAnnotationResult,
     status_code=status.HTTP_201_CREATED,
-    summary="Upload a new PDF document",
-    description="Uploads a PDF file and creates a corresponding document entry in the database."
+    summary="Create many annotations at once",
+    description="Creates annotations from a JSON array or an NDJSON stream (Content-Type: application/x-ndjson) "
+                "in a single transaction. With partial=true, invalid items are reported and skipped instead of "
+                "rejecting the whole batch."
 )
-async def upload_document(
-    file: UploadFile = File(..., description="The PDF file to upload."),
-    document_type_id: int = Form(None),
+async def bulk_create_annotations(
+    request: Request,
+    partial: bool = Query(False, description="Insert the valid items even if some items are invalid."),
     db: Session = Depends(get_db)
 ):
     """
-    Uploads a PDF document and stores it in the server's upload directory.
+    Creates a batch of annotations with chunked multi-row inserts in one transaction.
+
+    Items are validated one at a time as they are read and inserted in chunks of
+    crud.BULK_INSERT_CHUNK_SIZE, so an NDJSON upload is never held in memory whole.
 
     Args:
-        file (UploadFile): The PDF file to be uploaded.
-        document_type_id (int, optional): The ID of the document type, if applicable.
+        request (Request): The incoming request carrying the annotations.
+        partial (bool): Insert the valid items even if some items are invalid.
         db (Session): Database session dependency.
 
     Returns:
-        schemas.Document: The created document schema.
-    """
+        schemas.BulkAnnotationResult: The new annotation IDs and any rejected items.
 
-    logger.info(f"Received file upload request: {file.filename} with document type ID: {document_type_id}")
+    Raises:
+        HTTPException: If the body is malformed, or any item is invalid and partial is false.
+    """
+    ids = []
+    created = []
+    errors = []
+    chunk = []
+    known_document_ids = set()
 
-    # Validate file type
-    if not file.filename.lower().endswith(".pdf"):
-        logger.warning(f"Attempted to upload non-PDF file: {file.filename}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid file type. Only PDF files are allowed."
-        )
-    
-    # Secure the filename to prevent directory traversal attacks
-    filename = os.path.basename(file.filename)
-    file_location = os.path.join(UPLOAD_FOLDER, filename)
-    logger.info(f"Uploading file '{filename}' to '{file_location}'.")
+    def insert_chunk(session: Session):
+        # Reject items that point at unknown documents or lie outside their page, then insert the rest in one statement
+        unknown_ids = {a.document_id for _, a in chunk} - known_document_ids
+        known_document_ids.update(crud.get_existing_document_ids(session, unknown_ids))
+        placed = []
+        for index, annotation in chunk:
+            if annotation.document_id in known_document_ids:
+                placed.append((index, annotation))
+            else:
+                errors.append(schemas.BulkAnnotationError(
+                    index=index, detail=f"Document with ID {annotation.document_id} not found."
+                ))
+        valid = []
+        geometry_errors = crud.get_annotation_geometry_errors(session, [annotation for _, annotation in placed])
+        for (index, annotation), error in zip(placed, geometry_errors):
+            if error is None:
+                valid.append(annotation)
+            else:
+                errors.append(schemas.BulkAnnotationError(index=index, detail=error))
+        if errors and not partial:
+            return  # The batch will be rejected; keep validating without inserting
+        new_ids = crud.insert_annotations_chunk(session, valid)
+        ids.extend(new_ids)
+        created.extend((a.document_id, new_id) for a, new_id in zip(valid, new_ids))
 
     try:
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        logger.info(f"File '{filename}' uploaded successfully.")
-    except Exception as e:
-        logger.error(f"Failed to upload file '{filename}': {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="File upload failed."
-        )
-    finally:
-        file.file.close()
+        async for index, item in iter_bulk_items(request):
+            try:
+                chunk.append((index, parse_bulk_item(item)))
+            except ValueError as e:
+                errors.append(schemas.BulkAnnotationError(index=index, detail=str(e)))
+            if len(chunk) >= crud.BULK_INSERT_CHUNK_SIZE:
+                await run_db(db, insert_chunk)
+                chunk = []
+        await run_db(db, insert_chunk)
+        errors.sort(key=lambda error: error.index)
 
-    # Create or update the document record in the database
-    document = crud.create_or_update_document(db=db, file_path=filename, document_type_id=document_type_id)
-    logger.debug(f"Document created/updated: {document}")
+        if errors and not partial:
+            await run_db(db, Session.rollback)
+            logger.warning(f"Rejected bulk annotation create with {len(errors)} invalid items.")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=[error.dict() for error in errors]
+            )
 
-    return document
+        await run_db(db, crud.record_bulk_annotation_changes, created)
+        await run_db(db, Session.commit)
+    except Exception:
+        await run_db(db, Session.rollback)
+        raise
+
+    # A bulk load is too large to push as diffs; have live viewers pull it instead
+    for document_id in {document_id for document_id, _ in created}:
+        annotation_events.publish(document_id, RESYNC_EVENT)
+
+    logger.info(f"Bulk created {len(ids)} annotations; {len(errors)} items rejected.")
+    return {"ids": ids, "errors": errors}
 
 @app.get(
-    "/documents/",
-    response_model=list[schemas.Document],
-    summary="Retrieve a list of documents",
-    description="Fetches a list of uploaded PDF documents with pagination support."
+    "/annotations/{document_id}",
+    response_model=list[schemas.Annotation],
+    summary="Retrieve annotations for a document",
+    description="Fetches the annotations associated with a specific document, ordered by ID. All are returned unless a limit is given; the next page's cursor is returned in the X-Next-Cursor header."
 )
-def read_documents(
-    skip: int = 0,
-    limit: int = 100,
+@with_db_session
+def get_annotations(
+    document_id: int,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    after_id: Optional[int] = Depends(get_after_id),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieves a list of documents from the database.
+    Retrieves the annotations for a given document.
+
+    Answers If-None-Match with 304 when neither the document's revision nor the
+    catalog revision has changed.
 
     Args:
-        skip (int): Number of records to skip for pagination.
-        limit (int): Maximum number of records to return.
+        document_id (int): The ID of the document.
+        request (Request): The incoming request.
+        response (Response): The outgoing response, used to publish the next cursor and ETag.
+        limit (int, optional): Maximum number of records to return.
+        after_id (int, optional): Decoded pagination cursor.
         db (Session): Database session dependency.
 
     Returns:
-        List[schemas.Document]: A list of document schemas.
+        List[schemas.Annotation]: A list of annotation schemas.
     """
-    documents = crud.get_documents(db, skip=skip, limit=limit)
-    logger.info(f"Retrieved {len(documents)} documents from the database.")
-    return documents
+    revision = crud.get_document_revision(db, document_id=document_id)
+    if revision is not None:
+        not_modified = check_not_modified(
+            request, response, revision, crud.get_revision(db, crud.CATALOG_REVISION)
+        )
+        if not_modified is not None:
+            return not_modified
+
+    annotations, next_after_id = crud.get_annotations_by_document(
+        db, document_id=document_id, after_id=after_id, limit=limit
+    )
+    set_next_cursor(response, next_after_id)
+    logger.info(f"Retrieved {len(annotations)} annotations for document ID {document_id}.")
+    return annotations
 
 @app.get(
-    "/documents/{document_id}",
-    response_model=schemas.Document,
-    summary="Retrieve a specific document",
-    description="Fetches a single document by its ID."
+    "/documents/{document_id}/annotations",
+    response_model=schemas.DocumentAnnotations,
+    summary="Retrieve compact annotations for a document",
+    description="Fetches a document once together with a compact projection of its annotations, ordered by ID. All are returned unless a limit is given."
 )
-def get_document(
+@with_db_session
+def get_document_annotations(
     document_id: int,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
+    after_id: Optional[int] = Depends(get_after_id),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieves a specific document by its ID.
+    Retrieves a document and the slim projection of its annotations.
+
+    Answers If-None-Match with 304 when neither the document's revision nor the
+    catalog revision has changed.
 
     Args:
-        document_id (int): The ID of the document to retrieve.
+        document_id (int): The ID of the document.
+        request (Request): The incoming request.
+        response (Response): The outgoing response, used to publish the next cursor and ETag.
+        limit (int, optional): Maximum number of records to return.
+        after_id (int, optional): Decoded pagination cursor.
         db (Session): Database session dependency.
 
     Returns:
-        schemas.Document: The requested document schema.
+        schemas.DocumentAnnotations: The document and its compact annotations.
 
     Raises:
         HTTPException: If the document is not found.
     """
-    document = crud.get_document(db, document_id=document_id)
-    if document is None:
+    revision = crud.get_document_revision(db, document_id=document_id)
+    if revision is None:
         logger.warning(f"Document with ID {document_id} not found.")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Document not found."
         )
-    logger.info(f"Document retrieved: {document}")
-    return document
+    not_modified = check_not_modified(
+        request, response, revision, crud.get_revision(db, crud.CATALOG_REVISION)
+    )
+    if not_modified is not None:
+        return not_modified
 
-@app.post(
-    "/annotations/",
+    document = crud.get_document_with_data_elements(db, document_id=document_id)
+    annotations, next_after_id = crud.get_slim_annotations_by_document(
+        db, document_id=document_id, after_id=after_id, limit=limit
+    )
+    next_cursor = set_next_cursor(response, next_after_id)
+    logger.info(f"Retrieved {len(annotations)} compact annotations for document ID {document_id}.")
+    return {"document": document, "annotations": annotations, "next_cursor": next_cursor}
+
+@app.get(
+    "/documents/{document_id}/annotations/changes",
+    response_model=schemas.AnnotationChanges,
+    summary="Retrieve annotation changes since a revision",
+    description="Fetches the annotations created, updated or deleted since a document revision or timestamp. "
+                "Syncing from revision 0 returns every current annotation."
+)
+@with_db_session
+def get_annotation_changes(
+    document_id: int,
+    since_revision: int = Query(0, ge=0, description="Document revision the client last synced to."),
+    since: Optional[datetime] = Query(None, description="Only include changes made after this timestamp."),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the net annotation changes for a document.
+
+    Args:
+        document_id (int): The ID of the document.
+        since_revision (int): Document revision the client last synced to.
+        since (datetime, optional): Only include changes made after this timestamp.
+        db (Session): Database session dependency.
+
+    Returns:
+        schemas.AnnotationChanges: Upserted annotations, deleted IDs and the revision to sync from next.
+
+    Raises:
+        HTTPException: If the document is not found.
+    """
+    # Read the revision first so no change can slip between it and the feed query
+    revision = crud.get_document_revision(db, document_id=document_id)
+    if revision is None:
+        logger.warning(f"Document with ID {document_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+    upserted, deleted = crud.get_annotation_changes(
+        db, document_id=document_id, since_revision=since_revision, since=since
+    )
+    logger.info(
+        f"Retrieved {len(upserted)} upserted and {len(deleted)} deleted annotations "
+        f"for document ID {document_id} since revision {since_revision}."
+    )
+    return {"document_id": document_id, "revision": revision, "upserted": upserted, "deleted": deleted}
+
+@app.get(
+    "/documents/{document_id}/annotations/events",
+    response_class=StreamingResponse,
+    summary="Subscribe to live annotation changes",
+    description="Streams annotation create, update and delete events for a document as Server-Sent Events. "
+                "Each event carries the document revision it produced. A resync event means the client "
+                "must re-sync from the changes feed instead of applying diffs."
+)
+async def stream_annotation_events(document_id: int):
+    """
+    Subscribes the client to a document's live annotation events.
+
+    The subscriber's queue is bounded; a client that falls behind is sent a resync
+    event and the stream ends, leaving EventSource to reconnect.
+
+    The document lookup uses a short-lived session of its own rather than the
+    request dependency, so a long-lived stream does not hold a pooled connection.
+
+    Args:
+        document_id (int): The ID of the document.
+
+    Returns:
+        StreamingResponse: The text/event-stream response.
+
+    Raises:
+        HTTPException: If the document is not found.
+    """
+    async with open_session() as db:
+        revision = await run_db(db, crud.get_document_revision, document_id)
+    if revision is None:
+        logger.warning(f"Document with ID {document_id} not found.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found."
+        )
+    subscription = annotation_events.subscribe(document_id)
+
+    async def iter_events() -> AsyncIterator[str]:
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield format_sse(event)
+                if subscription.closed and event["type"] == RESYNC_EVENT["type"]:
+                    break  # Dropped for falling behind
+        finally:
+            annotation_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        iter_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.patch(
+    "/documents/{document_id}/annotations/{annotation_id}",
     response_model=schemas.Annotation,
-    status_code=status.HTTP_201_CREATED,
-    summary="Create a new annotation",
-    description="Creates a new annotation for a specified document."
+    summary="Update an annotation",
+    description="Updates the provided fields of an existing annotation."
 )
-def create_annotation(
-    annotation: schemas.AnnotationCreate,
+@with_db_session
+def update_annotation(
+    document_id: int,
+    annotation_id: int,
+    changes: schemas.AnnotationUpdate,
     db: Session = Depends(get_db)
 ):
     """
-    Creates a new annotation associated with a document.
+    Updates an existing annotation.
 
     Args:
-        annotation (schemas.AnnotationCreate): The annotation data.
+        document_id (int): The ID of the document the annotation belongs to.
+        annotation_id (int): The ID of the annotation.
+        changes (schemas.AnnotationUpdate): The fields to change.
         db (Session): Database session dependency.
 
     Returns:
-        schemas.Annotation: The created annotation schema.
+        schemas.Annotation: The updated annotation schema.
+
+    Raises:
+        HTTPException: If the annotation is not found, or the changes move it off its page.
     """
-    created_annotation = crud.create_annotation(db=db, annotation=annotation)
-    logger.info(f"Annotation created: {created_annotation}")
-    return created_annotation
+    geometry = changes.dict(exclude_unset=True, include=set(crud.AnnotationBox._fields))
+    if geometry:
+        current = crud.get_annotation(db, document_id=document_id, annotation_id=annotation_id)
+        if current is not None:
+            box = crud.AnnotationBox(**{
+                field: geometry.get(field, getattr(current, field)) for field in crud.AnnotationBox._fields
+            })
+            check_annotation_geometry(db, box)
+    updated_annotation = crud.update_annotation(
+        db, document_id=document_id, annotation_id=annotation_id, changes=changes
+    )
+    if updated_annotation is None:
+        logger.warning(f"Annotation with ID {annotation_id} not found on document ID {document_id}.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Annotation not found."
+        )
+    crud.load_document_type(db, updated_annotation.document)  # Load the parent while the session can still query
+    publish_annotation_event(db, "update", document_id, annotation_id, updated_annotation)
+    logger.info(f"Annotation updated: {updated_annotation}")
+    return updated_annotation
+
+@app.delete(
+    "/documents/{document_id}/annotations/{annotation_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete an annotation",
+    description="Deletes an annotation. The deletion is reported to change feed clients as a tombstone."
+)
+@with_db_session
+def delete_annotation(
+    document_id: int,
+    annotation_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    Deletes an annotation.
+
+    Args:
+        document_id (int): The ID of the document the annotation belongs to.
+        annotation_id (int): The ID of the annotation.
+        db (Session): Database session dependency.
+
+    Raises:
+        HTTPException: If the annotation is not found.
+    """
+    if not crud.delete_annotation(db, document_id=document_id, annotation_id=annotation_id):
+        logger.warning(f"Annotation with ID {annotation_id} not found on document ID {document_id}.")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Annotation not found."
+        )
+    publish_annotation_event(db, "delete", document_id, annotation_id)
+    logger.info(f"Annotation with ID {annotation_id} deleted from document ID {document_id}.")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 @app.get(
-    "/annotations/{document_id}",
-    response_model=list[schemas.Annotation],
-    summary="Retrieve annotations for a document",
-    description="Fetches all annotations associated with a specific document."
+    "/documents/{document_id}/pages/{page}/annotations",
+    response_model=list[schemas.AnnotationSlim],
+    summary="Retrieve annotations on a single page",
+    description="Fetches the compact annotations of a document that are located on one page."
 )
-def get_annotations(
+@with_db_session
+def get_page_annotations(
     document_id: int,
+    page: int,
     db: Session = Depends(get_db)
 ):
     """
-    Retrieves all annotations for a given document.
+    Retrieves the annotations on a single page of a document.
 
     Args:
         document_id (int): The ID of the document.
+        page (int): The page number.
         db (Session): Database session dependency.
 
     Returns:
-        List[schemas.Annotation]: A list of annotation schemas.
+        List[schemas.AnnotationSlim]: The compact annotations on the page.
     """
-    annotations = crud.get_annotations_by_document(db, document_id=document_id)
-    logger.info(f"Retrieved {len(annotations)} annotations for document ID {document_id}.")
+    annotations = crud.get_annotations_by_page_range(db, document_id=document_id, first_page=page, last_page=page)
+    logger.info(f"Retrieved {len(annotations)} annotations for document ID {document_id}, page {page}.")
+    return annotations
+
+@app.get(
+    "/documents/{document_id}/pages/annotations",
+    response_model=list[schemas.AnnotationSlim],
+    summary="Retrieve annotations on a range of pages",
+    description="Fetches the compact annotations of a document located between two pages (inclusive)."
+)
+@with_db_session
+def get_page_range_annotations(
+    document_id: int,
+    first_page: int = Query(..., ge=1, description="First page of the range (inclusive)."),
+    last_page: int = Query(..., ge=1, description="Last page of the range (inclusive)."),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the annotations on a range of pages of a document.
+
+    Args:
+        document_id (int): The ID of the document.
+        first_page (int): First page of the range (inclusive).
+        last_page (int): Last page of the range (inclusive).
+        db (Session): Database session dependency.
+
+    Returns:
+        List[schemas.AnnotationSlim]: The compact annotations ordered by page.
+
+    Raises:
+        HTTPException: If the page range is empty.
+    """
+    if first_page > last_page:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="first_page must not be greater than last_page."
+        )
+    annotations = crud.get_annotations_by_page_range(
+        db, document_id=document_id, first_page=first_page, last_page=last_page
+    )
+    logger.info(f"Retrieved {len(annotations)} annotations for document ID {document_id}, pages {first_page}-{last_page}.")
+    return annotations
+
+@app.get(
+    "/documents/{document_id}/pages/{page}/annotations/bbox",
+    response_model=list[schemas.AnnotationSlim],
+    summary="Retrieve annotations intersecting a rectangle",
+    description="Fetches the compact annotations on a page whose boxes intersect a rectangle, for hit-testing and viewport culling."
+)
+@with_db_session
+def get_bbox_annotations(
+    document_id: int,
+    page: int,
+    min_x: float = Query(..., description="Left edge of the rectangle."),
+    min_y: float = Query(..., description="Top edge of the rectangle."),
+    max_x: float = Query(..., description="Right edge of the rectangle."),
+    max_y: float = Query(..., description="Bottom edge of the rectangle."),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the annotations on a page that intersect a rectangle.
+
+    A point hit-test is a rectangle with min_x == max_x and min_y == max_y.
+
+    Args:
+        document_id (int): The ID of the document.
+        page (int): The page number.
+        min_x (float): Left edge of the rectangle.
+        min_y (float): Top edge of the rectangle.
+        max_x (float): Right edge of the rectangle.
+        max_y (float): Bottom edge of the rectangle.
+        db (Session): Database session dependency.
+
+    Returns:
+        List[schemas.AnnotationSlim]: The compact annotations intersecting the rectangle.
+
+    Raises:
+        HTTPException: If the rectangle is inverted.
+    """
+    if min_x > max_x or min_y > max_y:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_x/min_y must not be greater than max_x/max_y."
+        )
+    annotations = crud.get_annotations_in_bbox(
+        db, document_id=document_id, page=page,
+        min_x=min_x, min_y=min_y, max_x=max_x, max_y=max_y
+    )
+    logger.info(f"Retrieved {len(annotations)} annotations in bbox for document ID {document_id}, page {page}.")
     return annotations
 
 @app.get(
     "/documents_with_annotations",
     response_model=list[schemas.DocumentWithAnnotationsCount],
     summary="Retrieve documents with annotation counts",
-    description="Fetches all documents along with the count of annotations associated with each."
+    description="Fetches a page of documents, ordered by ID, along with the count of annotations associated with each, per page and in total, and when they last changed. The next page's cursor is returned in the X-Next-Cursor header."
 )
+@with_db_session
 def get_documents_with_annotations_count(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = Depends(get_after_id),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieves all documents along with the number of annotations each contains.
+    Retrieves documents along with the number of annotations each contains.
+
+    The counts come from counters kept on each document, so a page costs an index
+    scan of the documents table rather than an aggregate over the annotations.
+
+    Answers If-None-Match with 304 when the documents revision has not changed.
 
     Args:
+        request (Request): The incoming request.
+        response (Response): The outgoing response, used to publish the next cursor and ETag.
+        limit (int, optional): Maximum number of records to return.
+        after_id (int, optional): Decoded pagination cursor.
         db (Session): Database session dependency.
 
     Returns:
         List[schemas.DocumentWithAnnotationsCount]: A list of documents with annotation counts.
     """
-    documents = crud.get_documents_with_annotation_count(db)
+    not_modified = check_not_modified(request, response, crud.get_revision(db, crud.DOCUMENTS_REVISION))
+    if not_modified is not None:
+        return not_modified
+
+    documents, next_after_id = crud.get_documents_with_annotation_count(db, after_id=after_id, limit=limit)
+    set_next_cursor(response, next_after_id)
     logger.info(f"Retrieved {len(documents)} documents with annotation counts.")
 
     # Optional: Verify the structure of each document
@@ -312,67 +1936,206 @@ def get_documents_with_annotations_count(
 
     return documents
 
+@app.get(
+    "/incomplete_documents",
+    response_model=list[schemas.IncompleteDocument],
+    summary="Retrieve incomplete documents",
+    description="Fetches a page of documents, ordered by ID, that lack an annotation for a required data element of their type "
+                "or have more than one for an element that allows only one. The next page's cursor is returned in the X-Next-Cursor header."
+)
+@with_db_session
+def get_incomplete_documents(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = Depends(get_after_id),
+    document_type_id: Optional[int] = Query(None, description="Only documents of this type."),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the review queue of incomplete documents.
+
+    Completeness is maintained on each document as its annotations change, so a
+    page is an index range scan however large the corpus. Answers If-None-Match
+    with 304 when neither the documents revision nor the catalog revision has changed.
+
+    Args:
+        request (Request): The incoming request.
+        response (Response): The outgoing response, used to publish the next cursor and ETag.
+        limit (int): Maximum number of records to return.
+        after_id (int, optional): Decoded pagination cursor.
+        document_type_id (int, optional): Only documents of this type.
+        db (Session): Database session dependency.
+
+    Returns:
+        List[schemas.IncompleteDocument]: The incomplete documents with what they lack.
+    """
+    not_modified = check_not_modified(
+        request, response,
+        crud.get_revision(db, crud.DOCUMENTS_REVISION), crud.get_revision(db, crud.CATALOG_REVISION)
+    )
+    if not_modified is not None:
+        return not_modified
+
+    documents, next_after_id = crud.get_incomplete_documents(
+        db, after_id=after_id, limit=limit, document_type_id=document_type_id
+    )
+    set_next_cursor(response, next_after_id)
+    logger.info(f"Retrieved {len(documents)} incomplete documents.")
+    return documents
+
 @app.get(
     "/document_types/",
     response_model=list[schemas.DocumentType],
     summary="Retrieve a list of document types",
-    description="Fetches a list of document types with associated data elements."
+    description="Fetches a page of document types, ordered by ID, with associated data elements. The next page's cursor is returned in the X-Next-Cursor header."
 )
+@with_db_session
 def read_document_types(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = Depends(get_after_id),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieves a list of document types along with their associated data elements.
+    Retrieves a page of document types along with their associated data elements.
+
+    Served from the in-process catalog snapshot. Answers If-None-Match with 304
+    when the catalog revision has not changed.
 
     Args:
+        request (Request): The incoming request.
+        response (Response): The outgoing response, used to publish the next cursor and ETag.
+        limit (int): Maximum number of records to return.
+        after_id (int, optional): Decoded pagination cursor.
         db (Session): Database session dependency.
 
     Returns:
         List[schemas.DocumentType]: A list of document type schemas.
     """
-    document_types = crud.get_document_types(db)
-    logger.info(f"Retrieved {len(document_types)} document types from the database.")
+    revision = crud.get_revision(db, crud.CATALOG_REVISION)
+    not_modified = check_not_modified(request, response, revision)
+    if not_modified is not None:
+        return not_modified
+
+    document_types, next_after_id = catalog.page_document_types(
+        catalog.get_catalog(db, revision), after_id=after_id, limit=limit
+    )
+    set_next_cursor(response, next_after_id)
+    logger.info(f"Retrieved {len(document_types)} document types from the catalog.")
     return document_types
 
 @app.get(
     "/data_elements_by_document_type/{document_type_id}",
-    response_model=list[schemas.DataElement],
+    response_model=list[schemas.DocumentTypeDataElement],
     summary="Retrieve data elements by document type",
-    description="Fetches all data elements associated with a specific document type."
+    description="Fetches all data elements associated with a specific document type, with whether each is required and may occur more than once."
 )
+@with_db_session
 def get_data_elements_by_document_type(
     document_type_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
     Retrieves all data elements associated with a specific document type.
 
+    Served from the in-process catalog snapshot. Answers If-None-Match with 304
+    when the catalog revision has not changed.
+
     Args:
         document_type_id (int): The ID of the document type.
+        request (Request): The incoming request.
+        response (Response): The outgoing response, used to publish the ETag.
         db (Session): Database session dependency.
 
     Returns:
-        List[schemas.DataElement]: A list of data element schemas.
+        List[schemas.DocumentTypeDataElement]: The type's data elements with their constraints.
     """
-    data_elements = crud.get_data_elements_for_document_type(db, document_type_id=document_type_id)
+    revision = crud.get_revision(db, crud.CATALOG_REVISION)
+    not_modified = check_not_modified(request, response, revision)
+    if not_modified is not None:
+        return not_modified
+
+    data_elements = catalog.get_catalog(db, revision).data_elements.get(document_type_id, ())
     logger.info(f"Retrieved {len(data_elements)} data elements for document type ID {document_type_id}.")
     return data_elements
 
 
+@app.get(
+    "/export/annotations",
+    response_class=StreamingResponse,
+    summary="Export all annotations",
+    description="Streams every annotation, joined with its document's file path and document type, "
+                "as newline-delimited JSON, Parquet or Arrow IPC. Optionally filtered by document type and creation time."
+)
+async def export_annotations(
+    format: Literal["ndjson", "parquet", "arrow"] = Query("ndjson", description="Export format: ndjson, parquet or arrow."),
+    document_type_id: Optional[int] = Query(None, description="Only export annotations on documents of this type."),
+    created_from: Optional[datetime] = Query(None, description="Only export annotations created at or after this time."),
+    created_to: Optional[datetime] = Query(None, description="Only export annotations created before this time.")
+):
+    """
+    Streams the annotation corpus using a server-side cursor, in bounded memory.
+
+    Args:
+        format (str): Export format: ndjson, parquet or arrow.
+        document_type_id (int, optional): Only export annotations on documents of this type.
+        created_from (datetime, optional): Only export annotations created at or after this time.
+        created_to (datetime, optional): Only export annotations created before this time.
+
+    Returns:
+        StreamingResponse: The NDJSON export.
+    """
+    logger.info(
+        f"Starting {format} annotation export (document type ID: {document_type_id}, "
+        f"created from: {created_from}, created to: {created_to})."
+    )
+    return StreamingResponse(
+        EXPORT_SERIALIZERS[format](
+            document_type_id=document_type_id,
+            created_from=created_from,
+            created_to=created_to
+        ),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="annotations.{format}"'}
+    )
+
+
 # ============================
 # Application Startup and Shutdown Events
 # ============================
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     """
     Actions to perform on application startup.
     """
+    def schedule_annotation_counts(session: Session) -> None:
+        annotation_counts.schedule_annotation_counts_job(session)
+        session.commit()
+
+    if group_commit_writer is not None:
+        group_commit_writer.start()
+    if job_runner is not None:
+        await job_runner.start()
+        async with open_session() as db:
+            await run_db(db, schedule_annotation_counts)
+        job_runner.notify()
+    expired = storage.purge_expired_upload_sessions(UPLOAD_STAGING_FOLDER)
+    if expired:
+        logger.info(f"Discarded {expired} expired upload sessions.")
     logger.info("FastAPI application has started.")
 
 @app.on_event("shutdown")
-def on_shutdown():
+async def on_shutdown():
     """
     Actions to perform on application shutdown.
     """
+    if group_commit_writer is not None:
+        await group_commit_writer.stop()
+    if job_runner is not None:
+        await job_runner.stop()
     logger.info("FastAPI application is shutting down.")
@@ -12,13 +12,14 @@ the database tables and their relationships.
 # Import Statements
 # ============================
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from sqlalchemy import Float, ForeignKey, Integer, String, DateTime, Boolean, Table, Column
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import Float, ForeignKey, Integer, String, DateTime, Boolean, JSON, Table, Column, Index, DDL, event, table, column
+from sqlalchemy.orm import Mapped, mapped_column, orm_insert_sentinel, relationship
 from datetime import datetime
 
 from .database import Base
+from .storage import blob_relative_path
 
 
 # ============================
@@ -53,6 +54,17 @@ class DocumentType(Base):
     name: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
+    # Relationship to the type's data elements with their per-type constraints. Must be
+    # loaded explicitly with selectinload, once per query, so that no response can
+    # trigger one SELECT per document type or silently serialize the elements as empty.
+    data_elements: Mapped[List["DocumentTypeDataElement"]] = relationship(
+        "DocumentTypeDataElement",
+        lazy="raise",
+        viewonly=True,
+        order_by=document_data_elements.c.data_element_id,
+        doc="Data elements of this document type, ordered by data element ID."
+    )
+
 # ============================
 # Document Type Data Elements Model
 # ============================
@@ -73,6 +85,73 @@ class DataElement(Base):
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
 
 
+class DocumentTypeDataElement(Base):
+    """
+    A data element as it belongs to one document type, mapped onto `document_data_elements`.
+
+    Attributes:
+        document_type_id (Mapped[int]): The document type.
+        data_element_id (Mapped[int]): The data element.
+        is_required (Mapped[bool]): Whether documents of the type must have the data element.
+        allow_multiple (Mapped[bool]): Whether documents of the type may have it more than once.
+        data_element (Mapped[DataElement]): The data element itself, loaded in the same query.
+    """
+    __table__ = document_data_elements
+
+    data_element: Mapped[DataElement] = relationship(
+        "DataElement",
+        lazy="joined",
+        innerjoin=True,
+        doc="The data element itself."
+    )
+
+    @property
+    def id(self) -> int:
+        """
+        ID of the data element.
+        """
+        return self.data_element_id
+
+    @property
+    def name(self) -> str:
+        """
+        Name of the data element.
+        """
+        return self.data_element.name
+
+    @property
+    def description(self) -> Optional[str]:
+        """
+        Description of the data element.
+        """
+        return self.data_element.description
+
+
+# ============================
+# Stored Blob Model
+# ============================
+
+class Blob(Base):
+    """
+    Represents a stored PDF file, addressed by the SHA-256 of its contents and shared by every document with identical bytes.
+
+    Attributes:
+        content_hash (Mapped[str]): Hex SHA-256 digest of the file; also determines where it is stored.
+        size (Mapped[int]): Size of the file in bytes.
+        ref_count (Mapped[int]): Number of documents and in-progress uploads referencing the blob. A blob at zero is kept
+            until `crud.forget_blob` deletes it, together with its files, if it is still at zero.
+        linearized (Mapped[Optional[bool]]): Whether a linearized copy is stored; None while the linearize job is pending.
+        created_at (Mapped[datetime]): Timestamp when the blob was first stored.
+    """
+    __tablename__ = "blobs"
+
+    content_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    linearized: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 # ============================
 # Document Model
 # ============================
@@ -83,18 +162,43 @@ class Document(Base):
 
     Attributes:
         id (Mapped[int]): Primary key identifier for the document.
-        file_path (Mapped[str]): Unique file path where the PDF is stored.
+        file_path (Mapped[str]): Unique name the PDF was uploaded under.
+        content_hash (Mapped[Optional[str]]): SHA-256 of the document's current contents, referencing its blob.
         uploaded_at (Mapped[datetime]): Timestamp when the document was uploaded.
+        revision (Mapped[int]): Monotonically increasing revision, bumped by every write to the document or its annotations.
+        page_count (Mapped[Optional[int]]): Number of pages; None until the page metadata of the current contents is extracted.
+        text_indexed (Mapped[Optional[bool]]): Whether the page text is searchable; None while extraction is pending,
+            False if the contents could not be read.
+        annotation_count (Mapped[int]): Number of annotations, maintained by every annotation write.
+        last_annotated_at (Mapped[Optional[datetime]]): Timestamp of the latest annotation create, update or delete.
+        missing_required_count (Mapped[int]): Number of data elements its type requires that have no annotation.
+        duplicated_element_count (Mapped[int]): Number of single-valued data elements of its type annotated more than once.
+        is_complete (Mapped[bool]): Whether both of the above are zero; documents without a type are complete.
         annotations (Mapped[List["Annotation"]]): List of annotations associated with the document.
+        pages (Mapped[List["DocumentPage"]]): Size and rotation of each page, in page order.
+        annotation_page_counts (Mapped[List["AnnotationPageCount"]]): Number of annotations on each annotated page.
     """
     __tablename__ = "documents"
+    __table_args__ = (
+        # Review queues walk the incomplete documents in ID order
+        Index("ix_documents_is_complete_id", "is_complete", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     file_path: Mapped[str] = mapped_column(String, unique=True, index=True, nullable=False)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey('blobs.content_hash'), index=True, nullable=True)
     uploaded_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     document_type_id: Mapped[int] = mapped_column(Integer, ForeignKey('document_types.id'), nullable=True)
     created_by: Mapped[Optional[str]] = mapped_column(String, nullable=True, doc="User who uploaded the document.")
-    
+    revision: Mapped[int] = mapped_column(Integer, default=0, nullable=False, doc="Revision bumped by every write to the document or its annotations.")
+    page_count: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, doc="Number of pages, once extracted.")
+    text_indexed: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True, doc="Whether the page text is searchable, once extracted.")
+    annotation_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, doc="Number of annotations on the document.")
+    last_annotated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, doc="Timestamp of the latest annotation write.")
+    missing_required_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, doc="Number of required data elements not annotated.")
+    duplicated_element_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False, doc="Number of single-valued data elements annotated more than once.")
+    is_complete: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, doc="Whether every required data element is annotated and none is duplicated.")
+
     # Relationship to Annotation model with cascade delete to maintain referential integrity
     annotations: Mapped[List["Annotation"]] = relationship(
         "Annotation",
@@ -110,6 +214,100 @@ class Document(Base):
         doc="The type of document associated with this entry."
     )
 
+    # Relationship to the Blob holding the document's current contents
+    blob: Mapped[Optional[Blob]] = relationship(
+        "Blob",
+        doc="The stored file the document currently points at."
+    )
+
+    # Relationship to the extracted page metadata, replaced whenever the contents change
+    pages: Mapped[List["DocumentPage"]] = relationship(
+        "DocumentPage",
+        cascade="all, delete-orphan",
+        order_by="DocumentPage.page_number",
+        doc="Size and rotation of each page, in page order."
+    )
+
+    # Relationship to the per-page annotation counters, maintained alongside annotation_count
+    annotation_page_counts: Mapped[List["AnnotationPageCount"]] = relationship(
+        "AnnotationPageCount",
+        cascade="all, delete-orphan",
+        order_by="AnnotationPageCount.page",
+        doc="Number of annotations on each annotated page, in page order."
+    )
+
+    @property
+    def storage_path(self) -> Optional[str]:
+        """
+        Location of the document's PDF relative to the upload folder, or None if no contents are stored.
+        """
+        return blob_relative_path(self.content_hash) if self.content_hash else None
+
+
+# ============================
+# Document Page Model
+# ============================
+
+class DocumentPage(Base):
+    """
+    Represents one page of a document's current contents, as extracted at ingest.
+
+    Width and height are those of the page's visible area (its crop box clipped to
+    its media box) in PDF points before rotation, which is what pdf.js renders at
+    scale 1. Annotation coordinates are given in the rotated page, so for a
+    rotation of 90 or 270 degrees they are bounded by height and width swapped.
+
+    Attributes:
+        document_id (Mapped[int]): The document the page belongs to.
+        page_number (Mapped[int]): One-based page number, as used by annotations.
+        width (Mapped[float]): Width of the page in points, before rotation.
+        height (Mapped[float]): Height of the page in points, before rotation.
+        rotation (Mapped[int]): Clockwise rotation applied when displaying the page: 0, 90, 180 or 270.
+    """
+    __tablename__ = "document_pages"
+
+    document_id: Mapped[int] = mapped_column(Integer, ForeignKey('documents.id'), primary_key=True)
+    page_number: Mapped[int] = mapped_column(Integer, primary_key=True)
+    width: Mapped[float] = mapped_column(Float, nullable=False)
+    height: Mapped[float] = mapped_column(Float, nullable=False)
+    rotation: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    @property
+    def display_size(self) -> Tuple[float, float]:
+        """
+        Width and height of the page as displayed, after rotation.
+        """
+        return (self.height, self.width) if self.rotation in (90, 270) else (self.width, self.height)
+
+
+# ============================
+# Document Page Text Model
+# ============================
+
+class DocumentPageText(Base):
+    """
+    Represents the extracted text of one page of a document's current contents.
+
+    The rows are the content table of the `page_text_fts` full-text index, which
+    stores only the index and reads snippets back from here by `id`.
+
+    Attributes:
+        id (Mapped[int]): Primary key, used as the full-text index's rowid.
+        document_id (Mapped[int]): The document the page belongs to.
+        page_number (Mapped[int]): One-based page number, as used by annotations.
+        text (Mapped[str]): The page's text with runs of whitespace collapsed.
+    """
+    __tablename__ = "document_page_texts"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    document_id: Mapped[int] = mapped_column(Integer, ForeignKey('documents.id'), nullable=False)
+    page_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(String, nullable=False)
+
+    __table_args__ = (
+        Index("ix_document_page_texts_document_id_page_number", "document_id", "page_number", unique=True),
+    )
+
 
 # ============================
 # Annotation Model
@@ -133,6 +331,10 @@ class Annotation(Base):
         document (Mapped[Document]): Relationship back to the associated Document.
     """
     __tablename__ = "annotations"
+    __table_args__ = (
+        # Composite index so per-page lookups are an index range scan
+        Index("ix_annotations_document_id_page", "document_id", "page"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     document_id: Mapped[int] = mapped_column(Integer, ForeignKey('documents.id'), nullable=False)
@@ -145,6 +347,8 @@ class Annotation(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, doc="Timestamp of when the annotation was created.")
     annotation_value: Mapped[Optional[str]] = mapped_column(String, nullable=True, doc="Additional details or value of the annotation.")
     created_by: Mapped[Optional[str]] = mapped_column(String, nullable=True, doc="User who created the annotation.")
+    # Numbers the rows of a multi-row INSERT so their RETURNING IDs can be matched to the input order
+    _sentinel: Mapped[int] = orm_insert_sentinel()
     
     # Relationship back to Document model
     document: Mapped[Document] = relationship(
@@ -154,6 +358,357 @@ class Annotation(Base):
     )
 
 
+# ============================
+# Annotation Page Count Model
+# ============================
+
+class AnnotationPageCount(Base):
+    """
+    Represents the number of annotations on one page of a document.
+
+    Maintained in the same transaction as every annotation write, like
+    `Document.annotation_count`, so listings never aggregate the annotations
+    table. Pages without annotations have no row.
+
+    Attributes:
+        document_id (Mapped[int]): The document the page belongs to.
+        page (Mapped[int]): Page number, as used by annotations.
+        annotation_count (Mapped[int]): Number of annotations on the page.
+    """
+    __tablename__ = "annotation_page_counts"
+
+    document_id: Mapped[int] = mapped_column(Integer, ForeignKey('documents.id'), primary_key=True)
+    page: Mapped[int] = mapped_column(Integer, primary_key=True)
+    annotation_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# ============================
+# Annotation Value Count Model
+# ============================
+
+class AnnotationValueCount(Base):
+    """
+    Represents the number of annotations of a document with one value.
+
+    Annotation values name the data element they capture, so these rows say how
+    often each data element is annotated on the document. They are maintained by
+    every annotation write, like `AnnotationPageCount`, and the document's
+    completeness is recomputed from them. Values without annotations have no row.
+
+    Attributes:
+        document_id (Mapped[int]): The document the annotations belong to.
+        value (Mapped[str]): The annotation value, i.e. the data element name.
+        annotation_count (Mapped[int]): Number of annotations with the value.
+    """
+    __tablename__ = "annotation_value_counts"
+
+    document_id: Mapped[int] = mapped_column(Integer, ForeignKey('documents.id'), primary_key=True)
+    value: Mapped[str] = mapped_column(String, primary_key=True)
+    annotation_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# ============================
+# Annotation Change Log Model
+# ============================
+
+class AnnotationChange(Base):
+    """
+    An entry in the per-document annotation change feed.
+
+    Every annotation create, update and delete appends one row, stamped with the
+    document revision it produced. Deletes remain in the log as tombstones so
+    clients syncing from an older revision learn which annotations to drop.
+
+    Attributes:
+        id (Mapped[int]): Primary key identifier for the change.
+        document_id (Mapped[int]): The document whose annotations changed.
+        annotation_id (Mapped[int]): The annotation that changed. Not a foreign key, so tombstones survive deletes.
+        operation (Mapped[str]): One of "create", "update" or "delete".
+        revision (Mapped[int]): The document revision produced by this change.
+        changed_at (Mapped[datetime]): Timestamp of the change.
+    """
+    __tablename__ = "annotation_changes"
+    __table_args__ = (
+        # Change feed lookups seek by document and scan forward from a revision
+        Index("ix_annotation_changes_document_id_revision", "document_id", "revision"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    document_id: Mapped[int] = mapped_column(Integer, ForeignKey('documents.id'), nullable=False)
+    annotation_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    operation: Mapped[str] = mapped_column(String, nullable=False)
+    revision: Mapped[int] = mapped_column(Integer, nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# ============================
+# Background Job Model
+# ============================
+
+class Job(Base):
+    """
+    A unit of background work, such as post-upload processing of a PDF.
+
+    Jobs are run by the in-process job runner in priority order, highest first,
+    and retried with exponential backoff until `max_attempts` is reached.
+
+    Attributes:
+        id (Mapped[int]): Primary key identifier for the job.
+        kind (Mapped[str]): The registered job kind, e.g. "linearize".
+        document_id (Mapped[Optional[int]]): The document the job belongs to, if any.
+        payload (Mapped[dict]): Arguments passed to the job kind's handler.
+        status (Mapped[str]): One of "queued", "running", "succeeded" or "failed".
+        priority (Mapped[int]): Jobs with a higher priority are claimed first.
+        attempts (Mapped[int]): Number of times the job has been started.
+        max_attempts (Mapped[int]): Attempts after which a failing job is given up.
+        run_after (Mapped[datetime]): The job is not claimed before this time; pushed back on retry.
+        last_error (Mapped[Optional[str]]): Error message of the most recent failed attempt.
+        result (Mapped[Optional[dict]]): What the handler returned, once succeeded.
+        created_at (Mapped[datetime]): Timestamp when the job was enqueued.
+        started_at (Mapped[Optional[datetime]]): Timestamp when the latest attempt started.
+        finished_at (Mapped[Optional[datetime]]): Timestamp when the job succeeded or was given up.
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # The runner claims queued jobs by priority among those that are due
+        Index("ix_jobs_status_priority_run_after", "status", "priority", "run_after"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    document_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('documents.id'), index=True, nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=3)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+
+# ============================
+# Revision Counter Model
+# ============================
+
+class RevisionCounter(Base):
+    """
+    A named, monotonically increasing counter used to validate cached collection responses.
+
+    Attributes:
+        name (Mapped[str]): Name of the counter, e.g. "documents" or "catalog".
+        value (Mapped[int]): Current revision, bumped in the same transaction as the write it tracks.
+    """
+    __tablename__ = "revision_counters"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+# Seed the counters when the table is created so writers only ever need an UPDATE
+event.listen(
+    RevisionCounter.__table__,
+    "after_create",
+    DDL("INSERT INTO revision_counters (name, value) VALUES ('documents', 0), ('catalog', 0)")
+)
+
+
+# ============================
+# Annotation Spatial Index (SQLite R*Tree)
+# ============================
+
+# Lightweight Core handle on the R*Tree virtual table. It is deliberately not part of
+# Base.metadata: the table is created by the DDL below and only exists on SQLite.
+# Each annotation is stored as a box over (document, page, x, y) so a lookup for one
+# page of one document is a single logarithmic R*Tree search.
+annotation_rtree = table(
+    "annotation_rtree",
+    column("id"),
+    column("min_document_id"),
+    column("max_document_id"),
+    column("min_page"),
+    column("max_page"),
+    column("min_x"),
+    column("max_x"),
+    column("min_y"),
+    column("max_y"),
+)
+
+_ANNOTATION_RTREE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS annotation_rtree USING rtree(
+        id,
+        min_document_id, max_document_id,
+        min_page, max_page,
+        min_x, max_x,
+        min_y, max_y
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_rtree_insert AFTER INSERT ON annotations
+    BEGIN
+        INSERT INTO annotation_rtree VALUES (
+            new.id,
+            new.document_id, new.document_id,
+            new.page, new.page,
+            new.x, new.x + new.width,
+            new.y, new.y + new.height
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_rtree_update
+    AFTER UPDATE OF document_id, page, x, y, width, height ON annotations
+    BEGIN
+        UPDATE annotation_rtree SET
+            min_document_id = new.document_id, max_document_id = new.document_id,
+            min_page = new.page, max_page = new.page,
+            min_x = new.x, max_x = new.x + new.width,
+            min_y = new.y, max_y = new.y + new.height
+        WHERE id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_rtree_delete AFTER DELETE ON annotations
+    BEGIN
+        DELETE FROM annotation_rtree WHERE id = old.id;
+    END
+    """,
+]
+
+# Create the R*Tree and its sync triggers alongside the annotations table (SQLite only)
+for _statement in _ANNOTATION_RTREE_DDL:
+    event.listen(Annotation.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+# Drop the R*Tree together with the annotations table; the triggers go with the table
+event.listen(
+    Annotation.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS annotation_rtree").execute_if(dialect="sqlite")
+)
+
+
+# ============================
+# Annotation Text Index (SQLite FTS5 Trigram)
+# ============================
+
+# Core handle on the FTS5 virtual table, created by the DDL below on SQLite only.
+# It indexes `value` and `annotation_value` of the annotations table in place
+# (external content), so the text is stored once. The trigram tokenizer indexes
+# every three-character sequence, which makes any substring of three or more
+# characters searchable, e.g. "LIBOR" inside "LIBOR-based" or "Term SOFR/LIBOR".
+annotation_fts = table(
+    "annotation_fts",
+    column("rowid"),
+    column("value"),
+    column("annotation_value"),
+)
+
+_ANNOTATION_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS annotation_fts USING fts5(
+        value,
+        annotation_value,
+        content='annotations',
+        content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_fts_insert AFTER INSERT ON annotations
+    BEGIN
+        INSERT INTO annotation_fts (rowid, value, annotation_value) VALUES (new.id, new.value, new.annotation_value);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_fts_update AFTER UPDATE OF value, annotation_value ON annotations
+    BEGIN
+        INSERT INTO annotation_fts (annotation_fts, rowid, value, annotation_value)
+            VALUES ('delete', old.id, old.value, old.annotation_value);
+        INSERT INTO annotation_fts (rowid, value, annotation_value) VALUES (new.id, new.value, new.annotation_value);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS annotations_fts_delete AFTER DELETE ON annotations
+    BEGIN
+        INSERT INTO annotation_fts (annotation_fts, rowid, value, annotation_value)
+            VALUES ('delete', old.id, old.value, old.annotation_value);
+    END
+    """,
+]
+
+# Create the index and its sync triggers alongside the annotations table (SQLite only)
+for _statement in _ANNOTATION_FTS_DDL:
+    event.listen(Annotation.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+# Drop the index together with the annotations table; the triggers go with the table
+event.listen(
+    Annotation.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS annotation_fts").execute_if(dialect="sqlite")
+)
+
+
+# ============================
+# Page Text Full-Text Index (SQLite FTS5)
+# ============================
+
+# Core handle on the FTS5 virtual table, created by the DDL below on SQLite only.
+# It is an external-content index over document_page_texts: the text lives once in
+# the content table, and the index maps each term to the rowids of the pages using
+# it. Diacritics are folded but words are not stemmed, so terms of art such as
+# "Applicable Margin" match only themselves.
+page_text_fts = table(
+    "page_text_fts",
+    column("rowid"),
+    column("text"),
+)
+
+_PAGE_TEXT_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS page_text_fts USING fts5(
+        text,
+        content='document_page_texts',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS document_page_texts_fts_insert AFTER INSERT ON document_page_texts
+    BEGIN
+        INSERT INTO page_text_fts (rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS document_page_texts_fts_update AFTER UPDATE OF text ON document_page_texts
+    BEGIN
+        INSERT INTO page_text_fts (page_text_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        INSERT INTO page_text_fts (rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS document_page_texts_fts_delete AFTER DELETE ON document_page_texts
+    BEGIN
+        INSERT INTO page_text_fts (page_text_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END
+    """,
+]
+
+# Create the index and its sync triggers alongside the page text table (SQLite only)
+for _statement in _PAGE_TEXT_FTS_DDL:
+    event.listen(DocumentPageText.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+# Drop the index together with the page text table; the triggers go with the table
+event.listen(
+    DocumentPageText.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS page_text_fts").execute_if(dialect="sqlite")
+)
+
+
 # ============================
 # Additional Notes
 # ============================
@@ -182,6 +737,7 @@ Additional Considerations:
 
 6. **Indexing**:
     - Added `index=True` to frequently queried fields like `id` and `file_path` to optimize database performance.
+    - The `annotations` table has a composite `(document_id, page)` index so per-page and page-range lookups avoid a full table scan.
 
 7. **Foreign Key Constraints**:
     - The `document_id` in the `Annotation` model is a foreign key referencing the `id` in the `Document` model, establishing a many-to-one relationship between annotations and documents.
@@ -199,7 +755,36 @@ Additional Considerations:
     - Organized imports into standard library imports, third-party imports, and local imports for better readability.
     - Utilized relative imports (e.g., `from .database import Base`) assuming this module is part of a package.
 
-12. **Future Scalability**:
+12. **Spatial Index**:
+    - On SQLite, an R*Tree virtual table (`annotation_rtree`) mirrors each annotation's box and is kept in sync by triggers on insert, update and delete.
+    - Bounding-box queries for a page search the R*Tree instead of scanning every box on the page. Other databases fall back to a plain range filter.
+
+13. **Content-Addressed Storage**:
+    - Uploaded PDFs are stored once per distinct contents under their SHA-256 digest, recorded in the `blobs` table. `Document.content_hash` references the blob, so documents with identical bytes share one file.
+    - `Blob.ref_count` counts the documents and in-progress uploads referencing a blob and alone decides whether its file is written or deleted. When a re-upload drops it to zero the row stays, so an upload of the same contents can take it back, until a cleanup deletes the row if it is still at zero and removes the files before committing.
+
+14. **Background Jobs**:
+    - The `jobs` table is the persistent queue of the in-process job runner (`app/jobs.py`). Queued jobs survive restarts, and jobs left running by a crash are requeued at startup.
+
+15. **Page Metadata**:
+    - `document_pages` holds the size and rotation of every page of a document's current contents, extracted by a background job at ingest, so clients can lay out pages and the API can check annotation coordinates without opening the PDF. `Document.page_count` stays None until the extraction has run.
+
+16. **Full-Text Search**:
+    - `document_page_texts` holds the text of every page, extracted by a background job at ingest. On SQLite it is indexed by the FTS5 table `page_text_fts`, kept in sync by triggers, which ranks matches with BM25 and builds snippets. Other databases fall back to a scan.
+
+17. **Annotation Search**:
+    - On SQLite, `annotation_fts` is a trigram FTS5 index over `Annotation.value` and `Annotation.annotation_value`, kept in sync by triggers on every insert, update and delete, including the bulk paths. Substring queries of three or more characters are answered from the index and ranked by BM25.
+
+18. **Document Type Catalog**:
+    - `DocumentType.data_elements` maps `document_data_elements` as association objects (`DocumentTypeDataElement`), so the `is_required` and `allow_multiple` flags travel with each element. It is only loaded when asked for, in one query for a whole page of types; the API serves the catalog from an in-process snapshot (`app/catalog.py`) rebuilt when the catalog revision changes.
+
+19. **Annotation Counters**:
+    - `Document.annotation_count`, `Document.last_annotated_at` and `annotation_page_counts` are denormalized from `annotations` and the change feed, and updated in the same transaction by every annotation write path, so `/documents_with_annotations` is a plain keyset scan of `documents`. A background "annotation_counts" job compares them with the source tables and repairs any drift.
+
+20. **Document Completeness**:
+    - `annotation_value_counts` counts a document's annotations per value, i.e. per data element name, and is maintained with the other annotation counters. After every change to it, to a document's type or to a type's data elements, `Document.missing_required_count`, `duplicated_element_count` and `is_complete` are recomputed for the affected documents from those rows and `document_data_elements`, so listing incomplete documents is a range scan of `ix_documents_is_complete_id`.
+
+21. **Future Scalability**:
     - The structured and well-documented codebase facilitates easier future enhancements and maintenance.
     - Adding new features or modifying existing ones becomes straightforward due to the clear organization and comprehensive documentation.
 """
@@ -0,0 +1,141 @@
+# ============================
+# Page Metadata Module
+# ============================
+
+"""
+This module extracts the page count, page sizes and rotations of uploaded PDFs.
+
+Each document whose contents have no page metadata yet gets a background
+"page_metadata" job, which reads the page tree of its blob and stores one row
+per page in `document_pages`. Sizes follow pdf.js: the visible area is the
+crop box clipped to the media box, in PDF points, and rotations that are not a
+multiple of 90 degrees are ignored. Annotation coordinates, which pdf.js gives
+at scale 1 in the rotated page, can then be checked without opening the file.
+
+Blobs that qpdf cannot parse get no page metadata; their documents keep a page
+count of None and their annotations are not checked.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import logging
+import os
+from typing import List, Optional
+
+# Third-Party Imports
+import pikepdf
+from sqlalchemy.orm import Session
+
+# Local Imports
+from . import crud
+from .storage import blob_relative_path
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Configuration Constants
+# ============================
+
+# pdf.js falls back to US Letter when a page has no usable media box
+DEFAULT_MEDIA_BOX = (0.0, 0.0, 612.0, 792.0)
+
+# ============================
+# Extraction
+# ============================
+
+def _normalize_box(box) -> Optional[tuple]:
+    try:
+        x1, y1, x2, y2 = (float(value) for value in box)
+    except (TypeError, ValueError):
+        return None
+    return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+
+def page_view(page: pikepdf.Page) -> List[float]:
+    """
+    Returns the width, height and rotation pdf.js displays a page with.
+
+    Args:
+        page (pikepdf.Page): The page, with inherited attributes resolved.
+
+    Returns:
+        List[float]: Width and height in points before rotation, and the clockwise rotation in degrees.
+    """
+    media_box = _normalize_box(page.obj.get("/MediaBox")) or DEFAULT_MEDIA_BOX
+    view = media_box
+    crop_box = _normalize_box(page.obj.get("/CropBox"))
+    if crop_box is not None:
+        # Clip the crop box to the media box, ignoring it if they do not overlap
+        clipped = (
+            max(crop_box[0], media_box[0]), max(crop_box[1], media_box[1]),
+            min(crop_box[2], media_box[2]), min(crop_box[3], media_box[3]),
+        )
+        if clipped[0] < clipped[2] and clipped[1] < clipped[3]:
+            view = clipped
+
+    try:
+        rotation = int(page.obj.get("/Rotate", 0))
+    except (TypeError, ValueError):
+        rotation = 0
+    rotation = rotation % 360 if rotation % 90 == 0 else 0
+    return [view[2] - view[0], view[3] - view[1], rotation]
+
+
+def extract_page_metadata(directory: str, content_hash: str) -> Optional[List[List[float]]]:
+    """
+    Reads the size and rotation of every page of a stored blob.
+
+    Args:
+        directory (str): The upload folder blobs are stored under.
+        content_hash (str): Hex SHA-256 digest of the blob.
+
+    Returns:
+        Optional[List[List[float]]]: Width, height and rotation of each page in page order,
+            or None if the blob cannot be parsed.
+    """
+    path = os.path.join(directory, blob_relative_path(content_hash))
+    try:
+        with pikepdf.open(path) as pdf:
+            pages = [page_view(page) for page in pdf.pages]
+    except pikepdf.PdfError as e:
+        logger.warning(f"Could not read the pages of blob {content_hash}: {e}")
+        return None
+    logger.info(f"Extracted metadata of {len(pages)} pages from blob {content_hash}.")
+    return pages
+
+
+def run_page_metadata_job(payload: dict) -> Optional[List[List[float]]]:
+    """
+    Job handler for "page_metadata", run in a worker process.
+
+    Args:
+        payload (dict): The upload folder as "directory" and the blob's "content_hash".
+
+    Returns:
+        Optional[List[List[float]]]: What `extract_page_metadata` returned.
+    """
+    return extract_page_metadata(payload["directory"], payload["content_hash"])
+
+
+def save_page_metadata_result(db: Session, payload: dict, pages: Optional[List[List[float]]]) -> dict:
+    """
+    Stores the pages extracted by a "page_metadata" job on its document.
+
+    Nothing is stored if the document has since been pointed at other contents;
+    the job queued for those fills in their pages.
+
+    Args:
+        db (Session): The database session.
+        payload (dict): The job's payload, including the "document_id".
+        pages (Optional[List[List[float]]]): What `run_page_metadata_job` returned.
+
+    Returns:
+        dict: The page count to record as the job's result, instead of every page.
+    """
+    if pages is None:
+        return {"page_count": None}
+    stored = crud.replace_document_pages(db, payload["document_id"], payload["content_hash"], pages)
+    return {"page_count": len(pages), "stored": stored}
@@ -0,0 +1,105 @@
+# ============================
+# Page Text Extraction Module
+# ============================
+
+"""
+This module extracts the text of every page of uploaded PDFs for full-text search.
+
+Each document whose contents have no indexed text yet gets a background
+"page_text" job, which pulls the text out of each page with pypdf and stores
+it in `document_page_texts`, from where the `page_text_fts` index picks it up.
+Runs of whitespace are collapsed, so snippets read as running text whatever
+the layout of the page.
+
+Pages pypdf cannot read are indexed as empty. Blobs it cannot open at all are
+recorded as not indexed and do not appear in search results.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import logging
+import os
+from typing import List, Optional
+
+# Third-Party Imports
+from pypdf import PdfReader
+from pypdf.errors import PyPdfError
+from sqlalchemy.orm import Session
+
+# Local Imports
+from . import crud
+from .storage import blob_relative_path
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Extraction
+# ============================
+
+def extract_page_text(directory: str, content_hash: str) -> Optional[List[str]]:
+    """
+    Reads the text of every page of a stored blob.
+
+    Args:
+        directory (str): The upload folder blobs are stored under.
+        content_hash (str): Hex SHA-256 digest of the blob.
+
+    Returns:
+        Optional[List[str]]: The text of each page in page order, or None if the blob cannot be opened.
+    """
+    path = os.path.join(directory, blob_relative_path(content_hash))
+    try:
+        reader = PdfReader(path)
+        pages = list(reader.pages)
+    except PyPdfError as e:
+        logger.warning(f"Could not read the text of blob {content_hash}: {e}")
+        return None
+
+    texts = []
+    for number, page in enumerate(pages, start=1):
+        try:
+            text = page.extract_text() or ""
+        except Exception as e:
+            # Malformed content streams fail in many ways; losing one page beats losing the document
+            logger.warning(f"Could not read the text of page {number} of blob {content_hash}: {e}")
+            text = ""
+        texts.append(" ".join(text.split()))
+    logger.info(f"Extracted {sum(len(text) for text in texts)} characters of text from blob {content_hash}.")
+    return texts
+
+
+def run_page_text_job(payload: dict) -> Optional[List[str]]:
+    """
+    Job handler for "page_text", run in a worker process.
+
+    Args:
+        payload (dict): The upload folder as "directory" and the blob's "content_hash".
+
+    Returns:
+        Optional[List[str]]: What `extract_page_text` returned.
+    """
+    return extract_page_text(payload["directory"], payload["content_hash"])
+
+
+def save_page_text_result(db: Session, payload: dict, texts: Optional[List[str]]) -> dict:
+    """
+    Stores the text extracted by a "page_text" job on its document, which makes it searchable.
+
+    Nothing is stored if the document has since been pointed at other contents;
+    the job queued for those indexes their text.
+
+    Args:
+        db (Session): The database session.
+        payload (dict): The job's payload, including the "document_id".
+        texts (Optional[List[str]]): What `run_page_text_job` returned.
+
+    Returns:
+        dict: The amount of text indexed, to record as the job's result instead of the text itself.
+    """
+    stored = crud.replace_document_text(db, payload["document_id"], payload["content_hash"], texts)
+    if texts is None:
+        return {"pages": None, "stored": stored}
+    return {"pages": len(texts), "characters": sum(len(text) for text in texts), "stored": stored}
@@ -0,0 +1,104 @@
+# ============================
+# Keyset Pagination Module
+# ============================
+
+"""
+This module provides opaque-cursor keyset pagination helpers.
+
+Listings are ordered by a unique, indexed key column (the primary key) and a page
+starts strictly after the last key of the previous page. Unlike OFFSET, the cost of
+fetching a page does not grow with how deep into the result set it is.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy.orm import Query
+
+
+# ============================
+# Cursor Encoding
+# ============================
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Encode the last key of a page into an opaque cursor string.
+
+    Args:
+        last_id (int): The key of the last row on the page.
+
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decode an opaque cursor string back into the key to continue after.
+
+    Args:
+        cursor (str): A cursor produced by `encode_cursor`.
+
+    Returns:
+        int: The key of the last row on the previous page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        last_id = payload["id"]
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, KeyError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(last_id, int):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return last_id
+
+
+# ============================
+# Keyset Query Helper
+# ============================
+
+def keyset_page(
+    query: Query,
+    key_column: Any,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Tuple[List[Any], Optional[int]]:
+    """
+    Fetch one page of a query ordered by a unique key column.
+
+    One extra row is requested to learn whether another page follows, so no
+    separate COUNT query is needed.
+
+    Args:
+        query (Query): The query to paginate.
+        key_column: The unique, indexed column to order and seek by.
+        after_id (int, optional): Return only rows whose key is greater than this.
+        limit (int, optional): Maximum number of rows to return. None returns all remaining rows.
+
+    Returns:
+        Tuple[List[Any], Optional[int]]: The rows and the key to continue after, or None on the last page.
+    """
+    if after_id is not None:
+        query = query.filter(key_column > after_id)
+    query = query.order_by(key_column)
+
+    if limit is None:
+        return query.all(), None
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, getattr(rows[-1], key_column.key)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, List  # Added List for handling collections
+from typing import Any, Optional, List, Tuple  # Added List for handling collections
 
 # Base schema for a document, containing the common fields
 class DocumentBase(BaseModel):
@@ -10,11 +10,22 @@ class DocumentBase(BaseModel):
 class DocumentCreate(DocumentBase):
     pass
 
+# Number of annotations on one page of a document
+class AnnotationPageCount(BaseModel):
+    page: int  # Page number, as used by annotations
+    annotation_count: int  # Number of annotations on the page
+
+    class Config:
+        orm_mode = True
+
 # Schema for a document with the count of annotations associated with it
 class DocumentWithAnnotationsCount(DocumentBase):
     id: int  # Unique identifier for the document
     uploaded_at: datetime  # Timestamp of when the document was uploaded
     annotation_count: int  # Count of annotations associated with the document
+    content_hash: Optional[str] = None  # SHA-256 of the document's contents, naming its immutable download URL
+    last_annotated_at: Optional[datetime] = None  # Timestamp of the latest annotation create, update or delete
+    annotation_page_counts: List[AnnotationPageCount] = []  # Annotation counts of the annotated pages, in page order
 
     # Enable ORM mode to allow mapping SQLAlchemy models to Pydantic models
     class Config:
@@ -33,9 +44,14 @@ class DataElement(DataElementBase):
     class Config:
         orm_mode = True
 
+# A data element as it belongs to a document type, with the type's constraints on it
+class DocumentTypeDataElement(DataElement):
+    is_required: bool = False  # Whether documents of the type must have the data element
+    allow_multiple: bool = False  # Whether documents of the type may have it more than once
+
 class DocumentTypeBase(BaseModel):
     name: str
-    data_elements: List[DataElement] = []  # Add relation to DataElements
+    data_elements: List[DocumentTypeDataElement] = []  # Add relation to DataElements
     description: Optional[str] = None
 
 class DocumentTypeCreate(DocumentTypeBase):
@@ -47,25 +63,69 @@ class DocumentType(DocumentTypeBase):
     class Config:
         orm_mode = True
 
+# A data element of a document's type with how often the document has it annotated
+class DataElementCoverage(DocumentTypeDataElement):
+    annotation_count: int  # Number of the document's annotations whose value is the element's name
+
+# Which data elements of its type a document has annotated
+class DocumentCompleteness(BaseModel):
+    document_id: int  # The document checked
+    document_type_id: Optional[int] = None  # Its document type; a document without one is complete
+    is_complete: bool  # Whether no required element is missing and no single-valued element is duplicated
+    elements: List[DataElementCoverage] = []  # Every data element of the type, ordered by ID
+    missing_required: List[DataElementCoverage] = []  # Required elements without an annotation
+    duplicated: List[DataElementCoverage] = []  # Elements that do not allow multiple values but are annotated more than once
+
+# A document in the queue of incomplete documents
+class IncompleteDocument(BaseModel):
+    id: int  # Unique identifier for the document
+    file_path: str  # Name the document was uploaded under
+    document_type_id: Optional[int] = None  # The document's type
+    missing_required_count: int  # Number of required data elements without an annotation
+    duplicated_element_count: int  # Number of single-valued data elements annotated more than once
+    last_annotated_at: Optional[datetime] = None  # Timestamp of the latest annotation create, update or delete
+
+    class Config:
+        orm_mode = True
+
+# Size and rotation of one page of a document
+class DocumentPage(BaseModel):
+    page_number: int  # One-based page number, as used by annotations
+    width: float  # Width of the page in PDF points, before rotation
+    height: float  # Height of the page in PDF points, before rotation
+    rotation: int  # Clockwise display rotation: 0, 90, 180 or 270
+
+    class Config:
+        orm_mode = True
+
 # Schema for a document that has been stored in the database
 class Document(DocumentBase):
     id: int  # Unique identifier for the document
     uploaded_at: datetime  # Timestamp of when the document was uploaded
     document_type: Optional[DocumentType] = None  # Add relation to DocumentType
     created_by: Optional[str] = None  # User who uploaded the document, default is None
+    revision: int = 0  # Revision bumped by every write to the document or its annotations
+    content_hash: Optional[str] = None  # SHA-256 of the document's contents
+    storage_path: Optional[str] = None  # Location of the PDF relative to /uploaded_files/
+    page_count: Optional[int] = None  # Number of pages, None until extracted after upload
+    text_indexed: Optional[bool] = None  # Whether the page text is searchable; None until extracted, False if unreadable
 
     # Enable ORM mode to allow mapping SQLAlchemy models to Pydantic models
     class Config:
         orm_mode = True
 
+# A document with the size and rotation of every page, for laying it out before the PDF loads
+class DocumentDetail(Document):
+    pages: List[DocumentPage] = []  # Pages in page order, empty until extracted
+
 # Base schema for an annotation, containing the common fields
 class AnnotationBase(BaseModel):
     document_id: int  # Reference to the associated document
     page: int  # Page number where the annotation is placed
     x: float  # X coordinate of the annotation
     y: float  # Y coordinate of the annotation
-    width: float  # Width of the annotation area
-    height: float  # Height of the annotation area
+    width: float = Field(..., ge=0)  # Width of the annotation area, extending right from x
+    height: float = Field(..., ge=0)  # Height of the annotation area, extending down from y
     value: str  # Annotation content or identifier
     annotation_value: str = None  # Optional field for additional annotation value, default is None
     created_by: Optional[str] = None  # User who created the annotation, default is None
@@ -74,6 +134,16 @@ class AnnotationBase(BaseModel):
 class AnnotationCreate(AnnotationBase):
     pass
 
+# Schema used when updating an annotation; only the provided fields are changed
+class AnnotationUpdate(BaseModel):
+    page: Optional[int] = None  # Page number where the annotation is placed
+    x: Optional[float] = None  # X coordinate of the annotation
+    y: Optional[float] = None  # Y coordinate of the annotation
+    width: Optional[float] = Field(None, ge=0)  # Width of the annotation area
+    height: Optional[float] = Field(None, ge=0)  # Height of the annotation area
+    value: Optional[str] = None  # Annotation content or identifier
+    annotation_value: Optional[str] = None  # Additional annotation value
+
 # Schema for an annotation that has been stored in the database
 class Annotation(AnnotationBase):
     id: int  # Unique identifier for the annotation
@@ -82,4 +152,103 @@ class Annotation(AnnotationBase):
 
     # Enable ORM mode to allow mapping SQLAlchemy models to Pydantic models
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+# Compact annotation projection without the nested parent document
+class AnnotationSlim(BaseModel):
+    id: int  # Unique identifier for the annotation
+    page: int  # Page number where the annotation is placed
+    x: float  # X coordinate of the annotation
+    y: float  # Y coordinate of the annotation
+    width: float  # Width of the annotation area
+    height: float  # Height of the annotation area
+    value: str  # Annotation content or identifier
+    annotation_value: Optional[str] = None  # Additional annotation value
+    created_by: Optional[str] = None  # User who created the annotation
+    created_at: datetime  # Timestamp of when the annotation was created
+
+    class Config:
+        orm_mode = True
+
+# A document returned once alongside its compact annotations
+class DocumentAnnotations(BaseModel):
+    document: Document  # The parent document, including its document type
+    annotations: List[AnnotationSlim]  # Annotations without the repeated document
+    next_cursor: Optional[str] = None  # Cursor for the next page, None on the last page
+
+# Net annotation changes for a document since a given revision
+class AnnotationChanges(BaseModel):
+    document_id: int  # The document the changes belong to
+    revision: int  # Current document revision; pass as since_revision on the next sync
+    upserted: List[AnnotationSlim]  # Annotations created or updated since, in their current state
+    deleted: List[int]  # IDs of annotations deleted since
+
+# A single item rejected by the bulk annotation create endpoint
+class BulkAnnotationError(BaseModel):
+    index: int  # Zero-based position of the item in the request
+    detail: str  # Why the item was rejected
+
+# Outcome of a bulk annotation create
+class BulkAnnotationResult(BaseModel):
+    ids: List[int]  # IDs of the created annotations, in request order
+    errors: List[BulkAnnotationError] = []  # Rejected items; only non-empty when partial=true
+
+# Request to start a resumable chunked upload
+class UploadSessionCreate(BaseModel):
+    filename: str  # Name the document is uploaded under; must end in .pdf
+    size: int = Field(..., gt=0)  # Total size of the file in bytes
+    chunk_size: Optional[int] = None  # Size of every chunk except the last; chosen by the server if omitted
+    document_type_id: Optional[int] = None  # Document type assigned on finalize
+
+# State of a resumable chunked upload
+class UploadSession(BaseModel):
+    upload_id: str  # Identifier used in the chunk and finalize URLs
+    filename: str  # Name the document is uploaded under
+    size: int  # Total size of the file in bytes
+    chunk_size: int  # Size of every chunk except the last
+    chunk_count: int  # Number of chunks, numbered from 0
+    document_type_id: Optional[int] = None  # Document type assigned on finalize
+    received_chunks: List[int]  # Indices of chunks received in full
+    received_ranges: List[Tuple[int, int]]  # Half-open byte ranges covered by the received chunks
+
+# A background job and its progress
+class Job(BaseModel):
+    id: int  # Unique identifier for the job
+    kind: str  # The job kind, e.g. "linearize"
+    document_id: Optional[int] = None  # The document the job belongs to
+    status: str  # One of "queued", "running", "succeeded" or "failed"
+    priority: int  # Jobs with a higher priority run first
+    attempts: int  # Number of times the job has been started
+    max_attempts: int  # Attempts after which a failing job is given up
+    run_after: datetime  # The job does not start before this time
+    last_error: Optional[str] = None  # Error of the most recent failed attempt
+    result: Optional[Any] = None  # What the job produced, once succeeded
+    created_at: datetime  # Timestamp of when the job was queued
+    started_at: Optional[datetime] = None  # Timestamp of when the latest attempt started
+    finished_at: Optional[datetime] = None  # Timestamp of when the job succeeded or was given up
+
+    class Config:
+        orm_mode = True
+
+# A document page matching a full-text search
+class SearchHit(BaseModel):
+    document_id: int  # The document containing the match
+    file_path: str  # Name the document was uploaded under
+    page_number: int  # One-based page number of the match
+    snippet: str  # Text around the match, with matched terms wrapped in <mark></mark>
+    score: float  # Relevance; higher is better
+
+# A page of full-text search results
+class SearchResults(BaseModel):
+    query: str  # The query as given
+    hits: List[SearchHit]  # Matching pages, best first
+
+# An annotation matching a search over annotation values
+class AnnotationSearchHit(AnnotationSlim):
+    document_id: int  # The document the annotation belongs to
+    score: float  # Relevance; higher is better
+
+# A page of annotation search results
+class AnnotationSearchResults(BaseModel):
+    query: str  # The query as given
+    hits: List[AnnotationSearchHit]  # Matching annotations, best first
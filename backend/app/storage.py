@@ -0,0 +1,569 @@
+# ============================
+# Upload Storage Module
+# ============================
+
+"""
+This module stores uploaded PDF files by content without blocking the event loop.
+
+Each file is kept once under the SHA-256 digest of its bytes (a "blob"), sharded
+by the first two hex digits, and shared by every document with identical
+contents. An upload is read once, in fixed-size chunks, and written through
+aiofiles to a temporary file while its digest, size and PDF signature are
+computed. The caller then takes a reference to the blob in the database, and
+only the upload holding its first reference renames its temporary file into
+place, so the static file server never serves a partially written PDF; the
+others discard theirs. Whether a file exists is never used to decide whether it
+is stored: the database reference count is, and a blob's files are only deleted
+while the transaction that forgot it still locks it.
+
+Very large files can instead be sent through a resumable upload session: the
+client PUTs numbered chunks, in any order and possibly in parallel, which are
+staged as separate files next to a small JSON manifest. Because the session lives
+entirely on disk it survives dropped connections and server restarts. On
+finalize the staged chunks are hashed in order and, if the blob has to be
+written, concatenated into it with in-kernel file copies rather than through
+Python buffers.
+"""
+
+# ============================
+# Import Statements
+# ============================
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from typing import AsyncIterator, List, NamedTuple, Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# ============================
+# Configuration Constants
+# ============================
+
+# Bytes read from the upload and written to disk per step
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Every PDF file starts with this signature
+PDF_MAGIC = b"%PDF-"
+
+# Suffix of files still being written; they are never served under their final name
+PARTIAL_UPLOAD_SUFFIX = ".part"
+
+# Chunk size of a resumable upload session when the client does not choose one
+DEFAULT_SESSION_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Bounds on the chunk size a client may choose
+MIN_SESSION_CHUNK_SIZE = 256 * 1024
+MAX_SESSION_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Upload sessions untouched for longer than this are discarded at startup
+UPLOAD_SESSION_TTL_SECONDS = float(os.getenv("UPLOAD_SESSION_TTL_HOURS", "24")) * 3600
+
+# Name of the file describing an upload session inside its staging directory
+SESSION_MANIFEST = "manifest.json"
+
+# Suffix of a fully received chunk
+CHUNK_SUFFIX = ".chunk"
+
+# Upload session IDs are UUID4 hex strings; anything else is rejected before touching the file system
+SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# ============================
+# Blob Layout
+# ============================
+
+def blob_relative_path(content_hash: str) -> str:
+    """
+    Returns where the blob with the given digest is stored, relative to the upload folder.
+
+    Args:
+        content_hash (str): Hex SHA-256 digest of the blob.
+
+    Returns:
+        str: The relative path, e.g. "ab/ab12....pdf".
+    """
+    return f"{content_hash[:2]}/{content_hash}.pdf"
+
+
+def linearized_relative_path(content_hash: str) -> str:
+    """
+    Returns where the linearized copy of a blob is stored, relative to the upload folder.
+
+    Args:
+        content_hash (str): Hex SHA-256 digest of the original blob.
+
+    Returns:
+        str: The relative path, e.g. "ab/ab12....linearized.pdf".
+    """
+    return f"{content_hash[:2]}/{content_hash}.linearized.pdf"
+
+# ============================
+# Upload Pipeline
+# ============================
+
+class StoredBlob(NamedTuple):
+    """
+    The result of storing an upload.
+
+    Attributes:
+        path (str): Location of the blob on disk.
+        content_hash (str): Hex SHA-256 digest of the contents.
+        size (int): Size of the file in bytes.
+        written (bool): False if another upload already holds a reference to identical contents and nothing was written.
+    """
+    path: str
+    content_hash: str
+    size: int
+    written: bool
+
+
+class StagedUpload(NamedTuple):
+    """
+    An upload written to a temporary file while its digest was computed.
+
+    Attributes:
+        temp_path (str): The temporary file; never served, and removed by `discard_staged_upload`.
+        content_hash (str): Hex SHA-256 digest of the contents.
+        size (int): Size of the file in bytes.
+    """
+    temp_path: str
+    content_hash: str
+    size: int
+
+
+async def stage_upload(file: UploadFile, directory: str) -> StagedUpload:
+    """
+    Reads an uploaded PDF once, computing its digest and size while writing it to a temporary file.
+
+    The digest is only known at the end, so the file is staged in the upload folder
+    itself, on the same file system as every blob, and `store_blob` renames it into
+    place if the blob has to be written. An upload of contents that are already
+    stored still costs this one write, which `discard_staged_upload` then throws
+    away, in exchange for reading the upload only once.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        directory (str): The upload folder blobs are stored under.
+
+    Returns:
+        StagedUpload: The temporary file with the contents' digest and size.
+
+    Raises:
+        ValueError: If the contents are empty or do not start with the PDF signature.
+        OSError: If the file could not be written.
+    """
+    temp_path = os.path.join(directory, f".{uuid.uuid4().hex}{PARTIAL_UPLOAD_SUFFIX}")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(temp_path, "wb") as buffer:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if size == 0 and not chunk.startswith(PDF_MAGIC):
+                    raise ValueError("File content is not a PDF.")
+                digest.update(chunk)
+                size += len(chunk)
+                await buffer.write(chunk)
+            if size == 0:
+                raise ValueError("File is empty.")
+            await buffer.flush()
+            # Make the contents durable before a rename can make them visible
+            await aiofiles.os.wrap(os.fsync)(buffer.fileno())
+    except BaseException:
+        await discard_staged_upload(StagedUpload(temp_path=temp_path, content_hash="", size=size))
+        raise
+    return StagedUpload(temp_path=temp_path, content_hash=digest.hexdigest(), size=size)
+
+
+async def discard_staged_upload(staged: StagedUpload) -> None:
+    """
+    Removes the temporary file of a staged upload, unless `store_blob` already moved it into place.
+
+    Args:
+        staged (StagedUpload): The staged upload.
+    """
+    try:
+        await aiofiles.os.remove(staged.temp_path)
+    except FileNotFoundError:
+        pass
+
+
+async def blob_exists(directory: str, content_hash: str) -> bool:
+    """
+    Checks whether the file of a blob has been written.
+
+    Args:
+        directory (str): The upload folder blobs are stored under.
+        content_hash (str): Hex SHA-256 digest of the blob.
+
+    Returns:
+        bool: True if the file is in place.
+    """
+    return await aiofiles.os.path.exists(os.path.join(directory, blob_relative_path(content_hash)))
+
+
+async def store_blob(staged: StagedUpload, directory: str) -> str:
+    """
+    Moves a staged upload into place as the blob named by its content hash.
+
+    Args:
+        staged (StagedUpload): The staged upload, from `stage_upload`.
+        directory (str): The upload folder blobs are stored under.
+
+    Returns:
+        str: The path of the blob.
+
+    Raises:
+        OSError: If the file could not be moved.
+    """
+    final_path = os.path.join(directory, blob_relative_path(staged.content_hash))
+    await aiofiles.os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    # Concurrent uploads of the same new contents may each move identical bytes, so the last rename wins harmlessly
+    await aiofiles.os.replace(staged.temp_path, final_path)
+    logger.info(f"Stored blob {staged.content_hash} at '{final_path}' ({staged.size} bytes).")
+    return final_path
+
+
+def delete_blob(directory: str, content_hash: str) -> None:
+    """
+    Removes the files of a blob, along with its linearized copy.
+
+    Call it only after `crud.forget_blob` deleted the blob and before that transaction
+    commits, so that no upload can take a reference to the blob in between.
+
+    Args:
+        directory (str): The upload folder blobs are stored under.
+        content_hash (str): Hex SHA-256 digest of the blob.
+    """
+    for relative_path in (blob_relative_path(content_hash), linearized_relative_path(content_hash)):
+        try:
+            os.remove(os.path.join(directory, relative_path))
+        except FileNotFoundError:
+            pass
+    logger.info(f"Deleted unreferenced blob {content_hash}.")
+
+
+# ============================
+# Resumable Upload Sessions
+# ============================
+
+class UploadSession(NamedTuple):
+    """
+    A resumable upload in progress, described by the manifest in its staging directory.
+
+    Attributes:
+        upload_id (str): Identifier of the session.
+        directory (str): Staging directory holding the manifest and received chunks.
+        filename (str): The name the document is uploaded under.
+        size (int): Total size of the file in bytes.
+        chunk_size (int): Size of every chunk except possibly the last.
+        document_type_id (Optional[int]): The document type to assign on finalize.
+        created_at (float): UNIX timestamp when the session was created.
+    """
+    upload_id: str
+    directory: str
+    filename: str
+    size: int
+    chunk_size: int
+    document_type_id: Optional[int]
+    created_at: float
+
+    @property
+    def chunk_count(self) -> int:
+        """
+        Number of chunks the file is split into.
+        """
+        return -(-self.size // self.chunk_size)
+
+    def chunk_length(self, index: int) -> int:
+        """
+        Returns the exact size chunk `index` must have.
+        """
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def chunk_path(self, index: int) -> str:
+        """
+        Returns where chunk `index` is staged once received in full.
+        """
+        return os.path.join(self.directory, f"{index:06d}{CHUNK_SUFFIX}")
+
+    def byte_ranges(self, chunks: List[int]) -> List[Tuple[int, int]]:
+        """
+        Merges received chunk indices into byte ranges.
+
+        Args:
+            chunks (List[int]): Sorted indices of received chunks.
+
+        Returns:
+            List[Tuple[int, int]]: Half-open `(start, end)` byte ranges covered by the chunks.
+        """
+        ranges = []
+        for index in chunks:
+            start = index * self.chunk_size
+            end = start + self.chunk_length(index)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+
+async def create_upload_session(
+    staging_directory: str, filename: str, size: int, chunk_size: int, document_type_id: Optional[int]
+) -> UploadSession:
+    """
+    Starts a resumable upload by creating its staging directory and manifest.
+
+    Args:
+        staging_directory (str): Directory holding all upload sessions.
+        filename (str): The name the document is uploaded under.
+        size (int): Total size of the file in bytes.
+        chunk_size (int): Size of every chunk except possibly the last.
+        document_type_id (Optional[int]): The document type to assign on finalize.
+
+    Returns:
+        UploadSession: The new session.
+    """
+    upload_id = uuid.uuid4().hex
+    session = UploadSession(
+        upload_id=upload_id,
+        directory=os.path.join(staging_directory, upload_id),
+        filename=filename,
+        size=size,
+        chunk_size=chunk_size,
+        document_type_id=document_type_id,
+        created_at=time.time(),
+    )
+    await aiofiles.os.makedirs(session.directory)
+    manifest = {field: getattr(session, field) for field in UploadSession._fields if field != "directory"}
+    async with aiofiles.open(os.path.join(session.directory, SESSION_MANIFEST), "w") as buffer:
+        await buffer.write(json.dumps(manifest))
+    logger.info(f"Created upload session {upload_id} for '{filename}' ({size} bytes in {session.chunk_count} chunks).")
+    return session
+
+
+async def load_upload_session(staging_directory: str, upload_id: str) -> Optional[UploadSession]:
+    """
+    Looks up a resumable upload session.
+
+    Args:
+        staging_directory (str): Directory holding all upload sessions.
+        upload_id (str): Identifier of the session.
+
+    Returns:
+        Optional[UploadSession]: The session, or None if it does not exist.
+    """
+    if not SESSION_ID_PATTERN.match(upload_id):
+        return None
+    directory = os.path.join(staging_directory, upload_id)
+    try:
+        async with aiofiles.open(os.path.join(directory, SESSION_MANIFEST)) as buffer:
+            manifest = json.loads(await buffer.read())
+    except FileNotFoundError:
+        return None
+    return UploadSession(directory=directory, **manifest)
+
+
+async def received_chunks(session: UploadSession) -> List[int]:
+    """
+    Lists the chunks of a session that have been received in full.
+
+    Args:
+        session (UploadSession): The upload session.
+
+    Returns:
+        List[int]: Sorted indices of the received chunks.
+    """
+    chunks = []
+    for name in await aiofiles.os.listdir(session.directory):
+        if not name.endswith(CHUNK_SUFFIX):
+            continue
+        index = int(name[:-len(CHUNK_SUFFIX)])
+        # A chunk cut short by a crash before it reached the disk counts as missing
+        if index < session.chunk_count and \
+                (await aiofiles.os.stat(session.chunk_path(index))).st_size == session.chunk_length(index):
+            chunks.append(index)
+    return sorted(chunks)
+
+
+async def store_chunk(session: UploadSession, index: int, body: AsyncIterator[bytes]) -> None:
+    """
+    Stages one chunk of a resumable upload, replacing any earlier copy of it.
+
+    The chunk is streamed to a temporary file and only renamed to its final name
+    once it has exactly the expected length, so concurrent and retried PUTs of
+    the same chunk never leave a partial chunk behind.
+
+    Args:
+        session (UploadSession): The upload session.
+        index (int): Zero-based index of the chunk.
+        body (AsyncIterator[bytes]): The chunk's bytes.
+
+    Raises:
+        ValueError: If the chunk has the wrong length, or the first chunk does not start with the PDF signature.
+    """
+    expected = session.chunk_length(index)
+    temp_path = os.path.join(session.directory, f".{uuid.uuid4().hex}{PARTIAL_UPLOAD_SUFFIX}")
+    received = 0
+    # The first chunk is held back until enough of it arrived to check the PDF signature,
+    # since the network may deliver it in pieces shorter than the signature
+    head = b"" if index == 0 else None
+
+    try:
+        async with aiofiles.open(temp_path, "wb") as buffer:
+            async for data in body:
+                if not data:
+                    continue
+                received += len(data)
+                if received > expected:
+                    raise ValueError(f"Chunk {index} is longer than {expected} bytes.")
+                if head is not None:
+                    head += data
+                    if len(head) < len(PDF_MAGIC):
+                        continue
+                    if not head.startswith(PDF_MAGIC):
+                        raise ValueError("File content is not a PDF.")
+                    data, head = head, None
+                await buffer.write(data)
+        if head is not None:
+            raise ValueError("File content is not a PDF.")
+        if received != expected:
+            raise ValueError(f"Chunk {index} has {received} bytes; expected {expected}.")
+        await aiofiles.os.replace(temp_path, session.chunk_path(index))
+    except BaseException:
+        try:
+            await aiofiles.os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def _append_file(destination, source_path: str) -> None:
+    """
+    Appends a file to an unbuffered open file, copying inside the kernel where the platform allows it.
+    """
+    with open(source_path, "rb") as source:
+        remaining = os.fstat(source.fileno()).st_size
+        if hasattr(os, "copy_file_range"):
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(source.fileno(), destination.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                return
+            except OSError:
+                pass  # E.g. unsupported by the file system; both offsets have advanced past what was copied
+        shutil.copyfileobj(source, destination, UPLOAD_CHUNK_SIZE)
+
+
+def _hash_chunks(session: UploadSession) -> str:
+    digest = hashlib.sha256()
+    with open(session.chunk_path(0), "rb") as first:
+        if not first.read(len(PDF_MAGIC)).startswith(PDF_MAGIC):
+            raise ValueError("File content is not a PDF.")
+    for index in range(session.chunk_count):
+        with open(session.chunk_path(index), "rb") as chunk:
+            while data := chunk.read(UPLOAD_CHUNK_SIZE):
+                digest.update(data)
+    return digest.hexdigest()
+
+
+def _assemble_blob(session: UploadSession, directory: str, content_hash: str) -> str:
+    final_path = os.path.join(directory, blob_relative_path(content_hash))
+    blob_directory = os.path.dirname(final_path)
+    os.makedirs(blob_directory, exist_ok=True)
+    temp_path = os.path.join(blob_directory, f".{uuid.uuid4().hex}{PARTIAL_UPLOAD_SUFFIX}")
+    try:
+        with open(temp_path, "wb", buffering=0) as buffer:
+            for index in range(session.chunk_count):
+                _append_file(buffer, session.chunk_path(index))
+            # Make the contents durable before the rename makes them visible
+            os.fsync(buffer.fileno())
+        os.replace(temp_path, final_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    logger.info(f"Stored blob {content_hash} at '{final_path}' ({session.size} bytes from {session.chunk_count} chunks).")
+    return final_path
+
+
+async def hash_upload_session(session: UploadSession) -> str:
+    """
+    Reads the staged chunks of a complete upload session in order to compute their digest.
+
+    Args:
+        session (UploadSession): The upload session; every chunk must have been received.
+
+    Returns:
+        str: The hex SHA-256 digest of the whole file.
+
+    Raises:
+        ValueError: If the contents do not start with the PDF signature.
+    """
+    return await run_in_threadpool(_hash_chunks, session)
+
+
+async def assemble_upload(session: UploadSession, directory: str, content_hash: str) -> str:
+    """
+    Writes the staged chunks of a complete upload session as the blob `hash_upload_session` identified.
+
+    Args:
+        session (UploadSession): The upload session; every chunk must have been received.
+        directory (str): The upload folder blobs are stored under.
+        content_hash (str): Hex SHA-256 digest of the contents.
+
+    Returns:
+        str: The path of the blob.
+
+    Raises:
+        OSError: If the file could not be written.
+    """
+    return await run_in_threadpool(_assemble_blob, session, directory, content_hash)
+
+
+async def discard_upload_session(session: UploadSession) -> None:
+    """
+    Removes an upload session and all of its staged chunks.
+
+    Args:
+        session (UploadSession): The upload session.
+    """
+    await run_in_threadpool(shutil.rmtree, session.directory, True)
+    logger.info(f"Discarded upload session {session.upload_id}.")
+
+
+def purge_expired_upload_sessions(staging_directory: str, max_age_seconds: float = UPLOAD_SESSION_TTL_SECONDS) -> int:
+    """
+    Removes upload sessions that have not received anything for longer than `max_age_seconds`.
+
+    Args:
+        staging_directory (str): Directory holding all upload sessions.
+        max_age_seconds (float, optional): Age after which an idle session is discarded.
+
+    Returns:
+        int: The number of sessions removed.
+    """
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for entry in os.scandir(staging_directory):
+        if entry.is_dir() and SESSION_ID_PATTERN.match(entry.name) and entry.stat().st_mtime < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
@@ -0,0 +1,149 @@
+"""
+Incomplete documents queue latency benchmark.
+
+Builds a synthetic SQLite database of credit agreements typed against the seeded
+catalog, each annotated with a random subset of its data elements and the odd
+duplicate, fills the completeness columns with the same set-based refresh the
+annotation counters use, and times `crud.get_incomplete_documents` for the first
+and a deep page, plus a single annotation create that updates completeness.
+Run from the backend directory:
+
+python -m benchmarks.completeness --documents 100000
+
+"""
+
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# ============================
+# Benchmark Setup
+# ============================
+
+def build_database(documents: int, coverage: float, duplicates: float) -> None:
+    """
+    Fills the configured database with the seeded catalog and synthetic annotated documents.
+
+    Args:
+        documents (int): Number of agreements to create.
+        coverage (float): Chance that each data element of a document is annotated.
+        duplicates (float): Chance that an annotated data element is annotated twice.
+    """
+    from app import crud, models
+    from app.database import SessionLocal, engine
+    from app.seeder import seed_database
+
+    models.Base.metadata.create_all(bind=engine)
+    with contextlib.redirect_stdout(io.StringIO()):
+        seed_database()
+    with SessionLocal() as db:
+        names = [element.name for element in crud.get_data_elements_for_document_type(db, document_type_id=1)]
+    rng = random.Random(0)
+
+    with engine.begin() as conn:
+        conn.execute(models.Document.__table__.insert(), [
+            {"id": i, "file_path": f"agreement-{i}.pdf", "revision": 0, "document_type_id": 1}
+            for i in range(1, documents + 1)
+        ])
+
+    chunk = 5_000
+    for first in range(1, documents + 1, chunk):
+        rows = []
+        for document_id in range(first, min(first + chunk, documents + 1)):
+            for name in names:
+                if rng.random() < coverage:
+                    copies = 2 if rng.random() < duplicates else 1
+                    rows.extend(
+                        {"document_id": document_id, "page": 1, "x": 0, "y": 0, "width": 10, "height": 10, "value": name}
+                        for _ in range(copies)
+                    )
+        with engine.begin() as conn:
+            conn.execute(models.Annotation.__table__.insert(), rows)
+        with SessionLocal() as db:
+            crud.reconcile_annotation_counts(db, list(range(first, min(first + chunk, documents + 1))))
+            db.commit()
+
+
+def time_call(call, repeat: int) -> tuple:
+    """
+    Runs a call repeatedly.
+
+    Args:
+        call: Function taking a session and returning a sized result.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        tuple: Median and worst latency in seconds, and the size of the last result.
+    """
+    from app.database import SessionLocal
+
+    timings = []
+    with SessionLocal() as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = call(db)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings), max(timings), len(result)
+
+# ============================
+# Command Line Interface
+# ============================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the incomplete documents queue.")
+    parser.add_argument("--documents", type=int, default=100_000, help="Number of synthetic agreements.")
+    parser.add_argument("--coverage", type=float, default=0.97, help="Chance each data element is annotated.")
+    parser.add_argument("--duplicates", type=float, default=0.005, help="Chance an annotated element is duplicated.")
+    parser.add_argument("--limit", type=int, default=100, help="Documents per page.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per measurement.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="completeness-bench-")
+    # Must be set before the application modules create their engine
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    try:
+        from app import crud, schemas
+
+        started = time.perf_counter()
+        build_database(args.documents, args.coverage, args.duplicates)
+        print(f"Built {args.documents:,} documents in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        def deep_page(db):
+            # Continue after the first incomplete document past the middle of the corpus
+            middle = crud.get_incomplete_documents(db, after_id=args.documents // 2, limit=1)[0]
+            return crud.get_incomplete_documents(db, after_id=middle[0].id, limit=args.limit)[0]
+
+        def annotate(db):
+            crud.create_annotation(db, schemas.AnnotationCreate(
+                document_id=random.randint(1, args.documents), page=1, x=0, y=0, width=10, height=10, value="Borrower Name"
+            ))
+            return ()
+
+        measurements = [
+            ("first page", lambda db: crud.get_incomplete_documents(db, limit=args.limit)[0]),
+            ("deep page", deep_page),
+            ("annotation create", annotate),
+        ]
+        for name, call in measurements:
+            median, worst, rows = time_call(call, args.repeat)
+            print(f"{name:20s} {rows:4d} rows  median {median * 1000:8.2f} ms  max {worst * 1000:8.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Annotation export throughput benchmark.
+
+Builds a synthetic SQLite database of annotations and times each export format,
+reporting rows/s and peak resident memory. Run from the backend directory:
+
+python -m benchmarks.export_throughput --rows 10000000
+
+"""
+
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import argparse
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# ============================
+# Benchmark Setup
+# ============================
+
+def build_database(rows: int, documents: int) -> None:
+    """
+    Fills the configured database with synthetic documents and annotations.
+
+    Args:
+        rows (int): Number of annotations to create.
+        documents (int): Number of documents to spread them over.
+    """
+    from app import models
+    from app.database import engine
+
+    models.Base.metadata.create_all(bind=engine)
+    names = ["Borrower Name", "Lender Name", "Loan Amount", "Interest Rate", "Maturity Date", "Governing Law"]
+    start = datetime(2024, 1, 1)
+    rng = random.Random(0)
+
+    with engine.begin() as conn:
+        conn.execute(models.DocumentType.__table__.insert(), [
+            {"id": 1, "name": "Credit Agreement"},
+            {"id": 2, "name": "Draw Notice"},
+        ])
+        conn.execute(models.Document.__table__.insert(), [
+            {"id": i, "file_path": f"agreement-{i}.pdf", "document_type_id": 1 + i % 2,
+             "uploaded_at": start, "revision": 0}
+            for i in range(1, documents + 1)
+        ])
+
+    chunk = 100_000
+    for offset in range(0, rows, chunk):
+        with engine.begin() as conn:
+            conn.execute(models.Annotation.__table__.insert(), [
+                {
+                    "document_id": 1 + i % documents,
+                    "page": 1 + i % 300,
+                    "x": rng.uniform(0, 600),
+                    "y": rng.uniform(0, 800),
+                    "width": rng.uniform(10, 200),
+                    "height": rng.uniform(10, 40),
+                    "value": names[i % len(names)],
+                    "annotation_value": f"value {i}",
+                    "created_by": f"reviewer{i % 20}",
+                    "created_at": start + timedelta(seconds=i),
+                }
+                for i in range(offset, min(offset + chunk, rows))
+            ])
+
+
+def run_export(format: str) -> tuple:
+    """
+    Runs one export format to completion, discarding the output.
+
+    Args:
+        format (str): One of the export formats in app.export.EXPORT_SERIALIZERS.
+
+    Returns:
+        tuple: Elapsed seconds and number of bytes produced.
+    """
+    from app.export import EXPORT_SERIALIZERS
+
+    size = 0
+    started = time.perf_counter()
+    for chunk in EXPORT_SERIALIZERS[format]():
+        size += len(chunk)
+    return time.perf_counter() - started, size
+
+# ============================
+# Command Line Interface
+# ============================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark annotation export throughput.")
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Number of synthetic annotations.")
+    parser.add_argument("--documents", type=int, default=5_000, help="Number of synthetic documents.")
+    parser.add_argument("--formats", default="ndjson,parquet,arrow", help="Comma-separated formats to time.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="export-bench-")
+    # Must be set before the application modules create their engine
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    try:
+        started = time.perf_counter()
+        build_database(args.rows, args.documents)
+        print(f"Built {args.rows:,} annotations in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+        for format in args.formats.split(","):
+            elapsed, size = run_export(format)
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(
+                f"{format:8s} {args.rows / elapsed:12,.0f} rows/s  {elapsed:8.1f}s  "
+                f"{size / 2**20:9.1f} MiB  peak RSS {peak_mb:7.1f} MiB"
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
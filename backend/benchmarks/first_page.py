@@ -0,0 +1,242 @@
+"""
+Time-to-first-page benchmark for linearized and non-linearized PDFs.
+
+For each sample PDF, compares the file as uploaded with the variant the API serves
+after the ingest stage has linearized it. The timing comes from a model of
+pdf.js range loading built from the file's real object offsets. pdf.js streams the
+file from the start and, in parallel, requests the 64 KiB chunks it is missing
+with range requests, one round of requests per hop it follows in the object
+graph: trailer, catalog, page tree, first page, then the page's contents and
+resources. First-page time is when the last chunk page 1 needs has arrived,
+given the round-trip time and bandwidth. Rendering time is not included.
+
+Multi-page samples are also rewritten, without linearization, with page 1's
+objects stored last, as in packages assembled by appending documents, to show
+what an unoptimized upload of the same size costs.
+
+Requires pypdf for reading object offsets. Run from the backend directory:
+
+python -m benchmarks.first_page ../sample-pdfs/*.pdf --rtt-ms 50 --bandwidth-mbps 20
+
+"""
+
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import argparse
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, List, Set, Tuple
+
+# Third-Party Imports
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+# Local Imports
+from app.linearize import linearize_blob
+from app.storage import blob_relative_path, linearized_relative_path
+
+# ============================
+# Configuration Constants
+# ============================
+
+# pdf.js requests missing data in chunks of this size (its default rangeChunkSize)
+RANGE_CHUNK_SIZE = 64 * 1024
+
+# pdf.js looks for the linearization dictionary and startxref within this many bytes
+PROBE_SIZE = 1024
+
+# Keys pointing back up the object graph, which loading page 1 does not follow
+BACK_REFERENCE_KEYS = {"/Parent", "/P"}
+
+# ============================
+# Object Graph
+# ============================
+
+def object_extents(reader: PdfReader, size: int) -> Dict[int, Tuple[int, int]]:
+    """
+    Maps each object number to the byte range it occupies, objects in object streams to their stream's range.
+    """
+    offsets = {num: offset for table in reader.xref.values() for num, offset in table.items()}
+    starts = sorted(set(offsets.values())) + [size]
+    ends = {start: end for start, end in zip(starts, starts[1:])}
+    extents = {num: (offset, ends[offset]) for num, offset in offsets.items()}
+    for num, (stream_num, _) in reader.xref_objStm.items():
+        if stream_num in extents:
+            extents[num] = extents[stream_num]
+    return extents
+
+
+def first_page_levels(reader: PdfReader) -> List[Set[int]]:
+    """
+    Groups the objects needed to render page 1 by how many references away from the trailer they are.
+    """
+    root = reader.trailer.raw_get("/Root")
+    page = reader.pages[0].indirect_reference
+    ancestors = []
+    node = reader.pages[0]
+    while "/Parent" in node:
+        ancestors.append(node.raw_get("/Parent"))
+        node = node["/Parent"]
+    levels = [{root.idnum}] + [{ref.idnum} for ref in reversed(ancestors)] + [{page.idnum}]
+
+    seen = set().union(*levels)
+    frontier = [page]
+    while frontier:
+        found = []
+        for ref in frontier:
+            stack = [ref.get_object()]
+            while stack:
+                value = stack.pop()
+                if isinstance(value, DictionaryObject):
+                    children = [v for k, v in value.items() if k not in BACK_REFERENCE_KEYS]
+                elif isinstance(value, ArrayObject):
+                    children = list(value)
+                else:
+                    continue
+                for child in children:
+                    if isinstance(child, IndirectObject):
+                        if child.idnum not in seen:
+                            seen.add(child.idnum)
+                            found.append(child)
+                    else:
+                        stack.append(child)
+        if found:
+            levels.append({ref.idnum for ref in found})
+        frontier = found
+    return levels
+
+
+def startxref(path: str) -> int:
+    """
+    Returns the offset of the cross-reference section named at the end of the file.
+    """
+    with open(path, "rb") as f:
+        f.seek(max(0, os.path.getsize(path) - PROBE_SIZE))
+        return int(re.findall(rb"startxref\s+(\d+)", f.read())[-1])
+
+
+def is_linearized(path: str) -> bool:
+    """
+    Applies pdf.js's test: a linearization dictionary near the start whose /L matches the file size.
+    """
+    with open(path, "rb") as f:
+        head = f.read(PROBE_SIZE)
+    match = re.search(rb"/Linearized\s.*?/L\s+(\d+)", head, re.DOTALL)
+    return bool(match) and int(match.group(1)) == os.path.getsize(path)
+
+def write_page_one_last(source: str, destination: str) -> None:
+    """
+    Rewrites a PDF unlinearized with its pages' objects in reverse order, so page 1's come last.
+    """
+    writer = PdfWriter()
+    for page in reversed(PdfReader(source).pages):
+        writer.add_page(page)
+    writer.root_object["/Pages"]["/Kids"].reverse()
+    with open(destination, "wb") as f:
+        writer.write(f)
+
+# ============================
+# Loading Model
+# ============================
+
+def chunks_for(start: int, end: int) -> Set[int]:
+    return set(range(start // RANGE_CHUNK_SIZE, (max(end, start + 1) - 1) // RANGE_CHUNK_SIZE + 1))
+
+
+def time_to_first_page(path: str, rtt: float, bandwidth: float) -> Tuple[float, int, int]:
+    """
+    Models how long pdf.js takes to have every byte page 1 needs.
+
+    Args:
+        path (str): The PDF file.
+        rtt (float): Round-trip time in seconds.
+        bandwidth (float): Bandwidth in bytes per second.
+
+    Returns:
+        Tuple[float, int, int]: Seconds until page 1 can render, bytes it needs and range requests sent.
+    """
+    size = os.path.getsize(path)
+    reader = PdfReader(path)
+    extents = object_extents(reader, size)
+    last_chunk = (size - 1) // RANGE_CHUNK_SIZE
+
+    def stream_arrival(chunk: int) -> float:
+        end = min(size, (chunk + 1) * RANGE_CHUNK_SIZE)
+        return rtt + end / bandwidth
+
+    # Each step is the set of chunks needed before the next hop can be followed
+    steps = [{0}]
+    if not is_linearized(path):
+        # The cross-reference table comes from the end of the file, found via startxref
+        steps.append(chunks_for(size - PROBE_SIZE, size))
+        steps.append(chunks_for(startxref(path), size))
+    for level in first_page_levels(reader):
+        steps.append(set().union(*(chunks_for(*extents[num]) for num in level if num in extents)))
+
+    arrival: Dict[int, float] = {}
+    ready = 0.0
+    requests = 0
+    for step in steps:
+        for chunk in step - arrival.keys():
+            chunk_bytes = min(size, (chunk + 1) * RANGE_CHUNK_SIZE) - chunk * RANGE_CHUNK_SIZE
+            by_range = ready + rtt + chunk_bytes / bandwidth
+            arrival[chunk] = min(stream_arrival(chunk), by_range)
+            requests += by_range < stream_arrival(chunk)
+        ready = max([ready] + [arrival[chunk] for chunk in step])
+    needed = sum(min(size, (c + 1) * RANGE_CHUNK_SIZE) - c * RANGE_CHUNK_SIZE for c in arrival if c <= last_chunk)
+    return ready, needed, requests
+
+# ============================
+# Command Line Interface
+# ============================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model pdf.js time-to-first-page before and after linearization.")
+    parser.add_argument("pdfs", nargs="+", help="Sample PDF files.")
+    parser.add_argument("--rtt-ms", type=float, default=50, help="Round-trip time in milliseconds.")
+    parser.add_argument("--bandwidth-mbps", type=float, default=20, help="Bandwidth in megabits per second.")
+    args = parser.parse_args()
+    rtt = args.rtt_ms / 1000
+    bandwidth = args.bandwidth_mbps * 1_000_000 / 8
+
+    workdir = tempfile.mkdtemp(prefix="first-page-bench-")
+    try:
+        print(f"{'file':34s} {'variant':22s} {'size':>10s} {'lin':>3s} {'needed':>10s} {'ranges':>6s} {'first page ms':>13s}")
+        for source in args.pdfs:
+            variants = [("as uploaded", source)]
+            if len(PdfReader(source).pages) > 1:
+                reordered = os.path.join(workdir, f"page-one-last-{os.path.basename(source)}")
+                write_page_one_last(source, reordered)
+                variants.append(("page 1 last", reordered))
+
+            for label, path in list(variants):
+                # Run the ingest stage on a copy laid out like the upload folder
+                content_hash = f"{len(variants):064d}"
+                blob_path = os.path.join(workdir, blob_relative_path(content_hash))
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                shutil.copyfile(path, blob_path)
+                if linearize_blob(workdir, content_hash):
+                    served = os.path.join(workdir, f"served-{len(variants)}.pdf")
+                    shutil.move(os.path.join(workdir, linearized_relative_path(content_hash)), served)
+                else:
+                    served = path
+                variants.append((f"served ({label})", served))
+
+            for label, path in variants:
+                seconds, needed, requests = time_to_first_page(path, rtt, bandwidth)
+                print(
+                    f"{os.path.basename(source)[:34]:34s} {label[:22]:22s} {os.path.getsize(path):10,d} "
+                    f"{'yes' if is_linearized(path) else 'no':>3s} {needed:10,d} {requests:6d} {seconds * 1000:13.0f}"
+                )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Annotation create latency/throughput benchmark.
+
+Starts the API with and without ANNOTATION_GROUP_COMMIT and drives
+POST /annotations/ from 1, 16 and 128 concurrent writers, reporting requests/s
+and latency percentiles for each. Run from the backend directory:
+
+python -m benchmarks.group_commit --requests 2000
+
+"""
+
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+# ============================
+# Benchmark Setup
+# ============================
+
+def start_server(port: int, workdir: str, group_commit: bool) -> subprocess.Popen:
+    """
+    Starts the API in a subprocess on a fresh database and waits until it accepts requests.
+
+    Args:
+        port (int): Port to listen on.
+        workdir (str): Directory for the database and uploaded files.
+        group_commit (bool): Whether to enable the group-commit write path.
+
+    Returns:
+        subprocess.Popen: The server process.
+    """
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        UPLOAD_FOLDER=os.path.join(workdir, "uploads"),
+        ANNOTATION_GROUP_COMMIT="1" if group_commit else "0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("Server did not start.")
+
+
+def upload_document(port: int) -> int:
+    """
+    Uploads a small placeholder PDF to annotate.
+
+    Args:
+        port (int): Port the server listens on.
+
+    Returns:
+        int: The new document's ID.
+    """
+    boundary = "benchmark-boundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="document_type_id"\r\n\r\n1\r\n'
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="benchmark.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n%PDF-1.4 benchmark\r\n"
+        f"--{boundary}--\r\n"
+    ).encode()
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("POST", "/documents/", body, {"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    response = connection.getresponse()
+    document = json.loads(response.read())
+    connection.close()
+    return document["id"]
+
+
+def run_writer(port: int, document_id: int, count: int) -> List[float]:
+    """
+    Creates annotations one request at a time over a keep-alive connection.
+
+    Args:
+        port (int): Port the server listens on.
+        document_id (int): The document to annotate.
+        count (int): Number of annotations to create.
+
+    Returns:
+        List[float]: The latency of each request in seconds.
+    """
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    latencies = []
+    for i in range(count):
+        body = json.dumps({
+            "document_id": document_id, "page": 1 + i % 10, "x": 10, "y": 20,
+            "width": 100, "height": 12, "value": "Borrower Name", "annotation_value": "Acme Corp",
+        })
+        started = time.perf_counter()
+        connection.request("POST", "/annotations/", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - started)
+        if response.status != 201:
+            raise RuntimeError(f"Unexpected status {response.status}")
+    connection.close()
+    return latencies
+
+
+def run_level(port: int, document_id: int, writers: int, requests: int) -> tuple:
+    """
+    Runs `requests` creates spread over `writers` concurrent connections.
+
+    Args:
+        port (int): Port the server listens on.
+        document_id (int): The document to annotate.
+        writers (int): Number of concurrent connections.
+        requests (int): Total number of creates.
+
+    Returns:
+        tuple: Requests per second, median latency and 99th percentile latency in seconds.
+    """
+    per_writer = max(1, requests // writers)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        results = list(pool.map(lambda _: run_writer(port, document_id, per_writer), range(writers)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for result in results for latency in result)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / elapsed, statistics.median(latencies), p99
+
+# ============================
+# Command Line Interface
+# ============================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single annotation creates with and without group commit.")
+    parser.add_argument("--requests", type=int, default=2_000, help="Creates per concurrency level.")
+    parser.add_argument("--writers", default="1,16,128", help="Comma-separated concurrency levels.")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the benchmark server.")
+    args = parser.parse_args()
+
+    print(f"{'mode':13s} {'writers':>7s} {'req/s':>9s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for group_commit in (False, True):
+        workdir = tempfile.mkdtemp(prefix="group-commit-bench-")
+        server = start_server(args.port, workdir, group_commit)
+        try:
+            document_id = upload_document(args.port)
+            for writers in (int(level) for level in args.writers.split(",")):
+                throughput, p50, p99 = run_level(args.port, document_id, writers, args.requests)
+                mode = "group commit" if group_commit else "per request"
+                print(f"{mode:13s} {writers:7d} {throughput:9,.0f} {p50 * 1000:8.1f} {p99 * 1000:8.1f}")
+        finally:
+            server.terminate()
+            server.wait()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Full-text page search latency benchmark.
+
+Builds a synthetic SQLite database of agreements whose pages are random legal
+prose, with a few defined terms sprinkled at realistic rates, indexes it through
+the same `document_page_texts` triggers the ingest stage uses, and times
+`crud.search_page_text` for typical queries. Run from the backend directory:
+
+python -m benchmarks.search --documents 50000 --pages 20
+
+"""
+
+
+# ============================
+# Import Statements
+# ============================
+
+# Standard Library Imports
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# ============================
+# Configuration Constants
+# ============================
+
+# Filler vocabulary the page text is drawn from
+WORDS = (
+    "the borrower shall pay to administrative agent for account of each lender any amount "
+    "which such lender may reasonably determine under this agreement on or prior to date "
+    "hereof in accordance with section loan loans commitment interest rate percent per annum "
+    "notice obligations credit party parties required lenders default event maturity "
+    "payment prepayment tranche facility fees consolidated subsidiaries material adverse effect"
+).split()
+
+# Defined terms inserted into pages, with the fraction of pages using each
+PHRASES = [
+    ("Applicable Margin", 0.05),
+    ("Base Rate", 0.10),
+    ("LIBOR Successor Rate", 0.01),
+    ("Sanctioned Person", 0.002),
+]
+
+# Queries timed, as typed into the search box
+QUERIES = ['"Applicable Margin"', "LIBOR", '"Sanctioned Person" borrower', "lender", "maturity tranche"]
+
+# ============================
+# Benchmark Setup
+# ============================
+
+def build_database(documents: int, pages: int, words: int) -> None:
+    """
+    Fills the configured database with synthetic documents and indexed page text.
+
+    Args:
+        documents (int): Number of agreements to create.
+        pages (int): Pages per agreement.
+        words (int): Words per page.
+    """
+    from app import models
+    from app.database import engine
+
+    models.Base.metadata.create_all(bind=engine)
+    rng = random.Random(0)
+
+    with engine.begin() as conn:
+        conn.execute(models.Document.__table__.insert(), [
+            {"id": i, "file_path": f"agreement-{i}.pdf", "revision": 0, "page_count": pages, "text_indexed": True}
+            for i in range(1, documents + 1)
+        ])
+
+    chunk = max(1, 20_000 // pages)
+    for first in range(1, documents + 1, chunk):
+        rows = []
+        for document_id in range(first, min(first + chunk, documents + 1)):
+            for page_number in range(1, pages + 1):
+                text = rng.choices(WORDS, k=words)
+                for phrase, rate in PHRASES:
+                    if rng.random() < rate:
+                        text.insert(rng.randrange(len(text)), phrase)
+                rows.append({"document_id": document_id, "page_number": page_number, "text": " ".join(text)})
+        with engine.begin() as conn:
+            conn.execute(models.DocumentPageText.__table__.insert(), rows)
+
+
+def time_query(query: str, limit: int, repeat: int) -> tuple:
+    """
+    Runs one search repeatedly.
+
+    Args:
+        query (str): The query as typed.
+        limit (int): Hits requested per search.
+        repeat (int): Number of timed runs.
+
+    Returns:
+        tuple: Median and worst latency in seconds, and the number of hits.
+    """
+    from app import crud
+    from app.database import SessionLocal
+
+    terms = crud.parse_search_terms(query)
+    timings = []
+    with SessionLocal() as db:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            hits = crud.search_page_text(db, terms=terms, limit=limit)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings), max(timings), len(hits)
+
+# ============================
+# Command Line Interface
+# ============================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark full-text page search latency.")
+    parser.add_argument("--documents", type=int, default=50_000, help="Number of synthetic agreements.")
+    parser.add_argument("--pages", type=int, default=20, help="Pages per agreement.")
+    parser.add_argument("--words", type=int, default=400, help="Words per page.")
+    parser.add_argument("--limit", type=int, default=20, help="Hits requested per search.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="search-bench-")
+    # Must be set before the application modules create their engine
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    try:
+        started = time.perf_counter()
+        build_database(args.documents, args.pages, args.words)
+        size_mb = os.path.getsize(os.path.join(workdir, "bench.db")) / 2**20
+        print(
+            f"Indexed {args.documents * args.pages:,} pages of {args.documents:,} documents "
+            f"in {time.perf_counter() - started:.1f}s ({size_mb:,.0f} MiB)",
+            file=sys.stderr
+        )
+
+        for query in QUERIES:
+            median, worst, hits = time_query(query, args.limit, args.repeat)
+            print(f"{query:32s} {hits:4d} hits  median {median * 1000:8.1f} ms  max {worst * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
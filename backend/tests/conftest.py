@@ -0,0 +1,32 @@
+"""
+Test configuration.
+
+The application creates its database and upload folder when `app.main` is first
+imported, so both are pointed at a temporary directory before any test imports it.
+Background jobs are disabled; tests run the job handlers they need directly.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_workdir = tempfile.mkdtemp(prefix="pdf-annotation-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["UPLOAD_FOLDER"] = os.path.join(_workdir, "uploaded_files")
+os.environ["BACKGROUND_JOBS"] = "0"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def upload_folder() -> str:
+    return os.environ["UPLOAD_FOLDER"]
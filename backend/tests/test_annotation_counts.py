@@ -0,0 +1,31 @@
+"""
+Tests for the periodic annotation counter reconciliation job.
+"""
+
+from app import annotation_counts, crud, models
+from app.database import SessionLocal
+
+
+def queued_counter_jobs(db) -> int:
+    return db.query(models.Job)\
+        .filter(models.Job.kind == "annotation_counts", models.Job.status == crud.JOB_QUEUED)\
+        .count()
+
+
+def test_result_is_only_committed_with_the_job(client):
+    with SessionLocal() as db:
+        db.query(models.Job).filter(models.Job.kind == "annotation_counts").delete()
+        db.commit()
+
+    payload = {}
+    result = annotation_counts.run_annotation_counts_job(payload)
+    with SessionLocal() as db:
+        annotation_counts.save_annotation_counts_result(db, payload, result)
+        assert queued_counter_jobs(db) == 1
+        # Completing the job failed; the job will be retried instead
+        db.rollback()
+        assert queued_counter_jobs(db) == 0
+
+        annotation_counts.save_annotation_counts_result(db, payload, result)
+        db.commit()
+        assert queued_counter_jobs(db) == 1
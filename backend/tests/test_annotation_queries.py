@@ -0,0 +1,60 @@
+"""
+Tests that listing a document's annotations costs a fixed number of queries.
+"""
+
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.database import engine
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_annotated_document(client, count: int) -> int:
+    contents = b"%PDF-1.4\n% " + uuid.uuid4().hex.encode() + b"\n%%EOF\n"
+    response = client.post(
+        "/documents/",
+        files={"file": (f"annotated-{uuid.uuid4().hex}.pdf", contents, "application/pdf")},
+        data={"document_type_id": "1"},
+    )
+    assert response.status_code == 201, response.text
+    document_id = response.json()["id"]
+    annotations = [
+        {"document_id": document_id, "page": 1, "x": i, "y": i, "width": 10, "height": 10,
+         "value": f"Value {i}", "annotation_value": str(i)}
+        for i in range(count)
+    ]
+    response = client.post("/annotations/bulk", json=annotations)
+    assert response.status_code == 201, response.text
+    return document_id
+
+
+def statements_for_annotations(client, document_id: int, count: int) -> int:
+    with count_statements() as statements:
+        response = client.get(f"/annotations/{document_id}")
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body) == count
+    assert all(annotation["document"]["document_type"]["id"] == 1 for annotation in body)
+    return len(statements)
+
+
+def test_get_annotations_issues_constant_statements(client):
+    single = create_annotated_document(client, 1)
+    many = create_annotated_document(client, 100)
+
+    assert statements_for_annotations(client, many, 100) == statements_for_annotations(client, single, 1)
@@ -0,0 +1,123 @@
+"""
+Tests that blob files follow the database reference count, not what is on disk.
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app import crud, main, models
+from app.database import SessionLocal
+
+
+def make_pdf() -> bytes:
+    # Only the signature is checked on upload; unique contents keep the tests independent
+    return b"%PDF-1.4\n% " + uuid.uuid4().hex.encode() + b"\n%%EOF\n"
+
+
+def upload(client, filename: str, contents: bytes) -> dict:
+    response = client.post("/documents/", files={"file": (filename, contents, "application/pdf")})
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def get_ref_count(content_hash: str):
+    with SessionLocal() as db:
+        blob = db.get(models.Blob, content_hash)
+        return None if blob is None else blob.ref_count
+
+
+def test_concurrent_identical_uploads_keep_the_blob_when_one_is_replaced(client, upload_folder):
+    contents = make_pdf()
+    names = [f"concurrent-{uuid.uuid4().hex}.pdf" for _ in range(2)]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        documents = list(pool.map(lambda name: upload(client, name, contents), names))
+
+    content_hash = documents[0]["content_hash"]
+    assert documents[1]["content_hash"] == content_hash
+    assert get_ref_count(content_hash) == 2
+
+    # Replacing the contents of one document drops its reference to the shared blob
+    upload(client, names[0], make_pdf())
+
+    assert get_ref_count(content_hash) == 1
+    assert os.path.exists(os.path.join(upload_folder, documents[1]["storage_path"]))
+    response = client.get(f"/uploaded_files/{documents[1]['storage_path']}")
+    assert response.status_code == 200
+    assert response.content == contents
+
+
+def test_replaced_contents_are_deleted_once_unreferenced(client, upload_folder):
+    name = f"replaced-{uuid.uuid4().hex}.pdf"
+    document = upload(client, name, make_pdf())
+
+    upload(client, name, make_pdf())
+
+    assert get_ref_count(document["content_hash"]) is None
+    assert not os.path.exists(os.path.join(upload_folder, document["storage_path"]))
+
+
+def test_cleanup_keeps_a_blob_referenced_again_before_it_runs(client, upload_folder):
+    contents = make_pdf()
+    document = upload(client, f"released-{uuid.uuid4().hex}.pdf", contents)
+    content_hash = document["content_hash"]
+
+    # A re-upload elsewhere released the last reference but has not cleaned up yet...
+    with SessionLocal() as db:
+        assert crud.release_blob(db, content_hash)
+        db.commit()
+    # ...when the same contents are uploaded again
+    upload(client, f"reuploaded-{uuid.uuid4().hex}.pdf", contents)
+
+    asyncio.run(main.delete_unreferenced_blob(content_hash))
+
+    assert get_ref_count(content_hash) == 1
+    assert os.path.exists(os.path.join(upload_folder, document["storage_path"]))
+
+
+def test_failed_save_commits_nothing_and_releases_the_blob(client, upload_folder, monkeypatch):
+    name = f"failed-{uuid.uuid4().hex}.pdf"
+    contents = make_pdf()
+    enqueue_job = main.enqueue_job
+
+    def failing_enqueue_job(db, kind, *args, **kwargs):
+        if kind == "page_text":
+            raise RuntimeError("queue unavailable")
+        return enqueue_job(db, kind, *args, **kwargs)
+
+    with SessionLocal() as db:
+        jobs = db.query(models.Job).count()
+    monkeypatch.setattr(main, "enqueue_job", failing_enqueue_job)
+    with pytest.raises(RuntimeError):
+        upload(client, name, contents)
+    monkeypatch.undo()
+
+    content_hash = hashlib.sha256(contents).hexdigest()
+    with SessionLocal() as db:
+        assert db.query(models.Document).filter(models.Document.file_path == name).first() is None
+        assert db.query(models.Job).count() == jobs
+    assert get_ref_count(content_hash) is None
+
+    document = upload(client, name, contents)
+    assert get_ref_count(document["content_hash"]) == 1
+    assert client.get(f"/uploaded_files/{document['storage_path']}").content == contents
+
+
+def test_staged_files_are_removed(client, upload_folder):
+    def staged_files():
+        return {name for name in os.listdir(upload_folder) if name.endswith(".part")}
+
+    before = staged_files()
+    contents = make_pdf()
+    upload(client, f"staged-{uuid.uuid4().hex}.pdf", contents)
+    # Identical contents are already stored, so the second copy is discarded
+    upload(client, f"staged-{uuid.uuid4().hex}.pdf", contents)
+    response = client.post("/documents/", files={"file": ("staged.pdf", b"not a pdf", "application/pdf")})
+    assert response.status_code == 400
+
+    assert staged_files() == before
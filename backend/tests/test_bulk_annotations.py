@@ -0,0 +1,57 @@
+"""
+Tests that bulk-created annotation IDs line up with the accepted items.
+"""
+
+import uuid
+
+from app import crud
+
+
+def create_document(client) -> int:
+    contents = b"%PDF-1.4\n% " + uuid.uuid4().hex.encode() + b"\n%%EOF\n"
+    response = client.post(
+        "/documents/", files={"file": (f"bulk-{uuid.uuid4().hex}.pdf", contents, "application/pdf")}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def make_items(document_id: int, count: int, rejected_every: int = 0) -> list:
+    return [
+        {
+            "document_id": -1 if rejected_every and i % rejected_every == 0 else document_id,
+            "page": 1, "x": i, "y": i, "width": 10, "height": 10,
+            "value": f"Item {i}", "annotation_value": str(i),
+        }
+        for i in range(count)
+    ]
+
+
+def values_by_id(client, document_id: int) -> dict:
+    return {annotation["id"]: annotation["value"] for annotation in client.get(f"/annotations/{document_id}").json()}
+
+
+def test_ids_follow_the_accepted_items(client):
+    document_id = create_document(client)
+    # Spans several insert chunks; every seventh item points at a missing document and is skipped
+    items = make_items(document_id, 2 * crud.BULK_INSERT_CHUNK_SIZE + 37, rejected_every=7)
+    response = client.post("/annotations/bulk?partial=true", json=items)
+    assert response.status_code == 201, response.text
+    result = response.json()
+
+    accepted = [item for item in items if item["document_id"] == document_id]
+    assert [error["index"] for error in result["errors"]] == [i for i in range(len(items)) if i % 7 == 0]
+    assert len(result["ids"]) == len(accepted)
+    values = values_by_id(client, document_id)
+    assert [values[annotation_id] for annotation_id in result["ids"]] == [item["value"] for item in accepted]
+
+
+def test_ids_follow_the_items_across_chunks(client):
+    document_id = create_document(client)
+    items = make_items(document_id, 3 * crud.BULK_INSERT_CHUNK_SIZE + 1)
+    response = client.post("/annotations/bulk", json=items)
+    assert response.status_code == 201, response.text
+    ids = response.json()["ids"]
+
+    values = values_by_id(client, document_id)
+    assert [values[annotation_id] for annotation_id in ids] == [item["value"] for item in items]
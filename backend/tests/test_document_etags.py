@@ -0,0 +1,90 @@
+"""
+Tests that background jobs filling in a document invalidate its cached representations.
+"""
+
+import os
+import uuid
+
+from app import annotation_counts, models, page_metadata, page_text
+from app.database import SessionLocal
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "..", "sample-pdfs", "multi-page-sample.pdf")
+
+
+def upload_sample(client) -> dict:
+    with open(SAMPLE_PDF, "rb") as sample:
+        contents = sample.read()
+    response = client.post(
+        "/documents/", files={"file": (f"etag-{uuid.uuid4().hex}.pdf", contents, "application/pdf")}
+    )
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def run_job(run, on_success, document: dict, upload_folder: str) -> None:
+    payload = {"directory": upload_folder, "content_hash": document["content_hash"], "document_id": document["id"]}
+    result = run(payload)
+    with SessionLocal() as db:
+        on_success(db, payload, result)
+        db.commit()
+
+
+def assert_modified_by_job(client, upload_folder, run, on_success, field: str) -> None:
+    document = upload_sample(client)
+    url = f"/documents/{document['id']}/annotations"
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.json()["document"][field] is None
+    etag = first.headers["ETag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+    documents_etag = client.get("/documents_with_annotations").headers["ETag"]
+
+    run_job(run, on_success, document, upload_folder)
+
+    second = client.get(url, headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.json()["document"][field] is not None
+    assert second.headers["ETag"] != etag
+    assert client.get("/documents_with_annotations", headers={"If-None-Match": documents_etag}).status_code == 200
+
+
+def test_page_metadata_job_changes_the_etag(client, upload_folder):
+    assert_modified_by_job(
+        client, upload_folder,
+        page_metadata.run_page_metadata_job, page_metadata.save_page_metadata_result, "page_count",
+    )
+
+
+def test_page_text_job_changes_the_etag(client, upload_folder):
+    assert_modified_by_job(
+        client, upload_folder,
+        page_text.run_page_text_job, page_text.save_page_text_result, "text_indexed",
+    )
+
+
+def test_annotation_counts_repair_changes_the_etags(client):
+    document = upload_sample(client)
+    annotation = {
+        "document_id": document["id"], "page": 1, "x": 0, "y": 0, "width": 10, "height": 10,
+        "value": "Borrower Name", "annotation_value": "Acme",
+    }
+    assert client.post("/annotations/", json=annotation).status_code in (200, 201)
+    with SessionLocal() as db:
+        db.query(models.Document).filter(models.Document.id == document["id"]).update({"annotation_count": 999})
+        db.commit()
+
+    urls = [
+        "/documents_with_annotations", "/incomplete_documents",
+        f"/annotations/{document['id']}", f"/documents/{document['id']}/completeness",
+    ]
+    etags = {url: client.get(url).headers["ETag"] for url in urls}
+
+    payload = {}
+    with SessionLocal() as db:
+        annotation_counts.save_annotation_counts_result(db, payload, annotation_counts.run_annotation_counts_job(payload))
+        db.commit()
+
+    for url in urls:
+        assert client.get(url, headers={"If-None-Match": etags[url]}).status_code == 200, url
+    counts = {row["id"]: row["annotation_count"] for row in client.get("/documents_with_annotations?limit=1000").json()}
+    assert counts[document["id"]] == 1
@@ -0,0 +1,40 @@
+"""
+Tests that every response nesting a document's type includes the type's data elements.
+"""
+
+import uuid
+
+
+def element_names(document: dict) -> list:
+    return [element["name"] for element in document["document_type"]["data_elements"]]
+
+
+def test_document_responses_include_data_elements(client):
+    expected = [element["name"] for element in client.get("/data_elements_by_document_type/1").json()]
+    assert expected
+
+    contents = b"%PDF-1.4\n% " + uuid.uuid4().hex.encode() + b"\n%%EOF\n"
+    response = client.post(
+        "/documents/",
+        files={"file": (f"typed-{uuid.uuid4().hex}.pdf", contents, "application/pdf")},
+        data={"document_type_id": "1"},
+    )
+    assert response.status_code == 201, response.text
+    uploaded = response.json()
+    document_id = uploaded["id"]
+    assert element_names(uploaded) == expected
+
+    assert element_names(client.get(f"/documents/{document_id}").json()) == expected
+    listed = [document for document in client.get("/documents/?limit=1000").json() if document["id"] == document_id]
+    assert element_names(listed[0]) == expected
+
+    annotation = {
+        "document_id": document_id, "page": 1, "x": 0, "y": 0, "width": 10, "height": 10,
+        "value": "Borrower Name", "annotation_value": "Acme",
+    }
+    created = client.post("/annotations/", json=annotation).json()
+    assert element_names(created["document"]) == expected
+    updated = client.patch(f"/documents/{document_id}/annotations/{created['id']}", json={"x": 5}).json()
+    assert element_names(updated["document"]) == expected
+    assert element_names(client.get(f"/annotations/{document_id}").json()[0]["document"]) == expected
+    assert element_names(client.get(f"/documents/{document_id}/annotations").json()["document"]) == expected
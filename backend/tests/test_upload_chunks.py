@@ -0,0 +1,41 @@
+"""
+Tests for staging the chunks of resumable uploads.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from app import storage
+
+
+def make_session(tmp_path, size: int) -> storage.UploadSession:
+    return asyncio.run(storage.create_upload_session(str(tmp_path), "chunked.pdf", size, size, None))
+
+
+def store(session: storage.UploadSession, pieces) -> None:
+    async def body():
+        for piece in pieces:
+            yield piece
+
+    asyncio.run(storage.store_chunk(session, 0, body()))
+
+
+def test_signature_split_across_pieces_is_accepted(tmp_path):
+    contents = b"%PDF-1.7\n%%EOF\n"
+    session = make_session(tmp_path, len(contents))
+
+    store(session, [contents[:1], contents[1:3], contents[3:]])
+
+    with open(session.chunk_path(0), "rb") as chunk:
+        assert chunk.read() == contents
+
+
+def test_signature_split_across_pieces_is_checked(tmp_path):
+    contents = b"%PNG-1.7\n%%EOF\n"
+    session = make_session(tmp_path, len(contents))
+
+    with pytest.raises(ValueError, match="not a PDF"):
+        store(session, [contents[:2], contents[2:]])
+    assert not os.path.exists(session.chunk_path(0))
@@ -6,15 +6,40 @@ import { showAnnotationModal } from './modal.js';
 import { queueRenderPage } from './pdfRenderer.js';
 
 /**
- * Fetches annotations for the current document from the backend.
+ * Fetches all annotations for the current document from the backend.
+ * @returns {Promise<void>} - Resolves once the annotations have been loaded.
  */
 export function fetchAnnotations() {
-    if (!state.documentId) return;
+    // A sync from revision 0 returns every current annotation
+    state.annotations = [];
+    state.annotationsRevision = 0;
+    return syncAnnotations();
+}
 
-    fetch(`http://localhost:8000/annotations/${state.documentId}`)
+/**
+ * Fetches only the annotations created, updated or deleted since the last sync
+ * and merges them into the current annotation list.
+ * @returns {Promise<void>} - Resolves once the changes have been applied.
+ */
+export function syncAnnotations() {
+    if (!state.documentId) return Promise.resolve();
+
+    const documentId = state.documentId;
+    const url = `http://localhost:8000/documents/${documentId}/annotations/changes?since_revision=${state.annotationsRevision}`;
+
+    return fetch(url)
         .then(response => response.json())
         .then(data => {
-            state.annotations = data;
+            if (state.documentId !== documentId) return; // Another document was loaded meanwhile
+
+            const deleted = new Set(data.deleted);
+            const upserted = new Set(data.upserted.map(ann => ann.id));
+            state.annotations = state.annotations
+                .filter(ann => !deleted.has(ann.id) && !upserted.has(ann.id))
+                .concat(data.upserted)
+                .sort((a, b) => a.id - b.id);
+            state.annotationsRevision = data.revision;
+
             updateAnnotationList(); // Update the annotation list UI
             renderPage(state.pageNum);    // Re-render the current page to display annotations
         })
@@ -24,6 +49,49 @@ export function fetchAnnotations() {
         });
 }
 
+/**
+ * Subscribes to live annotation events for the current document, replacing any
+ * previous subscription. Diffs are applied directly when they follow on from the
+ * synced revision; otherwise the missing changes are pulled with a sync.
+ */
+export function subscribeToAnnotationEvents() {
+    if (state.annotationEvents) {
+        state.annotationEvents.close();
+        state.annotationEvents = null;
+    }
+    if (!state.documentId) return;
+
+    const source = new EventSource(`http://localhost:8000/documents/${state.documentId}/annotations/events`);
+    ['create', 'update', 'delete'].forEach(type => {
+        source.addEventListener(type, e => applyAnnotationEvent(JSON.parse(e.data)));
+    });
+    // The server drops subscribers that fall behind; EventSource reconnects on its own
+    source.addEventListener('resync', () => syncAnnotations());
+    state.annotationEvents = source;
+}
+
+/**
+ * Applies a single live annotation event to the current annotation list.
+ * @param {Object} event - The event with its type, resulting revision and annotation or ID.
+ */
+function applyAnnotationEvent(event) {
+    if (event.revision <= state.annotationsRevision) return; // Already synced past this change
+    if (event.revision !== state.annotationsRevision + 1) {
+        syncAnnotations(); // Changes were missed; pull them instead
+        return;
+    }
+
+    const id = event.type === 'delete' ? event.id : event.annotation.id;
+    state.annotations = state.annotations.filter(ann => ann.id !== id);
+    if (event.type !== 'delete') {
+        state.annotations = state.annotations.concat([event.annotation]).sort((a, b) => a.id - b.id);
+    }
+    state.annotationsRevision = event.revision;
+
+    updateAnnotationList();
+    drawAnnotations(state.pageNum);
+}
+
 /**
  * Updates the annotation list UI with the fetched annotations.
  */
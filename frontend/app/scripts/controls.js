@@ -4,7 +4,7 @@ import { state } from './state.js';
 import { fetchDocuments, uploadDocument } from './documentManager.js';
 import { renderPage, queueRenderPage, handleWindowResize } from './pdfRenderer.js';
 import { debounce } from './utility.js';
-import { fetchAnnotations, drawAnnotations } from './annotationManager.js';
+import { syncAnnotations, drawAnnotations } from './annotationManager.js';
 import { showAnnotationModal } from './modal.js';
 
 /**
@@ -192,8 +192,8 @@ export function setupEventListeners() {
                         throw new Error('Failed to save annotation');
                     }
 
-                    // Refresh annotations and notify the user
-                    await fetchAnnotations();
+                    // Pull only the changes since the last sync and notify the user
+                    await syncAnnotations();
                     alert('Annotation saved successfully.');
                 } else {
                     // If the user discards the annotation, clear the drawn rectangle
@@ -2,14 +2,33 @@
 
 import { state } from './state.js';
 import { renderPage } from './pdfRenderer.js';
-import { fetchAnnotations } from './annotationManager.js';
+import { fetchAnnotations, subscribeToAnnotationEvents } from './annotationManager.js';
+
+/**
+ * Fetches every page of the document list, following the X-Next-Cursor header.
+ * @param {string|null} cursor - Cursor of the page to fetch, or null for the first page.
+ * @returns {Promise<Array>} The documents of this and all following pages.
+ */
+function fetchDocumentPages(cursor = null) {
+    const url = new URL('http://localhost:8000/documents_with_annotations');
+    url.searchParams.set('limit', '1000');
+    if (cursor) {
+        url.searchParams.set('cursor', cursor);
+    }
+    return fetch(url)
+        .then(response => {
+            const nextCursor = response.headers.get('X-Next-Cursor');
+            return response.json().then(page => nextCursor
+                ? fetchDocumentPages(nextCursor).then(rest => page.concat(rest))
+                : page);
+        });
+}
 
 /**
  * Fetches the list of documents from the backend and populates the document list UI.
  */
 export function fetchDocuments() {
-    fetch('http://localhost:8000/documents_with_annotations')
-        .then(response => response.json())
+    fetchDocumentPages()
         .then(data => {
             const documentList = document.getElementById('document-list');
             documentList.innerHTML = ''; // Clear existing list
@@ -32,7 +51,7 @@ export function fetchDocuments() {
                 const tdAction = document.createElement('td');
                 const loadButton = document.createElement('button');
                 loadButton.textContent = 'Load';
-                loadButton.onclick = () => loadDocument(doc.id, doc.file_path);
+                loadButton.onclick = () => loadDocument(doc.id, doc.content_hash);
                 tdAction.appendChild(loadButton);
                 tr.appendChild(tdAction);
 
@@ -47,12 +66,16 @@ export function fetchDocuments() {
 
 /**
  * Loads a selected PDF document and initializes rendering.
+ * The content-addressed URL is cached by the browser forever, and pdf.js fetches
+ * it in byte ranges so the first page renders before the whole file has arrived.
  * @param {number} id - The document ID.
- * @param {string} filePath - The file path of the PDF.
+ * @param {string} contentHash - The SHA-256 of the document's contents.
  */
-export function loadDocument(id, filePath) {
+export function loadDocument(id, contentHash) {
     state.documentId = id;
-    const url = `http://localhost:8000/uploaded_files/${filePath}`;
+    const url = contentHash
+        ? `http://localhost:8000/documents/${id}/content/${contentHash}.pdf`
+        : `http://localhost:8000/documents/${id}/content`;
 
     pdfjsLib.getDocument(url).promise.then(pdfDoc_ => {
         state.pdfDoc = pdfDoc_;
@@ -61,6 +84,7 @@ export function loadDocument(id, filePath) {
         state.scale = 1.0;          // Reset zoom level
         document.getElementById('zoom-level').textContent = `${Math.round(state.scale * 100)}%`;
         renderPage(state.pageNum);  // Render the first page
+        subscribeToAnnotationEvents(); // Receive other reviewers' changes live
         fetchAnnotations();   // Fetch annotations for the document
     })
     .catch(error => {
@@ -69,6 +93,65 @@ export function loadDocument(id, filePath) {
     });
 }
 
+// Files larger than this are sent through a resumable chunked upload session
+const CHUNKED_UPLOAD_THRESHOLD = 32 * 1024 * 1024;
+
+// Number of chunks sent at the same time
+const CHUNK_UPLOAD_CONCURRENCY = 4;
+
+// Attempts per chunk before the upload is given up
+const CHUNK_UPLOAD_ATTEMPTS = 3;
+
+/**
+ * Sends a large file through a resumable upload session: chunks are PUT in parallel,
+ * each retried on failure, and the session is finalized once all have arrived.
+ * @param {File} file - The PDF file.
+ * @param {number} documentTypeId - The document type to assign.
+ * @returns {Promise<Object>} The created or updated document.
+ */
+async function uploadInChunks(file, documentTypeId) {
+    const response = await fetch('http://localhost:8000/uploads/', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ filename: file.name, size: file.size, document_type_id: documentTypeId })
+    });
+    if (!response.ok) {
+        throw new Error('Failed to start upload');
+    }
+    const session = await response.json();
+    const uploadUrl = `http://localhost:8000/uploads/${session.upload_id}`;
+
+    let next = 0;
+    const sendChunks = async () => {
+        while (next < session.chunk_count) {
+            const index = next++;
+            const start = index * session.chunk_size;
+            const chunk = file.slice(start, start + session.chunk_size);
+            for (let attempt = 1; ; attempt++) {
+                let chunkResponse;
+                try {
+                    chunkResponse = await fetch(`${uploadUrl}/chunks/${index}`, { method: 'PUT', body: chunk });
+                } catch (error) {
+                    // Dropped connection; only this chunk needs to be sent again
+                    if (attempt >= CHUNK_UPLOAD_ATTEMPTS) throw error;
+                    continue;
+                }
+                if (chunkResponse.ok) break;
+                if (chunkResponse.status < 500 || attempt >= CHUNK_UPLOAD_ATTEMPTS) {
+                    throw new Error(`Chunk ${index} failed with status ${chunkResponse.status}`);
+                }
+            }
+        }
+    };
+    await Promise.all(Array.from({ length: CHUNK_UPLOAD_CONCURRENCY }, sendChunks));
+
+    const completeResponse = await fetch(`${uploadUrl}/complete`, { method: 'POST' });
+    if (!completeResponse.ok) {
+        throw new Error('Failed to finalize upload');
+    }
+    return completeResponse.json();
+}
+
 /**
  * Uploads a selected PDF file to the backend.
  */
@@ -78,20 +161,27 @@ export function uploadDocument() {
     const document_type_id = state.selectedDocumentType;
 
     if (file) {
-        const formData = new FormData();
-        formData.append('file', file);
-        formData.append('document_type_id', document_type_id);
+        let upload;
+        if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+            upload = uploadInChunks(file, document_type_id);
+        } else {
+            const formData = new FormData();
+            formData.append('file', file);
+            formData.append('document_type_id', document_type_id);
 
-        fetch('http://localhost:8000/documents/', {
-            method: 'POST',
-            body: formData
-        })
-            .then(response => {
-                if (!response.ok) {
-                    throw new Error('File upload failed');
-                }
-                return response.json();
+            upload = fetch('http://localhost:8000/documents/', {
+                method: 'POST',
+                body: formData
             })
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error('File upload failed');
+                    }
+                    return response.json();
+                });
+        }
+
+        upload
             .then(() => {
                 fetchDocuments();      // Refresh document list
                 fileInput.value = ''; // Reset file input
@@ -110,6 +110,18 @@ export const state = {
      */
     annotations: [],
 
+    /**
+     * `annotationsRevision` is the document revision that `annotations` is synced to.
+     * Only changes made after this revision are fetched on the next sync.
+     */
+    annotationsRevision: 0,
+
+    /**
+     * `annotationEvents` is the EventSource delivering live annotation changes for the current document.
+     * It is replaced whenever another document is loaded.
+     */
+    annotationEvents: null,
+
     /**
      * `currentRenderTask` holds the current PDF.js render task.
      * It allows the application to cancel or manage ongoing render operations, ensuring only one render occurs at a time.